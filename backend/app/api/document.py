@@ -10,7 +10,8 @@ import io
 import zipfile
 from pathlib import Path
 
-from app.services.document_processor import document_processor
+from app.services.container import get_document_processor
+from app.services.document_processor import DocumentProcessor
 from app.schemas.document import (
     DocumentUploadRequest, DocumentUploadResponse,
     DocumentTranslationRequest, DocumentTranslationResponse,
@@ -33,7 +34,8 @@ async def upload_document(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     project_id: Optional[str] = None,
-    user_id: str = "default_user"  # 实际应用中从认证中获取
+    user_id: str = "default_user",  # 实际应用中从认证中获取
+    document_processor: DocumentProcessor = Depends(get_document_processor)
 ):
     """
     上传文档
@@ -61,6 +63,7 @@ async def upload_document(
         # 后台任务：自动提取文本
         background_tasks.add_task(
             auto_extract_text,
+            document_processor,
             document_info
         )
         
@@ -83,7 +86,8 @@ async def upload_document(
 @router.post("/extract-text/{document_id}", response_model=DocumentTextExtractionResponse)
 async def extract_text(
     document_id: UUID,
-    user_id: str = "default_user"
+    user_id: str = "default_user",
+    document_processor: DocumentProcessor = Depends(get_document_processor)
 ):
     """提取文档文本内容"""
     try:
@@ -119,7 +123,8 @@ async def extract_text(
 async def translate_document(
     request: DocumentTranslationRequest,
     background_tasks: BackgroundTasks,
-    user_id: str = "default_user"
+    user_id: str = "default_user",
+    document_processor: DocumentProcessor = Depends(get_document_processor)
 ):
     """翻译文档"""
     try:
@@ -171,7 +176,8 @@ async def translate_document(
 async def batch_translate_documents(
     request: BatchTranslationRequest,
     background_tasks: BackgroundTasks,
-    user_id: str = "default_user"
+    user_id: str = "default_user",
+    document_processor: DocumentProcessor = Depends(get_document_processor)
 ):
     """批量翻译文档"""
     try:
@@ -193,6 +199,7 @@ async def batch_translate_documents(
                 # 添加到后台任务
                 background_tasks.add_task(
                     process_single_translation,
+                    document_processor,
                     translation_request,
                     user_id
                 )
@@ -233,7 +240,8 @@ async def list_documents(
     search: Optional[str] = Query(None, description="搜索关键词"),
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页大小"),
-    user_id: str = "default_user"
+    user_id: str = "default_user",
+    document_processor: DocumentProcessor = Depends(get_document_processor)
 ):
     """获取文档列表"""
     try:
@@ -265,7 +273,8 @@ async def list_documents(
 @router.get("/{document_id}", response_model=DocumentInfo)
 async def get_document_info(
     document_id: UUID,
-    user_id: str = "default_user"
+    user_id: str = "default_user",
+    document_processor: DocumentProcessor = Depends(get_document_processor)
 ):
     """获取文档详细信息"""
     try:
@@ -290,7 +299,8 @@ async def get_document_info(
 async def download_document(
     document_id: UUID,
     file_type: str = Query("original", description="文件类型: original, translated, text"),
-    user_id: str = "default_user"
+    user_id: str = "default_user",
+    document_processor: DocumentProcessor = Depends(get_document_processor)
 ):
     """下载文档"""
     try:
@@ -345,7 +355,8 @@ async def download_document(
 @router.delete("/{document_id}")
 async def delete_document(
     document_id: UUID,
-    user_id: str = "default_user"
+    user_id: str = "default_user",
+    document_processor: DocumentProcessor = Depends(get_document_processor)
 ):
     """删除文档"""
     try:
@@ -363,7 +374,9 @@ async def delete_document(
 
 
 @router.get("/formats/supported", response_model=SupportedFormatsResponse)
-async def get_supported_formats():
+async def get_supported_formats(
+    document_processor: DocumentProcessor = Depends(get_document_processor)
+):
     """获取支持的文档格式"""
     try:
         formats = document_processor.get_supported_formats()
@@ -391,7 +404,8 @@ async def get_supported_formats():
 
 @router.get("/stats/processing", response_model=DocumentStatsResponse)
 async def get_processing_stats(
-    user_id: str = "default_user"
+    user_id: str = "default_user",
+    document_processor: DocumentProcessor = Depends(get_document_processor)
 ):
     """获取文档处理统计信息"""
     try:
@@ -417,7 +431,7 @@ async def get_processing_stats(
 
 
 # 后台任务函数
-async def auto_extract_text(document_info: dict):
+async def auto_extract_text(document_processor: DocumentProcessor, document_info: dict):
     """自动提取文本的后台任务"""
     try:
         await document_processor.extract_text_from_document(document_info)
@@ -426,7 +440,11 @@ async def auto_extract_text(document_info: dict):
         logger.error(f"自动文本提取失败: {e}")
 
 
-async def process_single_translation(request: DocumentTranslationRequest, user_id: str):
+async def process_single_translation(
+    document_processor: DocumentProcessor,
+    request: DocumentTranslationRequest,
+    user_id: str
+):
     """处理单个翻译任务的后台函数"""
     try:
         document_info = await document_processor.get_document_info(str(request.document_id))
@@ -455,7 +473,8 @@ async def process_single_translation(request: DocumentTranslationRequest, user_i
 async def batch_download_documents(
     document_ids: List[UUID],
     file_type: str = Query("original", description="文件类型"),
-    user_id: str = "default_user"
+    user_id: str = "default_user",
+    document_processor: DocumentProcessor = Depends(get_document_processor)
 ):
     """批量下载文档"""
     try:
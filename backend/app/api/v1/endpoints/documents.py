@@ -1,16 +1,16 @@
 """
 文档处理API端点
 """
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from ....schemas.document import (
     DocumentPreprocessRequest,
     DocumentPreprocessResponse,
     ProcessingResult
 )
 from ....services.document_processor import DocumentProcessor, DocumentProcessingError
+from ....services.container import get_document_processor
 
 router = APIRouter()
-document_processor = DocumentProcessor()
 
 
 @router.post(
@@ -19,7 +19,10 @@ document_processor = DocumentProcessor()
     summary="文档预处理",
     description="对上传的txt文档进行格式检查、清理和标准化处理"
 )
-async def preprocess_document(request: DocumentPreprocessRequest):
+async def preprocess_document(
+    request: DocumentPreprocessRequest,
+    document_processor: DocumentProcessor = Depends(get_document_processor)
+):
     """
     文档预处理接口
     
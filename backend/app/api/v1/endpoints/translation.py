@@ -1,18 +1,24 @@
 """
 翻译相关API端点
 """
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
+import io
+import json
+import time
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Query, UploadFile, File, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from ....schemas.translation import (
     TranslationRequest, TranslationResult, TranslationSuggestionsRequest,
     TranslationSuggestionsResponse, TranslationProvider, TranslationHealthCheck,
-    TranslationStats, CostInfo
+    TranslationStats, CostInfo, LanguageCode
 )
+from ....services.cache_import import CacheImporter, is_ndjson_file
+from ....services.container import get_translation_engine
 from ....services.translation_engine import TranslationEngine
+from ....services.stage_timing import StageTimer
 from ....providers.provider_factory import provider_factory
 
 router = APIRouter()
-translation_engine = TranslationEngine()
 
 
 @router.post(
@@ -21,7 +27,11 @@ translation_engine = TranslationEngine()
     summary="批量翻译文本",
     description="使用指定的翻译服务提供商批量翻译文本"
 )
-async def translate_batch(request: TranslationRequest):
+async def translate_batch(
+    request: TranslationRequest,
+    response: Response,
+    engine: TranslationEngine = Depends(get_translation_engine)
+):
     """
     批量翻译文本接口
     
@@ -32,11 +42,14 @@ async def translate_batch(request: TranslationRequest):
     - **quality_threshold**: 质量阈值
     - **use_cache**: 是否使用缓存
     - **context**: 翻译上下文
+    - **include_timings**: 是否在结果中返回各阶段耗时
     
-    返回翻译结果和统计信息
+    返回翻译结果和统计信息，各阶段耗时同时以 Server-Timing 响应头返回
     """
     try:
-        result = await translation_engine.translate_batch(request)
+        timer = StageTimer()
+        result = await engine.translate_batch(request, timer=timer)
+        response.headers["Server-Timing"] = timer.server_timing_header()
         return result
     
     except Exception as e:
@@ -51,13 +64,48 @@ async def translate_batch(request: TranslationRequest):
         )
 
 
+@router.post(
+    "/translate/stream",
+    summary="流式批量翻译文本",
+    description="以NDJSON逐行返回翻译结果：缓存命中立即返回，其余按子批次完成顺序返回，最后一行为汇总"
+)
+async def translate_batch_stream(
+    request: TranslationRequest,
+    engine: TranslationEngine = Depends(get_translation_engine)
+):
+    """
+    流式批量翻译文本接口
+    
+    每行一个JSON对象：
+    - **type=item**: 单条结果，index 为在 texts 中的下标（不保证按顺序返回）
+    - **type=summary**: 最后一行，统计信息同 /translate
+    - **type=error**: 处理中途出错时的最后一行
+    """
+    async def generate():
+        try:
+            async for record in engine.translate_batch_stream(request):
+                yield record.model_dump_json() + "\n"
+        except Exception as e:
+            # 响应头已经发出，错误只能作为最后一行返回
+            yield json.dumps({
+                "type": "error",
+                "error": str(e),
+                "message": "翻译请求处理失败"
+            }, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @router.post(
     "/suggestions",
     response_model=TranslationSuggestionsResponse,
     summary="获取翻译建议",
     description="从多个翻译服务提供商获取翻译建议"
 )
-async def get_translation_suggestions(request: TranslationSuggestionsRequest):
+async def get_translation_suggestions(
+    request: TranslationSuggestionsRequest,
+    engine: TranslationEngine = Depends(get_translation_engine)
+):
     """
     获取翻译建议接口
     
@@ -66,19 +114,22 @@ async def get_translation_suggestions(request: TranslationSuggestionsRequest):
     - **source_language**: 源语言代码
     - **target_language**: 目标语言代码
     - **context**: 翻译上下文
+    - **timeout**: 等待提供商的最长秒数
+    - **min_quality_score**: 得到第一个达到该分数的建议后取消其余提供商
     
     返回多个提供商的翻译建议
     """
     try:
-        import time
         start_time = time.time()
         
-        suggestions = await translation_engine.get_translation_suggestions(
+        suggestions = await engine.get_translation_suggestions(
             text=request.text,
             providers=request.providers,
             source_lang=request.source_language.value,
             target_lang=request.target_language.value,
-            context=request.context
+            context=request.context,
+            timeout=request.timeout,
+            min_quality_score=request.min_quality_score
         )
         
         processing_time = time.time() - start_time
@@ -104,6 +155,58 @@ async def get_translation_suggestions(request: TranslationSuggestionsRequest):
         )
 
 
+@router.post(
+    "/suggestions/stream",
+    summary="流式获取翻译建议",
+    description="并发请求多个提供商，以NDJSON按到达顺序逐行返回翻译建议，最后一行为汇总"
+)
+async def stream_translation_suggestions(
+    request: TranslationSuggestionsRequest,
+    engine: TranslationEngine = Depends(get_translation_engine)
+):
+    """
+    流式获取翻译建议接口
+    
+    每行一个JSON对象：type=suggestion 为一条建议，type=summary 为最后一行汇总，
+    处理中途出错时最后一行为 type=error
+    """
+    async def generate():
+        start_time = time.time()
+        count = 0
+        total_cost = 0.0
+        try:
+            async for suggestion in engine.iter_translation_suggestions(
+                text=request.text,
+                providers=request.providers,
+                source_lang=request.source_language.value,
+                target_lang=request.target_language.value,
+                context=request.context,
+                timeout=request.timeout,
+                min_quality_score=request.min_quality_score
+            ):
+                count += 1
+                total_cost += suggestion.cost
+                yield json.dumps(
+                    {"type": "suggestion", **suggestion.model_dump(mode="json")}, ensure_ascii=False
+                ) + "\n"
+        except Exception as e:
+            yield json.dumps({
+                "type": "error",
+                "error": str(e),
+                "message": "获取翻译建议失败"
+            }, ensure_ascii=False) + "\n"
+            return
+        
+        yield json.dumps({
+            "type": "summary",
+            "count": count,
+            "total_cost": total_cost,
+            "processing_time": time.time() - start_time
+        }) + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @router.post(
     "/jobs",
     summary="创建翻译任务",
@@ -113,7 +216,8 @@ async def create_translation_job(
     request: TranslationRequest,
     background_tasks: BackgroundTasks,
     project_id: str = Query(..., description="项目ID"),
-    user_id: str = Query(..., description="用户ID")
+    user_id: str = Query(..., description="用户ID"),
+    engine: TranslationEngine = Depends(get_translation_engine)
 ):
     """
     创建翻译任务接口
@@ -121,7 +225,7 @@ async def create_translation_job(
     用于大批量翻译的异步处理
     """
     try:
-        job_id = await translation_engine.create_translation_job(
+        job_id = await engine.create_translation_job(
             request=request,
             project_id=project_id,
             user_id=user_id
@@ -149,14 +253,17 @@ async def create_translation_job(
 @router.get(
     "/jobs/{job_id}",
     summary="获取翻译任务状态",
-    description="查询翻译任务的执行状态和结果"
+    description="查询翻译任务的执行状态、进度（已完成句段数、预计剩余时间）和结果"
 )
-async def get_translation_job_status(job_id: str):
+async def get_translation_job_status(
+    job_id: str,
+    engine: TranslationEngine = Depends(get_translation_engine)
+):
     """
     获取翻译任务状态接口
     """
     try:
-        job = await translation_engine.get_translation_job_status(job_id)
+        job = await engine.get_translation_job_status(job_id)
         
         if not job:
             raise HTTPException(
@@ -189,6 +296,85 @@ async def get_translation_job_status(job_id: str):
         )
 
 
+async def _update_translation_job(job_id: str, action, success_message: str, failure_message: str):
+    """取消/恢复任务的公共处理：任务不存在返回404，当前状态不允许该操作返回409"""
+    try:
+        job = await action(job_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "success": False,
+                "error": str(e),
+                "message": failure_message,
+                "code": 409
+            }
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "success": False,
+                "error": str(e),
+                "message": failure_message,
+                "code": 500
+            }
+        )
+    
+    if not job:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "success": False,
+                "error": "Job not found",
+                "message": "翻译任务不存在",
+                "code": 404
+            }
+        )
+    
+    return {
+        "success": True,
+        "job": job.dict(),
+        "message": success_message
+    }
+
+
+@router.post(
+    "/jobs/{job_id}/cancel",
+    summary="取消翻译任务",
+    description="取消排队中或执行中的翻译任务，已完成的子批次保留，之后可以恢复"
+)
+async def cancel_translation_job(
+    job_id: str,
+    engine: TranslationEngine = Depends(get_translation_engine)
+):
+    """
+    取消翻译任务接口
+    
+    执行中的任务在当前子批次完成后停止
+    """
+    return await _update_translation_job(
+        job_id, engine.cancel_translation_job, "翻译任务已取消", "取消翻译任务失败"
+    )
+
+
+@router.post(
+    "/jobs/{job_id}/resume",
+    summary="恢复翻译任务",
+    description="恢复失败或已取消的翻译任务，从最后保存的检查点继续执行"
+)
+async def resume_translation_job(
+    job_id: str,
+    engine: TranslationEngine = Depends(get_translation_engine)
+):
+    """
+    恢复翻译任务接口
+    """
+    return await _update_translation_job(
+        job_id, engine.resume_translation_job, "翻译任务已恢复", "恢复翻译任务失败"
+    )
+
+
 @router.get(
     "/providers",
     summary="获取可用的翻译服务提供商",
@@ -267,13 +453,14 @@ async def check_provider_health(provider: TranslationProvider):
 )
 async def get_translation_cost(
     user_id: Optional[str] = Query(None, description="用户ID"),
-    project_id: Optional[str] = Query(None, description="项目ID")
+    project_id: Optional[str] = Query(None, description="项目ID"),
+    engine: TranslationEngine = Depends(get_translation_engine)
 ):
     """
     获取翻译成本信息接口
     """
     try:
-        cost_info = await translation_engine.cost_tracker.get_cost_info(
+        cost_info = await engine.cost_tracker.get_cost_info(
             user_id=user_id,
             project_id=project_id
         )
@@ -300,19 +487,20 @@ async def get_translation_cost(
 async def get_translation_stats(
     days: int = Query(default=30, ge=1, le=365, description="统计天数"),
     user_id: Optional[str] = Query(None, description="用户ID"),
-    project_id: Optional[str] = Query(None, description="项目ID")
+    project_id: Optional[str] = Query(None, description="项目ID"),
+    engine: TranslationEngine = Depends(get_translation_engine)
 ):
     """
     获取翻译统计信息接口
     """
     try:
-        usage_stats = await translation_engine.cost_tracker.get_usage_stats(
+        usage_stats = await engine.cost_tracker.get_usage_stats(
             days=days,
             user_id=user_id,
             project_id=project_id
         )
         
-        engine_stats = await translation_engine.get_engine_stats()
+        engine_stats = await engine.get_engine_stats()
         
         return {
             "success": True,
@@ -338,13 +526,13 @@ async def get_translation_stats(
     summary="获取翻译缓存统计",
     description="获取翻译缓存的使用统计和效率分析"
 )
-async def get_cache_stats():
+async def get_cache_stats(engine: TranslationEngine = Depends(get_translation_engine)):
     """
     获取翻译缓存统计接口
     """
     try:
-        cache_stats = await translation_engine.cache.get_cache_stats()
-        efficiency_report = await translation_engine.cache.get_cache_efficiency_report()
+        cache_stats = await engine.cache.get_cache_stats()
+        efficiency_report = await engine.cache.get_cache_efficiency_report()
         
         return {
             "success": True,
@@ -372,13 +560,14 @@ async def get_cache_stats():
 )
 async def clear_translation_cache(
     provider: Optional[TranslationProvider] = Query(None, description="提供商过滤"),
-    older_than_days: Optional[int] = Query(None, ge=1, description="清理超过指定天数的缓存")
+    older_than_days: Optional[int] = Query(None, ge=1, description="清理超过指定天数的缓存"),
+    engine: TranslationEngine = Depends(get_translation_engine)
 ):
     """
     清理翻译缓存接口
     """
     try:
-        await translation_engine.cache.clear_cache(
+        await engine.cache.clear_cache(
             provider=provider,
             older_than_days=older_than_days
         )
@@ -400,13 +589,131 @@ async def clear_translation_cache(
         )
 
 
+@router.post(
+    "/cache/migrate",
+    summary="迁移翻译缓存键",
+    description="将旧版本格式的缓存键迁移到当前版本，无法可靠迁移的旧数据将被丢弃"
+)
+async def migrate_translation_cache(engine: TranslationEngine = Depends(get_translation_engine)):
+    """
+    迁移翻译缓存键接口
+    """
+    try:
+        result = await engine.cache.migrate_cache_keys()
+        
+        return {
+            "success": True,
+            "migrated": result["migrated"],
+            "dropped": result["dropped"],
+            "message": "缓存键迁移成功"
+        }
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "success": False,
+                "error": str(e),
+                "message": "缓存键迁移失败",
+                "code": 500
+            }
+        )
+
+
+@router.post(
+    "/cache/compact",
+    summary="压缩翻译缓存",
+    description="删除已过期的缓存项，并回收持久化缓存占用的磁盘空间"
+)
+async def compact_translation_cache(
+    vacuum: bool = Query(False, description="是否完整重建持久化缓存文件（期间阻塞缓存写入）"),
+    engine: TranslationEngine = Depends(get_translation_engine)
+):
+    """
+    压缩翻译缓存接口
+    """
+    try:
+        result = await engine.cache.compact_cache(vacuum)
+        
+        return {
+            "success": True,
+            "l1_removed": result["l1_removed"],
+            "l2_removed": result["l2_removed"],
+            "message": "缓存压缩成功"
+        }
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "success": False,
+                "error": str(e),
+                "message": "缓存压缩失败",
+                "code": 500
+            }
+        )
+
+
+@router.post(
+    "/cache/import",
+    summary="批量导入翻译缓存",
+    description="流式导入缓存导出文件（JSON/NDJSON），或同时上传原文和译文文件按逐行对齐语料导入"
+)
+async def import_translation_cache(
+    file: UploadFile = File(..., description="缓存导出文件，或对齐语料的原文文件"),
+    target_file: Optional[UploadFile] = File(None, description="对齐语料的译文文件"),
+    source_language: LanguageCode = Query(LanguageCode.ENGLISH, description="记录未指定时使用的源语言"),
+    target_language: LanguageCode = Query(LanguageCode.CHINESE, description="记录未指定时使用的目标语言"),
+    provider: TranslationProvider = Query(TranslationProvider.GOOGLE, description="记录未指定时使用的提供商"),
+    model: Optional[str] = Query(None, description="模型名，需与翻译时使用的一致"),
+    engine: TranslationEngine = Depends(get_translation_engine)
+):
+    """
+    批量导入翻译缓存接口
+    """
+    try:
+        importer = CacheImporter(
+            engine.cache,
+            source_language=source_language,
+            target_language=target_language,
+            provider=provider,
+            model=model
+        )
+        source = io.TextIOWrapper(file.file, encoding="utf-8-sig")
+        if target_file is not None:
+            target = io.TextIOWrapper(target_file.file, encoding="utf-8-sig")
+            result = await importer.import_aligned(source, target)
+        else:
+            result = await importer.import_export(source, ndjson=is_ndjson_file(file.filename or ""))
+        
+        return {
+            "success": True,
+            "imported": result["imported"],
+            "skipped": result["skipped"],
+            "l1_loaded": result["l1_loaded"],
+            "l2_loaded": result["l2_loaded"],
+            "message": "缓存导入成功"
+        }
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "success": False,
+                "error": str(e),
+                "message": "缓存导入失败",
+                "code": 500
+            }
+        )
+
+
 @router.get(
     "/health",
     response_model=TranslationHealthCheck,
     summary="翻译服务健康检查",
     description="检查翻译服务的整体健康状态"
 )
-async def translation_health_check():
+async def translation_health_check(engine: TranslationEngine = Depends(get_translation_engine)):
     """
     翻译服务健康检查接口
     """
@@ -415,10 +722,10 @@ async def translation_health_check():
         providers_health = await provider_factory.check_providers_health()
         
         # 获取今日统计
-        daily_stats = await translation_engine.cost_tracker.get_daily_stats()
+        daily_stats = await engine.cost_tracker.get_daily_stats()
         
         # 检查缓存状态
-        cache_stats = await translation_engine.cache.get_cache_stats()
+        cache_stats = await engine.cache.get_cache_stats()
         cache_healthy = cache_stats["total_items"] >= 0  # 缓存可访问即为健康
         
         # 计算错误率
@@ -1,21 +1,37 @@
 """
 Strands AI翻译工具 - FastAPI应用主文件
 """
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from .api.v1 import api_router
+from .services.container import services
 
 # 加载环境变量
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """启动时创建共享服务并启动翻译任务工作池，关闭时释放"""
+    await services.startup()
+    app.state.services = services
+    try:
+        yield
+    finally:
+        await services.shutdown()
+
+
 # 创建FastAPI应用实例
 app = FastAPI(
     title="Strands AI翻译工具",
     description="专业翻译质量控制工具API",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # 配置CORS中间件
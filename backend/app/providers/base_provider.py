@@ -4,28 +4,9 @@
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional
 import asyncio
-import time
 from ..schemas.translation import TranslationItem, TranslationProvider
-
-
-class RateLimiter:
-    """速率限制器"""
-    
-    def __init__(self, requests_per_second: float):
-        self.requests_per_second = requests_per_second
-        self.min_interval = 1.0 / requests_per_second
-        self.last_request_time = 0.0
-    
-    async def acquire(self):
-        """获取请求许可"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.min_interval:
-            sleep_time = self.min_interval - time_since_last
-            await asyncio.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
+from ..utils.text_utils import normalize_text
+from .request_scheduler import RateLimiter
 
 
 class TranslationError(Exception):
@@ -203,7 +184,7 @@ class BaseTranslationProvider(ABC):
     
     def _clean_text(self, text: str) -> str:
         """
-        清理文本
+        清理文本（引擎已规范化的文本直接返回）
         
         Args:
             text: 原始文本
@@ -211,16 +192,7 @@ class BaseTranslationProvider(ABC):
         Returns:
             str: 清理后的文本
         """
-        if not text or not text.strip():
-            return ""
-        
-        # 移除多余的空白字符
-        cleaned = ' '.join(text.split())
-        
-        # 移除特殊控制字符
-        cleaned = ''.join(char for char in cleaned if ord(char) >= 32 or char in '\n\t')
-        
-        return cleaned.strip()
+        return normalize_text(text)
     
     def _calculate_confidence(self, original: str, translated: str) -> float:
         """
@@ -4,12 +4,20 @@ OpenAI GPT翻译集成
 import os
 import json
 import asyncio
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import openai
 from openai import AsyncOpenAI
 from .base_provider import BaseTranslationProvider, TranslationError
+from ..core.config import settings
 from ..schemas.translation import TranslationItem, TranslationProvider
 
+# 打包模式下追加在系统提示后的输出格式说明
+_PACKING_INSTRUCTIONS = """
+
+The user message is a JSON object {"segments": [{"id": <number>, "text": <text>}, ...]}.
+Translate every segment independently and reply with only a JSON object
+{"translations": [{"id": <same id>, "text": <translation>}, ...]} containing each id exactly once."""
+
 
 class OpenAITranslateProvider(BaseTranslationProvider):
     """OpenAI GPT翻译提供商"""
@@ -34,9 +42,17 @@ class OpenAITranslateProvider(BaseTranslationProvider):
         self.model = "gpt-4o-mini-2024-07-18"
         self.max_tokens = 4000
         self.temperature = 0.3  # 较低的温度以获得更一致的翻译
-        self.max_batch_size = 10  # OpenAI需要逐个处理，但可以并发
+        self.max_concurrency = 10  # 同时进行的请求数
         self.rate_limiter.requests_per_second = 3  # OpenAI有较严格的速率限制
         
+        # 打包模式：多个句段按token预算合并到一次请求，系统提示只发送一次
+        self.packing_enabled = settings.OPENAI_PACKING_ENABLED
+        self.packing_token_budget = settings.OPENAI_PACKING_TOKEN_BUDGET
+        self.packing_max_segments = settings.OPENAI_PACKING_MAX_SEGMENTS
+        # 逐句请求时每次调用只处理一句；打包时一次调用可以接收更多句段
+        self.max_batch_size = 100 if self.packing_enabled else self.max_concurrency
+        self.packing_stats = {"packed_requests": 0, "packed_segments": 0, "resplit_segments": 0, "tokens_saved": 0}
+        
         # 成本配置
         self.cost_per_1k_tokens = 0.002  # $2 per 1K tokens for gpt-3.5-turbo
         self.avg_chars_per_token = 4  # 平均字符数per token
@@ -115,8 +131,11 @@ class OpenAITranslateProvider(BaseTranslationProvider):
                 self.provider_name.value
             )
         
+        if self.packing_enabled:
+            return await self._translate_packed(texts, source_lang, target_lang, context)
+        
         # 并发处理翻译请求
-        semaphore = asyncio.Semaphore(self.max_batch_size)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
         
         async def translate_with_semaphore(text: str) -> TranslationItem:
             async with semaphore:
@@ -140,6 +159,205 @@ class OpenAITranslateProvider(BaseTranslationProvider):
         
         return final_results
     
+    async def _translate_packed(
+        self,
+        texts: List[str],
+        source_lang: str,
+        target_lang: str,
+        context: Optional[str] = None
+    ) -> List[TranslationItem]:
+        """打包翻译：按token预算分组，每组一次请求，解析失败的句段逐句重试"""
+        results: List[Optional[TranslationItem]] = [None] * len(texts)
+        cleaned = [self._clean_text(text) for text in texts]
+        for i, text in enumerate(cleaned):
+            if not text:
+                results[i] = TranslationItem(
+                    original_text=texts[i],
+                    translated_text="",
+                    confidence=1.0,
+                    provider=self.provider_name,
+                    model_used=self.model,
+                    quality_score=1.0
+                )
+        
+        system_prompt = self._build_translation_prompt(source_lang, target_lang, context)
+        groups = self._pack_segments([i for i, text in enumerate(cleaned) if text], cleaned)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def translate_group(indices: List[int]):
+            async with semaphore:
+                if len(indices) == 1:
+                    results[indices[0]] = await self.translate_single(
+                        texts[indices[0]], source_lang, target_lang, context
+                    )
+                    return
+                try:
+                    translations = await self._request_packed(system_prompt, [cleaned[i] for i in indices])
+                except Exception as e:
+                    for i in indices:
+                        results[i] = self._handle_single_translation_error(e, texts[i])
+                    return
+            
+            tokens_saved = self._record_packing_savings(
+                system_prompt, [cleaned[i] for i in indices], [cleaned[indices[position]] for position in translations]
+            )
+            # 节省量分摊到解析出译文的句段，引擎按实际完成翻译的句段汇总后写入成本记录
+            share, remainder = divmod(tokens_saved, len(translations)) if translations else (0, 0)
+            resplit = []
+            for position, i in enumerate(indices):
+                translated_text = translations.get(position)
+                if translated_text is None:
+                    resplit.append(i)
+                    continue
+                results[i] = TranslationItem(
+                    original_text=texts[i],
+                    translated_text=translated_text,
+                    confidence=self._calculate_openai_confidence(cleaned[i], translated_text, None),
+                    provider=self.provider_name,
+                    model_used=self.model,
+                    quality_score=self._calculate_quality_score(cleaned[i], translated_text),
+                    tokens_saved=share + (1 if remainder > 0 else 0)
+                )
+                remainder -= 1
+            
+            # 只有未能解析出译文的句段逐句重新请求
+            self.packing_stats["resplit_segments"] += len(resplit)
+            for i in resplit:
+                async with semaphore:
+                    results[i] = await self.translate_single(texts[i], source_lang, target_lang, context)
+        
+        await asyncio.gather(*(translate_group(indices) for indices in groups))
+        return results
+    
+    def _pack_segments(self, indices: List[int], texts: List[str]) -> List[List[int]]:
+        """
+        按顺序把句段装入请求：每个请求的句段token估计之和不超过预算，句段数不超过上限
+        
+        Returns:
+            List[List[int]]: 每个请求包含的句段下标
+        """
+        groups: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for i in indices:
+            tokens = self._estimate_tokens(texts[i])
+            if current and (
+                current_tokens + tokens > self.packing_token_budget
+                or len(current) >= self.packing_max_segments
+            ):
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups
+    
+    async def _request_packed(self, system_prompt: str, texts: List[str]) -> Dict[int, str]:
+        """
+        一次请求翻译多个句段
+        
+        Returns:
+            Dict[int, str]: 句段在texts中的下标 -> 译文，未能解析的句段不在其中
+        """
+        await self.rate_limiter.acquire()
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt + _PACKING_INSTRUCTIONS},
+                {"role": "user", "content": self._build_packed_message(texts)}
+            ],
+            max_tokens=self.max_tokens,
+            temperature=self.temperature
+        )
+        self.packing_stats["packed_requests"] += 1
+        self.packing_stats["packed_segments"] += len(texts)
+        return self._parse_packed_response(response.choices[0].message.content or "", len(texts))
+    
+    @staticmethod
+    def _build_packed_message(texts: List[str]) -> str:
+        """打包请求的用户消息，句段编号从1开始"""
+        segments = [{"id": i + 1, "text": text} for i, text in enumerate(texts)]
+        return json.dumps({"segments": segments}, ensure_ascii=False)
+    
+    @staticmethod
+    def _parse_packed_response(content: str, count: int) -> Dict[int, str]:
+        """
+        解析打包请求的回复
+        
+        容忍回复外层的代码块标记和说明文字，接受 {"translations": [...]}、
+        直接的数组或 {"<id>": "<译文>"} 形式；编号越界、重复、译文为空或不是字符串的句段视为解析失败
+        
+        Returns:
+            Dict[int, str]: 句段下标（从0开始）-> 译文
+        """
+        start = min((i for i in (content.find("{"), content.find("[")) if i >= 0), default=-1)
+        end = max(content.rfind("}"), content.rfind("]"))
+        if start < 0 or end <= start:
+            return {}
+        try:
+            data = json.loads(content[start:end + 1])
+        except ValueError:
+            return {}
+        
+        if isinstance(data, dict) and isinstance(data.get("translations"), list):
+            data = data["translations"]
+        if isinstance(data, dict):
+            entries: List[Tuple[Any, Any]] = list(data.items())
+        elif isinstance(data, list):
+            entries = [
+                (entry.get("id"), entry.get("text")) for entry in data if isinstance(entry, dict)
+            ]
+        else:
+            return {}
+        
+        translations: Dict[int, str] = {}
+        duplicates = set()
+        for segment_id, text in entries:
+            try:
+                index = int(segment_id) - 1
+            except (TypeError, ValueError):
+                continue
+            if not 0 <= index < count or not isinstance(text, str) or not text.strip():
+                continue
+            if index in translations:
+                duplicates.add(index)
+            translations[index] = text.strip()
+        for index in duplicates:
+            del translations[index]
+        return translations
+    
+    def _estimate_tokens(self, text: str) -> int:
+        """保守估计token数：英文约4字符一个token，中日韩文约1字1个token，按UTF-8字节数除以3估计"""
+        return len(text.encode("utf-8")) // 3 + 1
+    
+    def _record_packing_savings(self, system_prompt: str, texts: List[str], parsed_texts: List[str]) -> int:
+        """
+        记录打包相对逐句请求节省的提示token（估计值）
+        
+        Args:
+            system_prompt: 逐句请求使用的系统提示
+            texts: 打包请求中的全部句段
+            parsed_texts: 解析出译文的句段（其余句段还要逐句请求，不计节省）
+            
+        Returns:
+            int: 本次打包请求节省的提示token
+        """
+        prompt_tokens = self._estimate_tokens(system_prompt)
+        unpacked = sum(prompt_tokens + self._estimate_tokens(text) for text in parsed_texts)
+        packed = self._estimate_tokens(system_prompt + _PACKING_INSTRUCTIONS) + self._estimate_tokens(
+            self._build_packed_message(texts)
+        )
+        saved = max(0, unpacked - packed)
+        self.packing_stats["tokens_saved"] += saved
+        return saved
+    
+    @property
+    def tokens_saved_per_segment(self) -> float:
+        """打包模式下平均每个句段节省的提示token"""
+        segments = self.packing_stats["packed_segments"]
+        return self.packing_stats["tokens_saved"] / segments if segments else 0.0
+    
     def _build_translation_prompt(
         self, 
         source_lang: str, 
@@ -316,7 +534,12 @@ Special instructions for Chinese to English translation:
         output_tokens = input_tokens * 1.2  # 翻译输出通常比输入稍长
         system_tokens = 200  # 系统提示的大概token数
         
-        total_tokens = (input_tokens + output_tokens + system_tokens) * len(texts)
+        if self.packing_enabled:
+            # 打包时每个请求只发送一次系统提示
+            requests = len(self._pack_segments(list(range(len(texts))), texts))
+            total_tokens = input_tokens + output_tokens + system_tokens * requests
+        else:
+            total_tokens = (input_tokens + output_tokens + system_tokens) * len(texts)
         
         return (total_tokens / 1000) * self.cost_per_1k_tokens
     
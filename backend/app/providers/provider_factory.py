@@ -125,6 +125,7 @@ class ProviderFactory:
                 "class": provider.__class__.__name__,
                 "max_batch_size": provider.max_batch_size,
                 "rate_limit": provider.rate_limiter.requests_per_second,
+                "scheduler": provider.rate_limiter.get_stats(),
                 "retry_attempts": provider.retry_attempts,
             }
             
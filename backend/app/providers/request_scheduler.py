@@ -0,0 +1,220 @@
+"""
+提供商请求调度
+交互式请求（翻译建议、小批量翻译）与批量请求（文档翻译、异步任务、大批量翻译）共用提供商的速率限制。
+速率限制器按优先级和租户分配请求许可：交互式请求优先，并为其预留一部分速率，
+批量请求只能使用其余部分；同一优先级内按租户（项目）加权公平排队，单个大任务不会独占提供商
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ..core.config import settings
+
+DEFAULT_TENANT = "default"
+
+
+class RequestPriority(str, Enum):
+    """提供商请求的优先级"""
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+
+
+_priority: ContextVar[Optional[RequestPriority]] = ContextVar("provider_request_priority", default=None)
+_tenant: ContextVar[Optional[str]] = ContextVar("provider_request_tenant", default=None)
+
+
+@contextmanager
+def request_scope(
+    priority: Optional[RequestPriority] = None,
+    tenant: Optional[str] = None
+) -> Iterator[None]:
+    """
+    设置当前上下文中提供商请求的优先级和租户
+
+    在该上下文中（包括其中创建的任务）发起的提供商调用按此排队；为None的参数保持外层的设置
+    """
+    tokens = []
+    if priority is not None:
+        tokens.append((_priority, _priority.set(priority)))
+    if tenant is not None:
+        tokens.append((_tenant, _tenant.set(tenant)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def current_priority() -> Optional[RequestPriority]:
+    """当前上下文的请求优先级，未设置时为None"""
+    return _priority.get()
+
+
+def parse_tenant_weights(value: str) -> Dict[str, float]:
+    """
+    解析租户权重
+
+    Args:
+        value: 形如 "project-a=3,project-b=0.5" 的配置，未列出的租户权重为1
+
+    Returns:
+        Dict[str, float]: 租户 -> 权重
+    """
+    weights = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        tenant, _, weight = item.partition("=")
+        try:
+            weights[tenant.strip()] = float(weight)
+        except ValueError:
+            raise ValueError(f"Invalid tenant weight setting: {item.strip()}")
+        if weights[tenant.strip()] <= 0:
+            raise ValueError(f"Invalid tenant weight setting: {item.strip()}")
+    return weights
+
+
+class _FairQueue:
+    """
+    一个优先级内的加权公平队列（WFQ）
+
+    每个请求的虚拟完成时间 = max(队列虚拟时间, 该租户上一个请求的完成时间) + 1/权重，
+    按虚拟完成时间出队：各租户按权重比例轮流获得许可，先到的大批量请求不会挡住其他租户
+    """
+
+    def __init__(self, weights: Dict[str, float]):
+        self.weights = weights
+        self._heap: List[Tuple[float, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._last_finish: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, tenant: str, future: asyncio.Future):
+        finish = max(self._virtual_time, self._last_finish.get(tenant, 0.0)) + 1.0 / self.weights.get(tenant, 1.0)
+        self._last_finish[tenant] = finish
+        heapq.heappush(self._heap, (finish, next(self._sequence), future))
+
+    def pop(self) -> Optional[asyncio.Future]:
+        """取出下一个仍在等待的请求（跳过已取消的）"""
+        future = None
+        while self._heap and future is None:
+            finish, _, candidate = heapq.heappop(self._heap)
+            if not candidate.done():
+                self._virtual_time = finish
+                future = candidate
+        if not self._heap:
+            # 队列排空时所有租户的完成时间都不超过虚拟时间，清除记录不影响排队顺序
+            self._last_finish.clear()
+        return future
+
+
+class RateLimiter:
+    """
+    按优先级调度的速率限制器
+
+    - 两次许可之间至少间隔 1/requests_per_second 秒
+    - 批量请求的速率不超过 requests_per_second * (1 - interactive_reserve)，预留的部分只给交互式请求
+    - 有交互式请求等待时总是先发给交互式请求
+    - 同一优先级内按租户加权公平排队
+
+    没有等待者且已到可发出时间时直接放行，不经过调度任务
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float,
+        interactive_reserve: Optional[float] = None,
+        tenant_weights: Optional[Dict[str, float]] = None
+    ):
+        self.requests_per_second = requests_per_second
+        self.interactive_reserve = (
+            settings.TRANSLATION_INTERACTIVE_RESERVE if interactive_reserve is None else interactive_reserve
+        )
+        if tenant_weights is None:
+            tenant_weights = parse_tenant_weights(settings.TRANSLATION_TENANT_WEIGHTS)
+
+        self._queues = {priority: _FairQueue(tenant_weights) for priority in RequestPriority}
+        self._last_grant = float("-inf")
+        self._last_bulk_grant = float("-inf")
+        self._arrival: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._granted = {priority: 0 for priority in RequestPriority}
+
+    def _next_slot(self, priority: RequestPriority) -> float:
+        """该优先级的请求最早可以获得许可的时间"""
+        slot = self._last_grant + 1.0 / self.requests_per_second
+        if priority == RequestPriority.BULK:
+            bulk_rate = self.requests_per_second * max(1.0 - self.interactive_reserve, 0.01)
+            slot = max(slot, self._last_bulk_grant + 1.0 / bulk_rate)
+        return slot
+
+    def _grant(self, priority: RequestPriority, now: float):
+        self._last_grant = now
+        if priority == RequestPriority.BULK:
+            self._last_bulk_grant = now
+        self._granted[priority] += 1
+
+    async def acquire(
+        self,
+        priority: Optional[RequestPriority] = None,
+        tenant: Optional[str] = None
+    ):
+        """
+        获取请求许可
+
+        Args:
+            priority: 优先级，默认取当前上下文的设置，未设置时按交互式处理
+            tenant: 租户，默认取当前上下文的设置
+        """
+        priority = priority or _priority.get() or RequestPriority.INTERACTIVE
+        tenant = tenant or _tenant.get() or DEFAULT_TENANT
+
+        now = time.monotonic()
+        if not any(self._queues.values()) and now >= self._next_slot(priority):
+            self._grant(priority, now)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues[priority].push(tenant, future)
+        if self._arrival is None:
+            self._arrival = asyncio.Event()
+        self._arrival.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        await future
+
+    async def _dispatch(self):
+        """按优先级和公平队列依次放行等待的请求，全部放行后退出"""
+        interactive = self._queues[RequestPriority.INTERACTIVE]
+        bulk = self._queues[RequestPriority.BULK]
+        while interactive or bulk:
+            priority = RequestPriority.INTERACTIVE if interactive else RequestPriority.BULK
+            delay = self._next_slot(priority) - time.monotonic()
+            if delay > 0:
+                # 等待期间有新请求到达（可能是交互式）时重新选择
+                self._arrival.clear()
+                try:
+                    await asyncio.wait_for(self._arrival.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            future = self._queues[priority].pop()
+            if future is not None:
+                self._grant(priority, time.monotonic())
+                future.set_result(None)
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """调度统计：各优先级等待中和已放行的请求数"""
+        return {
+            "waiting": {priority.value: len(queue) for priority, queue in self._queues.items()},
+            "granted": {priority.value: count for priority, count in self._granted.items()}
+        }
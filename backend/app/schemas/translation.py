@@ -1,7 +1,7 @@
 """
 翻译相关的Pydantic模式定义
 """
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 from datetime import datetime
 from enum import Enum
 from pydantic import BaseModel, Field
@@ -21,6 +21,11 @@ class LanguageCode(str, Enum):
     CHINESE = "zh"
     CHINESE_SIMPLIFIED = "zh-CN"
     CHINESE_TRADITIONAL = "zh-TW"
+    JAPANESE = "ja"
+    KOREAN = "ko"
+    FRENCH = "fr"
+    GERMAN = "de"
+    SPANISH = "es"
 
 
 class TranslationStatus(str, Enum):
@@ -29,6 +34,7 @@ class TranslationStatus(str, Enum):
     IN_PROGRESS = "in_progress"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
     CACHED = "cached"
 
 
@@ -50,6 +56,9 @@ class TranslationItem(BaseModel):
     detected_language: Optional[str] = Field(None, description="检测到的源语言")
     quality_score: Optional[float] = Field(None, ge=0.0, le=1.0, description="质量分数")
     created_at: datetime = Field(default_factory=datetime.now, description="创建时间")
+    tokens_saved: Optional[int] = Field(
+        None, exclude=True, description="打包请求分摊到该句段节省的提示Token数（估计，仅用于成本记录，不序列化）"
+    )
 
 
 class QualityScore(BaseModel):
@@ -71,6 +80,7 @@ class TranslationRequest(BaseModel):
     quality_threshold: float = Field(default=0.7, ge=0.0, le=1.0, description="质量阈值")
     use_cache: bool = Field(default=True, description="是否使用缓存")
     context: Optional[str] = Field(None, description="翻译上下文")
+    include_timings: bool = Field(default=False, description="是否在结果中返回各阶段耗时")
 
 
 class TranslationResult(BaseModel):
@@ -80,6 +90,29 @@ class TranslationResult(BaseModel):
     success_count: int = Field(..., description="成功数量")
     cache_hit_count: int = Field(..., description="缓存命中数量")
     cache_hit_rate: float = Field(..., ge=0.0, le=1.0, description="缓存命中率")
+    dedup_ratio: float = Field(default=0.0, ge=0.0, le=1.0, description="批内重复文本占比")
+    provider_used: TranslationProvider = Field(..., description="使用的提供商")
+    total_cost: float = Field(..., description="总成本")
+    processing_time: float = Field(..., description="处理时间(秒)")
+    quality_summary: Dict[str, int] = Field(..., description="质量统计")
+    stage_timings: Optional[Dict[str, float]] = Field(None, description="各阶段耗时(毫秒)，请求 include_timings 时返回")
+
+
+class TranslationStreamItem(BaseModel):
+    """流式翻译的单条结果"""
+    type: Literal["item"] = Field(default="item", description="记录类型")
+    index: int = Field(..., description="在请求texts中的下标")
+    cached: bool = Field(..., description="是否来自缓存")
+    translation: TranslationItem = Field(..., description="翻译结果")
+
+
+class TranslationStreamSummary(BaseModel):
+    """流式翻译结束时的汇总记录"""
+    type: Literal["summary"] = Field(default="summary", description="记录类型")
+    total_count: int = Field(..., description="总数量")
+    success_count: int = Field(..., description="成功数量")
+    cache_hit_count: int = Field(..., description="缓存命中数量")
+    cache_hit_rate: float = Field(..., ge=0.0, le=1.0, description="缓存命中率")
     provider_used: TranslationProvider = Field(..., description="使用的提供商")
     total_cost: float = Field(..., description="总成本")
     processing_time: float = Field(..., description="处理时间(秒)")
@@ -98,6 +131,11 @@ class TranslationJob(BaseModel):
     created_at: datetime = Field(default_factory=datetime.now, description="创建时间")
     started_at: Optional[datetime] = Field(None, description="开始时间")
     completed_at: Optional[datetime] = Field(None, description="完成时间")
+    total_segments: int = Field(default=0, description="句段总数")
+    completed_segments: int = Field(default=0, description="已完成（已保存检查点）的句段数")
+    progress: float = Field(default=0.0, ge=0.0, le=1.0, description="完成进度")
+    eta_seconds: Optional[float] = Field(None, description="预计剩余时间(秒)")
+    attempt: int = Field(default=0, description="被worker领取执行的次数")
 
 
 class CostInfo(BaseModel):
@@ -119,6 +157,8 @@ class UsageRecord(BaseModel):
     request_count: int = Field(..., description="请求数量")
     character_count: int = Field(..., description="字符数量")
     token_count: Optional[int] = Field(None, description="Token数量")
+    tokens_saved: Optional[int] = Field(None, description="打包请求节省的提示Token数（估计）")
+    tokens_saved_per_segment: Optional[float] = Field(None, description="打包请求平均每个句段节省的提示Token数（估计）")
     estimated_cost: float = Field(..., description="预估成本")
     actual_cost: Optional[float] = Field(None, description="实际成本")
     timestamp: datetime = Field(default_factory=datetime.now, description="时间戳")
@@ -143,6 +183,10 @@ class TranslationSuggestionsRequest(BaseModel):
     source_language: LanguageCode = Field(default=LanguageCode.ENGLISH, description="源语言")
     target_language: LanguageCode = Field(default=LanguageCode.CHINESE, description="目标语言")
     context: Optional[str] = Field(None, description="上下文")
+    timeout: Optional[float] = Field(None, gt=0, description="等待提供商的最长秒数，超时只返回已得到的建议")
+    min_quality_score: Optional[float] = Field(
+        None, ge=0.0, le=1.0, description="得到第一个达到该质量分数的建议后取消其余提供商"
+    )
 
 
 class TranslationSuggestionsResponse(BaseModel):
@@ -162,6 +206,7 @@ class TranslationCache(BaseModel):
     source_language: LanguageCode = Field(..., description="源语言")
     target_language: LanguageCode = Field(..., description="目标语言")
     provider: TranslationProvider = Field(..., description="提供商")
+    model_used: Optional[str] = Field(None, description="使用的模型")
     quality_score: float = Field(..., description="质量分数")
     hit_count: int = Field(default=1, description="命中次数")
     created_at: datetime = Field(default_factory=datetime.now, description="创建时间")
@@ -0,0 +1,108 @@
+"""
+翻译缓存准入策略
+W-TinyLFU：新写入的缓存项先进入小的窗口LRU，被挤出窗口时与主缓存的LRU淘汰候选比较访问频率，
+频率更高者留在缓存中，避免只出现一次的句段把热点缓存项挤出去
+"""
+from typing import Hashable
+
+_MASK64 = (1 << 64) - 1
+_ROW_SEEDS = (
+    0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93,
+    0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53, 0x85EBCA77C2B2AE63, 0x27D4EB2F165667C5
+)
+
+
+class CountMinSketch:
+    """
+    Count-Min Sketch 频率估计
+
+    - depth 行计数器，每行用不同的哈希位置，估计值取各行最小值
+    - 计数器上限15（4位），总增量达到 sample_size 后所有计数器减半，使频率随时间衰减
+    """
+
+    _MAX_COUNT = 15
+
+    def __init__(self, width: int, depth: int = 4, sample_size: int = 0):
+        if not 1 <= depth <= len(_ROW_SEEDS):
+            raise ValueError(f"depth must be between 1 and {len(_ROW_SEEDS)}")
+        # 宽度取2的幂，列号直接取乘法散列结果的高位
+        self.width = 1 << max(6, (max(width, 1) - 1).bit_length())
+        self.depth = depth
+        self.sample_size = sample_size or 10 * width
+        self._shift = 64 - (self.width.bit_length() - 1)
+        self._table = bytearray(self.width * depth)
+        self._additions = 0
+
+    def _indexes(self, key: Hashable):
+        # 每行用不同的奇数乘子对哈希值做乘法散列，取高位作为列号，各行的位置相互独立
+        h = hash(key) & _MASK64
+        width, shift = self.width, self._shift
+        return [
+            row * width + (((h * seed) & _MASK64) >> shift)
+            for row, seed in enumerate(_ROW_SEEDS[:self.depth])
+        ]
+
+    def increment(self, key: Hashable):
+        """记录一次访问"""
+        table = self._table
+        added = False
+        for index in self._indexes(key):
+            if table[index] < self._MAX_COUNT:
+                table[index] += 1
+                added = True
+        if added:
+            self._additions += 1
+            if self._additions >= self.sample_size:
+                self._reset()
+
+    def estimate(self, key: Hashable) -> int:
+        """估计访问频率"""
+        table = self._table
+        return min(table[index] for index in self._indexes(key))
+
+    def _reset(self):
+        """所有计数器减半（老化）"""
+        self._table = bytearray(count >> 1 for count in self._table)
+        self._additions //= 2
+
+
+class TinyLFUAdmission:
+    """
+    TinyLFU准入过滤器
+
+    由 MemoryCacheBackend 在每次读取时调用 record，窗口LRU溢出时调用 admit 决定去留
+    """
+
+    def __init__(self, capacity: int, window_ratio: float = 0.01):
+        self.window_ratio = window_ratio
+        self.sketch = CountMinSketch(width=capacity)
+
+        self.admitted = 0
+        self.rejected = 0
+
+    def record(self, key: Hashable):
+        """记录一次访问（命中和未命中都要记录）"""
+        self.sketch.increment(key)
+
+    def admit(self, candidate: Hashable, victim: Hashable) -> bool:
+        """
+        判断窗口挤出的候选项能否替换主缓存的淘汰候选
+
+        Args:
+            candidate: 窗口LRU挤出的缓存键
+            victim: 主缓存中最久未使用的缓存键
+
+        Returns:
+            bool: 候选项频率更高时返回True（淘汰victim），否则淘汰候选项
+        """
+        if self.sketch.estimate(candidate) > self.sketch.estimate(victim):
+            self.admitted += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def window_capacity(self, max_size: int) -> int:
+        """窗口LRU的容量"""
+        if max_size <= 1:
+            return max_size
+        return max(1, int(max_size * self.window_ratio))
@@ -0,0 +1,718 @@
+"""
+翻译缓存存储后端
+"""
+import asyncio
+import heapq
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional, Tuple
+
+from ..core.config import settings
+from .cache_admission import TinyLFUAdmission
+from ..schemas.translation import TranslationCache as CacheModel
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - redis为可选依赖
+    aioredis = None
+
+
+class MemoryCacheBackend:
+    """
+    进程内LRU/TTL缓存后端
+
+    - OrderedDict 维护最近使用顺序，get/set/淘汰均为 O(1)
+    - 最小堆按过期时间排序，过期项在访问时惰性删除，或在写入时分批清理
+    - 写入缓存项时回调 on_add(key, value)；缓存项因淘汰、过期、删除或被覆盖离开缓存时
+      回调 on_remove(key, value)，供索引、统计等同步（clear不回调）
+    - 传入 admission（TinyLFU）时为W-TinyLFU：新键先进入窗口LRU，挤出窗口时
+      与主缓存的LRU淘汰候选比较访问频率，由准入策略决定淘汰哪一个
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        ttl_seconds: float = 30 * 24 * 3600,
+        expire_batch_size: int = 64,
+        on_remove: Optional[Callable[[str, Any], None]] = None,
+        on_add: Optional[Callable[[str, Any], None]] = None,
+        admission: Optional[TinyLFUAdmission] = None
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        # 每次写入最多顺带清理的过期项数量，保证单次写入的开销有上界
+        self.expire_batch_size = expire_batch_size
+        self.on_remove = on_remove
+        self.on_add = on_add
+        self.admission = admission
+
+        # key -> (value, expires_at)；未启用准入策略时所有缓存项都在 _data 中
+        self._data: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        # W-TinyLFU的窗口LRU，新写入的键先进入这里
+        self._window: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        # (expires_at, key)，覆盖写入后旧记录会残留在堆中，弹出时校验
+        self._expiry_heap: List[Tuple[float, str]] = []
+
+        self.evictions = 0
+        self.expirations = 0
+
+    def _segment(self, key: str) -> Optional["OrderedDict[str, Tuple[Any, float]]"]:
+        """缓存键所在的区域（主缓存或窗口），不存在时返回None"""
+        if key in self._data:
+            return self._data
+        if key in self._window:
+            return self._window
+        return None
+
+    def get(self, key: str, now: Optional[float] = None) -> Optional[Any]:
+        """
+        读取缓存项并标记为最近使用
+
+        Args:
+            key: 缓存键
+            now: 当前时间戳（测试用）
+
+        Returns:
+            Optional[Any]: 缓存值，不存在或已过期时返回None
+        """
+        if self.admission is not None:
+            self.admission.record(key)
+
+        segment = self._segment(key)
+        if segment is None:
+            return None
+
+        value, expires_at = segment[key]
+        if expires_at <= (time.time() if now is None else now):
+            del segment[key]
+            self.expirations += 1
+            self._notify_remove(key, value)
+            return None
+
+        segment.move_to_end(key)
+        return value
+
+    def peek(self, key: str, now: Optional[float] = None) -> Optional[Any]:
+        """读取缓存项但不改变LRU顺序"""
+        record = self._data.get(key) or self._window.get(key)
+        if record is None:
+            return None
+
+        value, expires_at = record
+        if expires_at <= (time.time() if now is None else now):
+            return None
+        return value
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        expires_at: Optional[float] = None,
+        now: Optional[float] = None
+    ):
+        """
+        写入缓存项
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            expires_at: 过期时间戳，默认 now + ttl_seconds
+            now: 当前时间戳（测试用）
+        """
+        now = time.time() if now is None else now
+        if expires_at is None:
+            expires_at = now + self.ttl_seconds
+
+        segment = self._segment(key)
+        if segment is not None:
+            segment.move_to_end(key)
+            self._notify_remove(key, segment[key][0])
+        elif self.admission is not None:
+            segment = self._window
+        else:
+            segment = self._data
+        segment[key] = (value, expires_at)
+        if self.on_add is not None:
+            self.on_add(key, value)
+        heapq.heappush(self._expiry_heap, (expires_at, key))
+
+        # 摊还清理过期项
+        self.purge_expired(now=now, limit=self.expire_batch_size)
+
+        if self.admission is not None:
+            self._evict_with_admission()
+        else:
+            # 超出容量时淘汰最久未使用的项
+            while len(self._data) > self.max_size:
+                self._evict(self._data)
+
+        # 堆中残留的失效记录过多时重建，避免堆无限增长
+        if len(self._expiry_heap) > 2 * len(self) + self.expire_batch_size:
+            self._rebuild_heap()
+
+    def _evict(self, segment: "OrderedDict[str, Tuple[Any, float]]"):
+        """淘汰区域中最久未使用的项"""
+        evicted_key, (evicted_value, _) = segment.popitem(last=False)
+        self.evictions += 1
+        self._notify_remove(evicted_key, evicted_value)
+
+    def _evict_with_admission(self):
+        """窗口溢出的项与主缓存的LRU项竞争，频率低的一方被淘汰"""
+        window_capacity = self.admission.window_capacity(self.max_size)
+        main_capacity = self.max_size - window_capacity
+
+        # 容量调小时主缓存直接按LRU收缩
+        while len(self._data) > main_capacity:
+            self._evict(self._data)
+
+        while len(self._window) > window_capacity:
+            if len(self._data) < main_capacity:
+                key, record = self._window.popitem(last=False)
+                self._data[key] = record
+                continue
+            if not self._data:
+                self._evict(self._window)
+                continue
+
+            candidate = next(iter(self._window))
+            victim = next(iter(self._data))
+            if self.admission.admit(candidate, victim):
+                self._evict(self._data)
+                self._data[candidate] = self._window.pop(candidate)
+            else:
+                self._evict(self._window)
+
+    def delete(self, key: str) -> bool:
+        """删除缓存项"""
+        segment = self._segment(key)
+        if segment is None:
+            return False
+        self._notify_remove(key, segment.pop(key)[0])
+        return True
+
+    def purge_expired(self, now: Optional[float] = None, limit: Optional[int] = None) -> int:
+        """
+        清理已过期的缓存项
+
+        Args:
+            now: 当前时间戳
+            limit: 本次最多检查的堆记录数，None表示清理全部过期项
+
+        Returns:
+            int: 删除的缓存项数量
+        """
+        now = time.time() if now is None else now
+        heap = self._expiry_heap
+        removed = 0
+        checked = 0
+
+        while heap and heap[0][0] <= now:
+            if limit is not None and checked >= limit:
+                break
+            expires_at, key = heapq.heappop(heap)
+            checked += 1
+
+            segment = self._segment(key)
+            # 仅当堆记录与当前值一致时才删除（否则是被覆盖或已淘汰的旧记录）
+            if segment is not None and segment[key][1] == expires_at:
+                value = segment.pop(key)[0]
+                removed += 1
+                self._notify_remove(key, value)
+
+        self.expirations += removed
+        return removed
+
+    def _notify_remove(self, key: str, value: Any):
+        if self.on_remove is not None:
+            self.on_remove(key, value)
+
+    def _rebuild_heap(self):
+        """根据当前数据重建过期堆"""
+        self._expiry_heap = [
+            (expires_at, key)
+            for segment in (self._data, self._window)
+            for key, (_, expires_at) in segment.items()
+        ]
+        heapq.heapify(self._expiry_heap)
+
+    def clear(self):
+        """清空缓存"""
+        self._data.clear()
+        self._window.clear()
+        self._expiry_heap.clear()
+
+    def _records(self) -> Iterator[Tuple[str, Tuple[Any, float]]]:
+        """主缓存和窗口中的所有记录（各自从最久未使用到最近使用）"""
+        yield from self._data.items()
+        yield from self._window.items()
+
+    def keys(self) -> List[str]:
+        """所有缓存键（从最久未使用到最近使用）"""
+        return [key for key, _ in self._records()]
+
+    def values(self) -> Iterator[Any]:
+        """遍历所有缓存值"""
+        return (value for _, (value, _) in self._records())
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """遍历所有缓存项"""
+        return ((key, value) for key, (value, _) in self._records())
+
+    def __len__(self) -> int:
+        return len(self._data) + len(self._window)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data or key in self._window
+
+
+class SharedCacheBackend(ABC):
+    """
+    跨进程共享缓存后端（L2）
+
+    所有 uvicorn/gunicorn worker 共用同一个L2，进程内的 MemoryCacheBackend 作为L1
+    """
+
+    name = "shared"
+
+    @abstractmethod
+    async def get_many(self, keys: List[str]) -> List[Optional[CacheModel]]:
+        """
+        批量读取缓存项
+
+        Args:
+            keys: 缓存键列表
+
+        Returns:
+            List[Optional[CacheModel]]: 与keys一一对应的缓存项，未命中为None
+        """
+        pass
+
+    @abstractmethod
+    async def set_many(self, items: List[Tuple[str, CacheModel, float]]):
+        """
+        批量写入缓存项
+
+        Args:
+            items: (缓存键, 缓存项, 过期时间戳) 列表
+        """
+        pass
+
+    async def set_many_raw(self, items: List[Tuple[str, str, float]]):
+        """
+        批量写入已序列化为JSON的缓存项（批量导入时跳过逐条构造缓存模型）
+
+        Args:
+            items: (缓存键, 缓存项JSON, 过期时间戳) 列表
+        """
+        await self.set_many([
+            (key, CacheModel.model_validate_json(raw), expires_at) for key, raw, expires_at in items
+        ])
+
+    @asynccontextmanager
+    async def bulk_load(self) -> AsyncIterator[None]:
+        """批量导入期间的写入模式，默认不做调整"""
+        yield
+
+    @abstractmethod
+    async def delete_many(self, keys: List[str]):
+        """批量删除缓存项"""
+        pass
+
+    @abstractmethod
+    async def clear(self):
+        """清空共享缓存"""
+        pass
+
+    @abstractmethod
+    def scan_keys(self) -> AsyncIterator[str]:
+        """遍历共享缓存中的所有缓存键（用于键版本迁移等维护操作）"""
+        pass
+
+    async def get(self, key: str) -> Optional[CacheModel]:
+        """读取单个缓存项"""
+        return (await self.get_many([key]))[0]
+
+    async def compact(self, vacuum: bool = False) -> int:
+        """
+        压缩存储，删除已过期的缓存项
+
+        Args:
+            vacuum: 是否完整重建存储文件（支持的后端）
+
+        Returns:
+            int: 删除的缓存项数量（自带过期机制的后端返回0）
+        """
+        return 0
+
+    async def aclose(self):
+        """释放连接、执行器等资源"""
+        pass
+
+
+class RedisCacheBackend(SharedCacheBackend):
+    """基于Redis的共享缓存后端，读写均使用MGET/pipeline减少往返"""
+
+    name = "redis"
+
+    def __init__(
+        self,
+        client: Any = None,
+        url: Optional[str] = None,
+        key_prefix: str = "translation_cache:"
+    ):
+        if client is None:
+            if aioredis is None:
+                raise RuntimeError("使用Redis缓存后端需要安装redis包")
+            client = aioredis.from_url(url or settings.REDIS_URL)
+            # 只关闭自己创建的连接，传入的客户端由调用方管理
+            self._owns_client = True
+        else:
+            self._owns_client = False
+
+        self.client = client
+        self.key_prefix = key_prefix
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.key_prefix}{key}"
+
+    async def get_many(self, keys: List[str]) -> List[Optional[CacheModel]]:
+        if not keys:
+            return []
+
+        raw_values = await self.client.mget([self._redis_key(key) for key in keys])
+
+        results = []
+        for raw in raw_values:
+            if raw is None:
+                results.append(None)
+                continue
+            try:
+                results.append(CacheModel.model_validate_json(raw))
+            except ValueError:
+                # 无法解析的旧数据视为未命中
+                results.append(None)
+        return results
+
+    async def set_many(self, items: List[Tuple[str, CacheModel, float]]):
+        if not items:
+            return
+
+        now = time.time()
+        pipe = self.client.pipeline(transaction=False)
+        for key, value, expires_at in items:
+            ttl = int(expires_at - now)
+            if ttl <= 0:
+                continue
+            pipe.set(self._redis_key(key), value.model_dump_json(), ex=ttl)
+        await pipe.execute()
+
+    async def set_many_raw(self, items: List[Tuple[str, str, float]]):
+        if not items:
+            return
+
+        now = time.time()
+        pipe = self.client.pipeline(transaction=False)
+        for key, raw, expires_at in items:
+            ttl = int(expires_at - now)
+            if ttl > 0:
+                pipe.set(self._redis_key(key), raw, ex=ttl)
+        await pipe.execute()
+
+    async def delete_many(self, keys: List[str]):
+        if keys:
+            await self.client.delete(*[self._redis_key(key) for key in keys])
+
+    async def scan_keys(self) -> AsyncIterator[str]:
+        prefix_length = len(self.key_prefix)
+        async for redis_key in self.client.scan_iter(match=f"{self.key_prefix}*", count=1000):
+            if isinstance(redis_key, bytes):
+                redis_key = redis_key.decode("utf-8")
+            yield redis_key[prefix_length:]
+
+    async def clear(self):
+        batch = []
+        async for redis_key in self.client.scan_iter(match=f"{self.key_prefix}*", count=1000):
+            batch.append(redis_key)
+            if len(batch) >= 1000:
+                await self.client.delete(*batch)
+                batch = []
+        if batch:
+            await self.client.delete(*batch)
+
+    async def aclose(self):
+        if self._owns_client:
+            await self.client.aclose()
+
+
+class SQLiteCacheBackend(SharedCacheBackend):
+    """
+    基于SQLite（WAL模式）的持久化缓存后端
+
+    - 重启后缓存仍然有效；启动时只打开数据库，不加载数据，L1在未命中时按需从磁盘读取
+    - 开启 mmap_size 后读取直接走内存映射的页缓存，避免逐页read系统调用
+    - WAL模式下同一主机的多个worker进程可以并发读，写入互不阻塞读
+    - 所有数据库操作在单线程执行器中串行执行，不阻塞事件循环
+    - 批量导入期间多批写入合并为一个事务提交，关闭WAL自动检查点并加大页缓存，导入结束后一次性检查点
+    - 压缩在独立的连接和执行器中进行：过期项分批删除，空闲页用 incremental_vacuum 分步归还，
+      期间读写不排在压缩后面；完整的VACUUM需显式指定
+    """
+
+    name = "sqlite"
+
+    # SQLite单条语句的参数个数上限较低，批量查询分块执行
+    _MAX_QUERY_PARAMS = 500
+    # 批量导入期间的页缓存大小（负数为KiB）
+    _BULK_CACHE_SIZE = -65536
+    # 批量导入期间累计写入这么多行才提交一次
+    _BULK_COMMIT_ROWS = 50000
+    _INSERT_SQL = "INSERT OR REPLACE INTO translation_cache (key, value, expires_at) VALUES (?, ?, ?)"
+    # 压缩时每个事务删除的过期项数和归还的空闲页数，单步持有写锁的时间都很短
+    _COMPACT_DELETE_ROWS = 10000
+    _COMPACT_VACUUM_PAGES = 1000
+
+    def __init__(self, path: Optional[str] = None, mmap_size: Optional[int] = None):
+        self.path = path or settings.CACHE_SQLITE_PATH
+        self.mmap_size = settings.CACHE_SQLITE_MMAP_SIZE if mmap_size is None else mmap_size
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-cache")
+        # 压缩使用独立的连接和执行器，首次压缩时创建
+        self._maintenance_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-cache-compact")
+        self._maintenance_conn: Optional[sqlite3.Connection] = None
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        # 只对新建的数据库生效（已有数据库执行一次完整VACUUM后生效）
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        self._default_cache_size = self._conn.execute("PRAGMA cache_size").fetchone()[0]
+        # 进行中的批量导入数，第一个开始时进入批量写入模式，最后一个结束时恢复
+        self._bulk_loads = 0
+        self._bulk_uncommitted = 0
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translation_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_translation_cache_expires_at "
+            "ON translation_cache (expires_at)"
+        )
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """在主连接上提交一个事务；批量导入中尚未提交的行随之提交（出错时随之回滚）"""
+        try:
+            with self._conn:
+                yield
+        finally:
+            self._bulk_uncommitted = 0
+
+    def _get_many_sync(self, keys: List[str]) -> List[Optional[CacheModel]]:
+        now = time.time()
+        rows = {}
+        for start in range(0, len(keys), self._MAX_QUERY_PARAMS):
+            chunk = keys[start:start + self._MAX_QUERY_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            rows.update(self._conn.execute(
+                f"SELECT key, value FROM translation_cache "
+                f"WHERE key IN ({placeholders}) AND expires_at > ?",
+                (*chunk, now)
+            ).fetchall())
+
+        results = []
+        for key in keys:
+            raw = rows.get(key)
+            if raw is None:
+                results.append(None)
+                continue
+            try:
+                results.append(CacheModel.model_validate_json(raw))
+            except ValueError:
+                results.append(None)
+        return results
+
+    def _set_many_sync(self, items: List[Tuple[str, CacheModel, float]]):
+        # 普通写入立即提交（同时提交批量导入中尚未提交的行）
+        with self._transaction():
+            self._conn.executemany(
+                self._INSERT_SQL,
+                [(key, value.model_dump_json(), expires_at) for key, value, expires_at in items]
+            )
+
+    def _set_many_raw_sync(self, rows: List[Tuple[str, str, float]]):
+        # 按主键顺序插入，B树页的写入更集中
+        rows.sort()
+        if not self._bulk_loads:
+            with self._transaction():
+                self._conn.executemany(self._INSERT_SQL, rows)
+            return
+
+        # 键是随机哈希，每个事务几乎改写所有叶子页；批量导入时多批合并提交，减少重复写出的页
+        try:
+            self._conn.executemany(self._INSERT_SQL, rows)
+        except Exception:
+            self._conn.rollback()
+            self._bulk_uncommitted = 0
+            raise
+        self._bulk_uncommitted += len(rows)
+        if self._bulk_uncommitted >= self._BULK_COMMIT_ROWS:
+            self._conn.commit()
+            self._bulk_uncommitted = 0
+
+    def _bulk_mode_sync(self, enabled: bool):
+        if enabled:
+            self._conn.execute(f"PRAGMA cache_size={self._BULK_CACHE_SIZE}")
+            # 自动检查点会在每次提交后把WAL中的随机页写回数据库文件，是批量写入的主要开销
+            self._conn.execute("PRAGMA wal_autocheckpoint=0")
+        else:
+            self._conn.commit()
+            self._bulk_uncommitted = 0
+            self._conn.execute("PRAGMA wal_autocheckpoint=1000")
+            self._conn.execute(f"PRAGMA cache_size={self._default_cache_size}")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def _delete_many_sync(self, keys: List[str]):
+        with self._transaction():
+            self._conn.executemany(
+                "DELETE FROM translation_cache WHERE key = ?", [(key,) for key in keys]
+            )
+
+    def _scan_keys_sync(self, after: str, limit: int) -> List[str]:
+        rows = self._conn.execute(
+            "SELECT key FROM translation_cache WHERE key > ? ORDER BY key LIMIT ?",
+            (after, limit)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def _compact_sync(self, vacuum: bool) -> int:
+        # 两个连接争用写锁时按sqlite3默认的超时等待
+        if self._maintenance_conn is None:
+            self._maintenance_conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn = self._maintenance_conn
+
+        now = time.time()
+        removed = 0
+        while True:
+            with conn:
+                deleted = conn.execute(
+                    "DELETE FROM translation_cache WHERE key IN ("
+                    "SELECT key FROM translation_cache WHERE expires_at <= ? LIMIT ?)",
+                    (now, self._COMPACT_DELETE_ROWS)
+                ).rowcount
+            removed += deleted
+            if deleted < self._COMPACT_DELETE_ROWS:
+                break
+
+        if vacuum:
+            # 重建整个数据库文件，期间阻塞其他连接的写入
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            return removed
+
+        # auto_vacuum=INCREMENTAL（值为2）时分步把空闲页归还给文件系统
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            while conn.execute("PRAGMA freelist_count").fetchone()[0]:
+                conn.execute(f"PRAGMA incremental_vacuum({self._COMPACT_VACUUM_PAGES})").fetchall()
+        conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        return removed
+
+    async def get_many(self, keys: List[str]) -> List[Optional[CacheModel]]:
+        if not keys:
+            return []
+        return await self._run(self._get_many_sync, keys)
+
+    async def set_many(self, items: List[Tuple[str, CacheModel, float]]):
+        if items:
+            await self._run(self._set_many_sync, items)
+
+    async def set_many_raw(self, items: List[Tuple[str, str, float]]):
+        if items:
+            await self._run(self._set_many_raw_sync, list(items))
+
+    @asynccontextmanager
+    async def bulk_load(self) -> AsyncIterator[None]:
+        self._bulk_loads += 1
+        try:
+            if self._bulk_loads == 1:
+                await self._run(self._bulk_mode_sync, True)
+            yield
+        finally:
+            self._bulk_loads -= 1
+            if self._bulk_loads == 0:
+                await self._run(self._bulk_mode_sync, False)
+
+    async def delete_many(self, keys: List[str]):
+        if keys:
+            await self._run(self._delete_many_sync, keys)
+
+    async def scan_keys(self) -> AsyncIterator[str]:
+        # 按主键分页遍历，遍历期间允许删除/写入
+        after = ""
+        while True:
+            keys = await self._run(self._scan_keys_sync, after, 1000)
+            for key in keys:
+                yield key
+            if len(keys) < 1000:
+                break
+            after = keys[-1]
+
+    def _clear_sync(self):
+        with self._transaction():
+            self._conn.execute("DELETE FROM translation_cache")
+
+    async def clear(self):
+        await self._run(self._clear_sync)
+
+    async def compact(self, vacuum: bool = False) -> int:
+        """
+        删除过期缓存项并回收空闲页，在独立的连接中分批执行，不阻塞缓存读写
+
+        Args:
+            vacuum: 是否执行完整的VACUUM重建数据库文件（期间阻塞写入；已有数据库需执行一次才能分步回收）
+
+        Returns:
+            int: 删除的缓存项数量
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._maintenance_executor, self._compact_sync, vacuum)
+
+    async def aclose(self):
+        self.close()
+
+    def close(self):
+        """关闭数据库连接"""
+        self._maintenance_executor.shutdown(wait=True)
+        if self._maintenance_conn is not None:
+            self._maintenance_conn.close()
+        self._executor.shutdown(wait=True)
+        self._conn.close()
+
+
+def create_shared_backend() -> Optional[SharedCacheBackend]:
+    """
+    根据配置创建共享缓存后端
+
+    Returns:
+        Optional[SharedCacheBackend]: CACHE_BACKEND=memory 时返回None（仅使用进程内缓存），
+        redis 为跨主机共享缓存，sqlite 为本机持久化缓存
+    """
+    backend = settings.CACHE_BACKEND.lower()
+
+    if backend == "memory":
+        return None
+    if backend == "redis":
+        return RedisCacheBackend(url=settings.REDIS_URL)
+    if backend == "sqlite":
+        return SQLiteCacheBackend(path=settings.CACHE_SQLITE_PATH)
+
+    raise ValueError(f"Unsupported cache backend: {settings.CACHE_BACKEND}")
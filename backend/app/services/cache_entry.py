@@ -0,0 +1,149 @@
+"""
+翻译缓存的紧凑条目
+进程内L1只保存 __slots__ 条目，Pydantic缓存模型仅在写入L2或返回给API时构建
+"""
+import sys
+import zlib
+from datetime import datetime
+from typing import Optional, Tuple, Union
+
+from ..schemas.translation import LanguageCode, TranslationProvider, TranslationCache as CacheModel
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard为可选依赖，缺失时使用zlib
+    zstandard = None
+
+if zstandard is not None:
+    _compressor = zstandard.ZstdCompressor(level=3)
+    _decompressor = zstandard.ZstdDecompressor()
+    _compress = _compressor.compress
+    _decompress = _decompressor.decompress
+else:
+    _compress = zlib.compress
+    _decompress = zlib.decompress
+
+# 源文本或译文编码后超过该字节数时压缩保存，<=0 表示不压缩
+DEFAULT_COMPRESS_MIN_BYTES = 512
+
+
+def _pack_text(text: str, compress_min_bytes: int) -> Tuple[Union[str, bytes], int]:
+    """
+    压缩较长的文本
+
+    Returns:
+        Tuple[Union[str, bytes], int]: (原字符串，或压缩后更小时的压缩字节, UTF-8字节数)
+    """
+    encoded = text.encode('utf-8')
+    if compress_min_bytes <= 0 or len(encoded) < compress_min_bytes:
+        return text, len(encoded)
+    compressed = _compress(encoded)
+    return (compressed if len(compressed) < len(encoded) else text), len(encoded)
+
+
+def _unpack_text(value: Union[str, bytes]) -> str:
+    if isinstance(value, str):
+        return value
+    return _decompress(value).decode('utf-8')
+
+
+class CacheEntry:
+    """
+    L1缓存条目
+
+    - __slots__ 避免每个条目的 __dict__，时间用时间戳而不是datetime
+    - 语言代码和提供商保存为枚举值/枚举单例，模型名驻留，多个条目共享同一对象
+    - 长文本压缩保存，只在命中（读取 source_text/translated_text）时解压
+    """
+
+    __slots__ = (
+        "_source", "_translated", "text_bytes", "source_language", "target_language",
+        "provider", "model_used", "quality_score", "hit_count", "created_at", "last_used_at"
+    )
+
+    def __init__(
+        self,
+        source_text: str,
+        translated_text: str,
+        source_language: str,
+        target_language: str,
+        provider: TranslationProvider,
+        model_used: Optional[str],
+        quality_score: float,
+        hit_count: int,
+        created_at: float,
+        last_used_at: float,
+        compress_min_bytes: int = DEFAULT_COMPRESS_MIN_BYTES
+    ):
+        self._source, source_bytes = _pack_text(source_text, compress_min_bytes)
+        self._translated, translated_bytes = _pack_text(translated_text, compress_min_bytes)
+        # 原文和译文的UTF-8字节数，供统计使用，避免统计时解压或重新编码
+        self.text_bytes = source_bytes + translated_bytes
+        # 校验语言代码，并保存枚举值本身（所有条目共享同一个字符串对象）
+        self.source_language = LanguageCode(source_language).value
+        self.target_language = LanguageCode(target_language).value
+        self.provider = provider
+        self.model_used = sys.intern(model_used) if model_used else None
+        self.quality_score = quality_score
+        self.hit_count = hit_count
+        self.created_at = created_at
+        self.last_used_at = last_used_at
+
+    @property
+    def source_text(self) -> str:
+        """源文本（压缩保存时解压）"""
+        return _unpack_text(self._source)
+
+    @property
+    def translated_text(self) -> str:
+        """译文（压缩保存时解压）"""
+        return _unpack_text(self._translated)
+
+    @property
+    def is_compressed(self) -> bool:
+        """是否有文本以压缩形式保存"""
+        return isinstance(self._source, bytes) or isinstance(self._translated, bytes)
+
+    @classmethod
+    def from_model(
+        cls,
+        cache_item: CacheModel,
+        compress_min_bytes: int = DEFAULT_COMPRESS_MIN_BYTES
+    ) -> "CacheEntry":
+        """从缓存模型（如L2读取结果）构建条目"""
+        return cls(
+            cache_item.source_text,
+            cache_item.translated_text,
+            cache_item.source_language,
+            cache_item.target_language,
+            cache_item.provider,
+            cache_item.model_used,
+            cache_item.quality_score,
+            cache_item.hit_count,
+            cache_item.created_at.timestamp(),
+            cache_item.last_used_at.timestamp(),
+            compress_min_bytes
+        )
+
+    def to_model(self, cache_key: str) -> CacheModel:
+        """构建缓存模型（写入L2或返回给API时使用），条目创建时已校验语言代码，这里跳过Pydantic校验"""
+        return CacheModel.model_construct(
+            id=cache_key,
+            source_text=self.source_text,
+            translated_text=self.translated_text,
+            source_language=LanguageCode(self.source_language),
+            target_language=LanguageCode(self.target_language),
+            provider=self.provider,
+            model_used=self.model_used,
+            quality_score=self.quality_score,
+            hit_count=self.hit_count,
+            created_at=datetime.fromtimestamp(self.created_at),
+            last_used_at=datetime.fromtimestamp(self.last_used_at)
+        )
+
+    def copy(self) -> "CacheEntry":
+        """浅拷贝条目（文本保持原有的压缩形式）"""
+        clone = CacheEntry.__new__(CacheEntry)
+        for slot in CacheEntry.__slots__:
+            setattr(clone, slot, getattr(self, slot))
+        return clone
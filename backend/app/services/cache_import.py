@@ -0,0 +1,274 @@
+"""
+翻译缓存批量导入
+流式读取缓存导出文件（NDJSON，或 scripts/backup_restore.py 导出的JSON）以及逐行对齐的双语语料，
+分批写入 TranslationCache；任何时候内存中只保留读缓冲区和至多两个批次
+"""
+import asyncio
+import json
+import logging
+import math
+import re
+from itertools import zip_longest
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from ..schemas.translation import LanguageCode, TranslationProvider
+
+logger = logging.getLogger(__name__)
+
+_READ_SIZE = 1 << 16
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[\s,]*")
+# backup_restore.py 导出文件中翻译缓存表所在的数组
+_EXPORT_TABLE = re.compile(r'"translation_cache"\s*:\s*\[')
+# 取值 -> 规范值，查表校验比逐条构造枚举快
+_LANGUAGE_CODES = {code.value: code.value for code in LanguageCode}
+_PROVIDERS = {provider.value: provider for provider in TranslationProvider}
+# 按NDJSON解析的文件扩展名
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+
+class ImportRecord(NamedTuple):
+    """一条待导入的翻译"""
+    source_text: str
+    translated_text: str
+    source_language: str
+    target_language: str
+    provider: TranslationProvider
+    model_used: Optional[str]
+    quality_score: float
+
+
+def is_ndjson_file(filename: str) -> bool:
+    """根据文件名判断是否为NDJSON"""
+    return filename.lower().endswith(NDJSON_SUFFIXES)
+
+
+def iter_ndjson(stream: TextIO) -> Iterator[Any]:
+    """逐行解析NDJSON，跳过空行"""
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def iter_json_export(stream: TextIO) -> Iterator[Any]:
+    """
+    流式解析JSON导出文件中的记录
+
+    支持顶层为记录数组，或 backup_restore.py 的导出格式（data.translation_cache 数组），
+    逐个解码数组元素，不把整个文件读入内存
+    """
+    buffer = stream.read(_READ_SIZE).lstrip("\ufeff")
+    pos = _WHITESPACE.match(buffer).end()
+    while pos == len(buffer):
+        chunk = stream.read(_READ_SIZE)
+        if not chunk:
+            return
+        buffer = buffer[pos:] + chunk
+        pos = _WHITESPACE.match(buffer).end()
+
+    if buffer[pos] == "[":
+        pos += 1
+    else:
+        # 查找翻译缓存表数组的起始位置，未找到时只保留可能跨块的尾部
+        while True:
+            match = _EXPORT_TABLE.search(buffer, pos)
+            if match:
+                pos = match.end()
+                break
+            chunk = stream.read(_READ_SIZE)
+            if not chunk:
+                raise ValueError("导出文件中没有 translation_cache 数据")
+            pos = 0
+            buffer = buffer[-64:] + chunk
+
+    while True:
+        pos = _WHITESPACE.match(buffer, pos).end()
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        try:
+            if pos == len(buffer):
+                raise json.JSONDecodeError("数据不完整", buffer, pos)
+            record, pos = _DECODER.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # 元素跨越了读缓冲区边界，补读后重试
+            chunk = stream.read(_READ_SIZE)
+            if not chunk:
+                raise
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        yield record
+        if pos >= _READ_SIZE:
+            buffer = buffer[pos:]
+            pos = 0
+
+
+def iter_aligned_pairs(
+    source_stream: TextIO, target_stream: TextIO
+) -> Iterator[Optional[Tuple[str, str]]]:
+    """
+    逐行读取对齐语料
+
+    Yields:
+        Optional[Tuple[str, str]]: (原文, 译文)；任一侧为空行或行数不一致时为None
+    """
+    for source_line, target_line in zip_longest(source_stream, target_stream):
+        source_text = (source_line or "").strip()
+        target_text = (target_line or "").strip()
+        if source_text and target_text:
+            yield source_text, target_text
+        elif source_text or target_text:
+            yield None
+
+
+class CacheImporter:
+    """
+    翻译缓存批量导入器
+
+    解析出的记录按 batch_size 分批交给 TranslationCache.import_translations；
+    写入上一批的同时解析下一批，L2写入和解析重叠进行
+    """
+
+    def __init__(
+        self,
+        cache,
+        source_language: LanguageCode = LanguageCode.ENGLISH,
+        target_language: LanguageCode = LanguageCode.CHINESE,
+        provider: TranslationProvider = TranslationProvider.GOOGLE,
+        model: Optional[str] = None,
+        quality_score: float = 0.8,
+        batch_size: int = 1000
+    ):
+        """
+        Args:
+            cache: 目标 TranslationCache
+            source_language: 记录中没有源语言时（以及对齐语料）使用的源语言
+            target_language: 记录中没有目标语言时（以及对齐语料）使用的目标语言
+            provider: 记录中没有提供商时使用的提供商
+            model: 对齐语料写入的模型名，需与查询时传入的一致
+            quality_score: 记录中没有质量分数时使用的分数
+            batch_size: 每批写入的记录数
+        """
+        self.cache = cache
+        self.source_language = LanguageCode(source_language).value
+        self.target_language = LanguageCode(target_language).value
+        self.provider = provider
+        self.model = model
+        self.quality_score = quality_score
+        self.batch_size = batch_size
+
+    async def import_export(self, stream: TextIO, ndjson: bool = False) -> Dict[str, int]:
+        """导入缓存导出文件（NDJSON或JSON）"""
+        records = iter_ndjson(stream) if ndjson else iter_json_export(stream)
+        return await self._load(self._record_from_dict(data) for data in records)
+
+    async def import_aligned(self, source_stream: TextIO, target_stream: TextIO) -> Dict[str, int]:
+        """导入逐行对齐的双语语料"""
+        return await self._load(
+            pair and ImportRecord(
+                pair[0], pair[1], self.source_language, self.target_language,
+                self.provider, self.model, self.quality_score
+            )
+            for pair in iter_aligned_pairs(source_stream, target_stream)
+        )
+
+    def _record_from_dict(self, data: Any) -> Optional[ImportRecord]:
+        """把导出记录转换为导入记录，字段缺失或取值无效时返回None"""
+        if not isinstance(data, dict):
+            return None
+        # 缓存模型使用 source_text，数据库表使用 original_text
+        source_text = data.get("source_text") or data.get("original_text")
+        translated_text = data.get("translated_text")
+        if not isinstance(source_text, str) or not isinstance(translated_text, str):
+            return None
+        if not source_text.strip() or not translated_text.strip():
+            return None
+
+        try:
+            source_language = _LANGUAGE_CODES.get(
+                data.get("source_language") or self.source_language
+            )
+            target_language = _LANGUAGE_CODES.get(
+                data.get("target_language") or self.target_language
+            )
+            provider = _PROVIDERS.get(data.get("provider") or self.provider)
+        except TypeError:
+            return None
+        if source_language is None or target_language is None or provider is None:
+            return None
+
+        quality_score = data.get("quality_score")
+        try:
+            quality_score = self.quality_score if quality_score is None else float(quality_score)
+        except (TypeError, ValueError):
+            return None
+        if not math.isfinite(quality_score):
+            return None
+        model_used = data.get("model_used") or self.model
+        if model_used is not None and not isinstance(model_used, str):
+            return None
+        return ImportRecord(
+            source_text,
+            translated_text,
+            source_language,
+            target_language,
+            provider,
+            model_used,
+            quality_score
+        )
+
+    async def _load(self, records: Iterable[Optional[ImportRecord]]) -> Dict[str, int]:
+        """分批写入缓存，返回导入统计；读文件和解析在线程中进行，不阻塞事件循环"""
+        stats = {"imported": 0, "skipped": 0, "l1_loaded": 0, "l2_loaded": 0}
+        pending: Optional[asyncio.Task] = None
+        records = iter(records)
+
+        def next_batch() -> Tuple[List[ImportRecord], int]:
+            batch: List[ImportRecord] = []
+            skipped = 0
+            for record in records:
+                if record is None:
+                    skipped += 1
+                    continue
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    break
+            return batch, skipped
+
+        async def collect(pending: asyncio.Task):
+            loaded = await pending
+            stats["l1_loaded"] += loaded["l1_loaded"]
+            stats["l2_loaded"] += loaded["l2_loaded"]
+
+        async def flush(batch: List[ImportRecord], pending: Optional[asyncio.Task]) -> asyncio.Task:
+            if pending is not None:
+                await collect(pending)
+            task = asyncio.ensure_future(self.cache.import_translations(batch))
+            # 让写入任务先完成L1写入并提交L2写入，再继续解析下一批
+            await asyncio.sleep(0)
+            stats["imported"] += len(batch)
+            return task
+
+        # 批量写入模式覆盖整个导入，退出前等待或取消最后一批的写入
+        async with self.cache.bulk_import():
+            try:
+                while True:
+                    # 上一批写入缓存的同时，在线程中解析下一批
+                    batch, skipped = await asyncio.to_thread(next_batch)
+                    stats["skipped"] += skipped
+                    if not batch:
+                        break
+                    pending = await flush(batch, pending)
+                if pending is not None:
+                    await collect(pending)
+                    pending = None
+            finally:
+                if pending is not None and not pending.done():
+                    pending.cancel()
+
+        logger.info(
+            f"缓存导入完成: 导入 {stats['imported']} 条，跳过 {stats['skipped']} 条，"
+            f"加载到L1 {stats['l1_loaded']} 条，写入L2 {stats['l2_loaded']} 条"
+        )
+        return stats
@@ -0,0 +1,146 @@
+"""
+翻译缓存倒排索引
+为 TranslationCache.search_cache 提供按词项检索，随缓存写入/淘汰增量维护
+"""
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+
+# 拉丁字母/数字等按单词切分，CJK字符按二元组切分
+_CJK_RANGES = (
+    '぀-ヿ'   # 日文假名
+    '㐀-䶿'   # CJK扩展A
+    '一-鿿'   # CJK统一汉字
+    '가-힯'   # 韩文音节
+    '豈-﫿'   # CJK兼容汉字
+)
+_TOKEN_PATTERN = re.compile(f'([{_CJK_RANGES}]+)|([^\\W{_CJK_RANGES}]+)')
+
+# 过滤条件作为特殊词项写入倒排表，与查询词项一起求交集
+_FACET_PREFIX = '\x00'
+
+
+def tokenize(text: str) -> Set[str]:
+    """
+    切分文本为检索词项
+
+    英文等按单词（小写），CJK连续字符按相邻二元组，单个CJK字符保留为一元组
+
+    Args:
+        text: 文本
+
+    Returns:
+        Set[str]: 词项集合
+    """
+    tokens = set()
+    for cjk_run, word in _TOKEN_PATTERN.findall(text.lower()):
+        if word:
+            tokens.add(word)
+        elif len(cjk_run) == 1:
+            tokens.add(cjk_run)
+        else:
+            tokens.update(cjk_run[i:i + 2] for i in range(len(cjk_run) - 1))
+    return tokens
+
+
+def facet_token(field: str, value: str) -> str:
+    """过滤条件对应的词项"""
+    return f"{_FACET_PREFIX}{field}:{value}"
+
+
+class CacheSearchIndex:
+    """
+    缓存倒排索引
+
+    - 词项 -> 缓存键集合；语言对、提供商作为特殊词项，过滤与检索统一为求交集
+    - 求交集时从最短的倒排表开始逐个校验，代价与匹配的倒排项数量相关，与缓存总量无关
+    - 记录每个缓存键写入时的词项，删除时精确撤销
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[str]] = {}
+        self._doc_tokens: Dict[str, Tuple[str, ...]] = {}
+
+    def add(
+        self,
+        key: str,
+        source_text: str,
+        translated_text: str,
+        facets: Iterable[str] = ()
+    ):
+        """
+        索引缓存项（已存在的键会先撤销旧词项）
+
+        Args:
+            key: 缓存键
+            source_text: 源文本
+            translated_text: 译文
+            facets: 过滤词项，见 facet_token
+        """
+        if key in self._doc_tokens:
+            self.remove(key)
+
+        tokens = tokenize(source_text) | tokenize(translated_text)
+        tokens.update(facets)
+
+        postings = self._postings
+        for token in tokens:
+            posting = postings.get(token)
+            if posting is None:
+                postings[token] = {key}
+            else:
+                posting.add(key)
+        self._doc_tokens[key] = tuple(tokens)
+
+    def remove(self, key: str) -> bool:
+        """撤销缓存项的索引"""
+        tokens = self._doc_tokens.pop(key, None)
+        if tokens is None:
+            return False
+
+        postings = self._postings
+        for token in tokens:
+            posting = postings.get(token)
+            if posting is None:
+                continue
+            posting.discard(key)
+            if not posting:
+                del postings[token]
+        return True
+
+    def search(self, query: str, facets: Iterable[str] = ()) -> Set[str]:
+        """
+        查找同时包含所有查询词项和过滤词项的缓存键
+
+        Args:
+            query: 查询文本，为空时只按过滤条件匹配
+            facets: 过滤词项
+
+        Returns:
+            Set[str]: 匹配的缓存键
+        """
+        terms = tokenize(query)
+        terms.update(facets)
+        if not terms:
+            return set(self._doc_tokens)
+
+        posting_lists: List[Set[str]] = []
+        for term in terms:
+            posting = self._postings.get(term)
+            if not posting:
+                return set()
+            posting_lists.append(posting)
+
+        posting_lists.sort(key=len)
+        smallest, rest = posting_lists[0], posting_lists[1:]
+        return {key for key in smallest if all(key in posting for posting in rest)}
+
+    def clear(self):
+        """清空索引"""
+        self._postings.clear()
+        self._doc_tokens.clear()
+
+    def __len__(self) -> int:
+        return len(self._doc_tokens)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._doc_tokens
@@ -0,0 +1,172 @@
+"""
+翻译缓存统计
+随缓存写入、命中、淘汰增量维护计数，统计接口无需遍历缓存
+"""
+import heapq
+import time
+from collections import Counter
+from datetime import datetime
+from typing import List, Optional
+
+from .cache_entry import CacheEntry
+
+# 效率分析的分档阈值
+HIGH_HIT_COUNT = 5
+HIGH_QUALITY_SCORE = 0.8
+LOW_QUALITY_SCORE = 0.6
+
+_SECONDS_PER_DAY = 86400
+
+
+def _day(timestamp: float) -> int:
+    """时间戳所在的天序号"""
+    return int(timestamp // _SECONDS_PER_DAY)
+
+
+class CacheStatistics:
+    """
+    缓存内容统计
+
+    - 条目数、字节数、命中次数、质量分数之和，以及提供商/语言对分布，写入和移除时加减
+    - 命中次数和质量分数按效率报告的阈值分档计数，命中时在档位间移动
+    - 最近使用时间按天分桶，桶数不超过缓存中不同使用日期的数量（受TTL约束），
+      “最近N天”的判断精度为一天
+    - 创建时间的最早/最晚值用两个惰性删除的堆维护，读取时弹出已无缓存项的时间戳
+    """
+
+    def __init__(self):
+        self.total_items = 0
+        self.total_bytes = 0
+        self.total_hits = 0
+        self.total_quality = 0.0
+
+        self.provider_counts: Counter = Counter()
+        self.language_pair_counts: Counter = Counter()
+
+        self.high_hit_items = 0
+        self.single_hit_items = 0
+        self.high_quality_items = 0
+        self.low_quality_items = 0
+
+        # 最近使用的天序号 -> 缓存项数量
+        self._last_used_days: Counter = Counter()
+        # 创建时间戳 -> 缓存项数量，以及对应的最小堆/最大堆（取负）
+        self._created_counts: Counter = Counter()
+        self._created_min_heap: List[float] = []
+        self._created_max_heap: List[float] = []
+
+    def add(self, item: CacheEntry):
+        """缓存项写入"""
+        self._apply(item, 1)
+
+        created = item.created_at
+        if self._created_counts[created] == 0:
+            heapq.heappush(self._created_min_heap, created)
+            heapq.heappush(self._created_max_heap, -created)
+        self._created_counts[created] += 1
+
+    def remove(self, item: CacheEntry):
+        """缓存项淘汰、过期、删除或被覆盖"""
+        self._apply(item, -1)
+
+        created = item.created_at
+        self._created_counts[created] -= 1
+        if self._created_counts[created] <= 0:
+            del self._created_counts[created]
+
+        if self.total_items == 0:
+            # 消除浮点累加误差
+            self.total_quality = 0.0
+        if len(self._created_min_heap) > 2 * len(self._created_counts) + 64:
+            self._rebuild_created_heaps()
+
+    def record_hit(self, item: CacheEntry, now: float):
+        """
+        缓存项命中，需在更新 hit_count 和 last_used_at 之前调用
+
+        Args:
+            item: 命中的缓存项
+            now: 命中时间戳
+        """
+        hit_count = item.hit_count
+        # 导入的缓存项从0次命中开始，第一次命中时进入单次命中档
+        if hit_count == 0:
+            self.single_hit_items += 1
+        elif hit_count == 1:
+            self.single_hit_items -= 1
+        if hit_count + 1 > HIGH_HIT_COUNT >= hit_count:
+            self.high_hit_items += 1
+        self.total_hits += 1
+
+        old_day = _day(item.last_used_at)
+        new_day = _day(now)
+        if old_day != new_day:
+            self._decrement(self._last_used_days, old_day)
+            self._last_used_days[new_day] += 1
+
+    def _apply(self, item: CacheEntry, sign: int):
+        """按符号累加或撤销缓存项的贡献"""
+        self.total_items += sign
+        self.total_bytes += sign * item.text_bytes
+        self.total_hits += sign * item.hit_count
+        self.total_quality += sign * item.quality_score
+
+        provider = item.provider.value
+        pair = f"{item.source_language}-{item.target_language}"
+        day = _day(item.last_used_at)
+        if sign > 0:
+            self.provider_counts[provider] += 1
+            self.language_pair_counts[pair] += 1
+            self._last_used_days[day] += 1
+        else:
+            self._decrement(self.provider_counts, provider)
+            self._decrement(self.language_pair_counts, pair)
+            self._decrement(self._last_used_days, day)
+
+        if item.hit_count > HIGH_HIT_COUNT:
+            self.high_hit_items += sign
+        elif item.hit_count == 1:
+            self.single_hit_items += sign
+        if item.quality_score > HIGH_QUALITY_SCORE:
+            self.high_quality_items += sign
+        elif item.quality_score < LOW_QUALITY_SCORE:
+            self.low_quality_items += sign
+
+    @staticmethod
+    def _decrement(counter: Counter, key):
+        counter[key] -= 1
+        if counter[key] <= 0:
+            del counter[key]
+
+    def used_within_days(self, days: int, now: Optional[float] = None) -> int:
+        """最近days天内使用过的缓存项数量（含今天）"""
+        cutoff = _day(time.time() if now is None else now) - days
+        return sum(count for day, count in self._last_used_days.items() if day > cutoff)
+
+    def unused_for_days(self, days: int, now: Optional[float] = None) -> int:
+        """超过days天未使用的缓存项数量"""
+        cutoff = _day(time.time() if now is None else now) - days
+        return sum(count for day, count in self._last_used_days.items() if day < cutoff)
+
+    @property
+    def oldest_created_at(self) -> Optional[datetime]:
+        """最早的创建时间"""
+        heap = self._created_min_heap
+        while heap and heap[0] not in self._created_counts:
+            heapq.heappop(heap)
+        return datetime.fromtimestamp(heap[0]) if heap else None
+
+    @property
+    def newest_created_at(self) -> Optional[datetime]:
+        """最晚的创建时间"""
+        heap = self._created_max_heap
+        while heap and -heap[0] not in self._created_counts:
+            heapq.heappop(heap)
+        return datetime.fromtimestamp(-heap[0]) if heap else None
+
+    def _rebuild_created_heaps(self):
+        """丢弃堆中已无缓存项的时间戳"""
+        self._created_min_heap = list(self._created_counts)
+        heapq.heapify(self._created_min_heap)
+        self._created_max_heap = [-created for created in self._created_counts]
+        heapq.heapify(self._created_max_heap)
@@ -0,0 +1,81 @@
+"""
+进程内共享的服务容器
+翻译引擎（及其缓存、成本跟踪、任务队列）、文档处理器和线程池每个进程只创建一份，
+API端点通过依赖注入获取，文档翻译与 /translate 共用同一缓存和预算统计
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from .document_processor import DocumentProcessor
+from .translation_engine import TranslationEngine
+
+
+class ServiceContainer:
+    """
+    应用级服务容器
+
+    服务在首次使用时创建；应用启动时由 lifespan 调用 startup 提前创建并启动任务工作池，
+    关闭时 shutdown 停止工作池，关闭任务存储、L2缓存和线程池
+    """
+
+    def __init__(self):
+        self._translation_engine: Optional[TranslationEngine] = None
+        self._document_processor: Optional[DocumentProcessor] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def translation_engine(self) -> TranslationEngine:
+        if self._translation_engine is None:
+            self._translation_engine = TranslationEngine()
+        return self._translation_engine
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """文档解析等阻塞操作使用的线程池"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=4)
+        return self._executor
+
+    @property
+    def document_processor(self) -> DocumentProcessor:
+        if self._document_processor is None:
+            self.initialize()
+        return self._document_processor
+
+    def initialize(self):
+        """创建全部共享服务（文档处理器依赖翻译引擎和线程池），已创建的服务保持不变"""
+        if self._document_processor is None:
+            self._document_processor = DocumentProcessor(
+                translation_engine=self.translation_engine,
+                executor=self.executor
+            )
+
+    async def startup(self):
+        """创建共享服务，启动翻译任务工作池，继续执行上次运行中未完成的任务"""
+        self.initialize()
+        self.translation_engine.job_workers.start()
+
+    async def shutdown(self):
+        """停止翻译任务工作池（执行中的任务在下次启动后继续），释放任务存储、L2缓存连接和线程池"""
+        if self._translation_engine is not None:
+            await self._translation_engine.job_workers.stop()
+            self._translation_engine.job_store.close()
+            await self._translation_engine.cache.aclose()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._translation_engine = None
+        self._document_processor = None
+        self._executor = None
+
+
+services = ServiceContainer()
+
+
+def get_translation_engine() -> TranslationEngine:
+    """依赖注入：共享的翻译引擎"""
+    return services.translation_engine
+
+
+def get_document_processor() -> DocumentProcessor:
+    """依赖注入：共享的文档处理器"""
+    return services.document_processor
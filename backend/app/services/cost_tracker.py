@@ -40,7 +40,8 @@ class CostTracker:
         request_count: int,
         character_count: int,
         user_id: Optional[str] = None,
-        project_id: Optional[str] = None
+        project_id: Optional[str] = None,
+        tokens_saved: Optional[int] = None
     ) -> float:
         """
         跟踪翻译使用量并计算成本
@@ -51,6 +52,7 @@ class CostTracker:
             character_count: 字符数量
             user_id: 用户ID
             project_id: 项目ID
+            tokens_saved: 这些请求中提供商打包请求节省的提示token
             
         Returns:
             float: 估算成本
@@ -75,6 +77,10 @@ class CostTracker:
             token_count = character_count // self.pricing_config[provider]['avg_chars_per_token']
             usage_record.token_count = token_count
         
+        if tokens_saved:
+            usage_record.tokens_saved = tokens_saved
+            usage_record.tokens_saved_per_segment = round(tokens_saved / request_count, 2) if request_count else None
+        
         # 存储记录
         self.usage_records.append(usage_record)
         
@@ -254,7 +260,8 @@ class CostTracker:
                 provider_stats[provider.value] = {
                     "requests": sum(r.request_count for r in provider_records),
                     "characters": sum(r.character_count for r in provider_records),
-                    "cost": sum(r.estimated_cost for r in provider_records)
+                    "cost": sum(r.estimated_cost for r in provider_records),
+                    "tokens_saved": sum(r.tokens_saved or 0 for r in provider_records)
                 }
         
         # 每日使用量
@@ -35,7 +35,9 @@ from concurrent.futures import ThreadPoolExecutor
 
 from app.core.config import settings
 from app.services.translation_engine import TranslationEngine
+from app.providers.request_scheduler import RequestPriority, request_scope
 from app.schemas.translation import TranslationRequest, LanguageCode, TranslationProvider
+from app.utils.text_utils import split_sentences, join_sentences
 
 logger = logging.getLogger(__name__)
 
@@ -79,15 +81,20 @@ class DocumentProcessor:
         '.gif': 'image/gif',
     }
     
-    def __init__(self):
+    def __init__(
+        self,
+        translation_engine: Optional[TranslationEngine] = None,
+        executor: Optional[ThreadPoolExecutor] = None
+    ):
         self.upload_dir = Path(settings.UPLOAD_DIR or "uploads")
         self.upload_dir.mkdir(exist_ok=True)
         
         self.processed_dir = self.upload_dir / "processed"
         self.processed_dir.mkdir(exist_ok=True)
         
-        self.translation_engine = TranslationEngine()
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        # 由服务容器注入时与 /translate 共用同一个翻译引擎（缓存、成本跟踪）和线程池
+        self.translation_engine = translation_engine or TranslationEngine()
+        self.executor = executor or ThreadPoolExecutor(max_workers=4)
     
     async def upload_document(
         self, 
@@ -466,23 +473,34 @@ class DocumentProcessor:
             # 将长文本分块处理
             text_chunks = self._split_text_into_chunks(extracted_text, chunk_size)
             
-            logger.info(f"开始翻译文档，共 {len(text_chunks)} 个文本块")
+            # 文本块再切分为句子，按句子翻译和缓存：
+            # 文档局部修改或分块大小变化时，未改动的句子仍然命中缓存
+            chunk_segments = [split_sentences(chunk) for chunk in text_chunks]
+            sentences = [sentence for segments in chunk_segments for sentence, _ in segments]
+            
+            logger.info(f"开始翻译文档，共 {len(text_chunks)} 个文本块，{len(sentences)} 个句子")
             
             # 创建翻译请求
             translation_request = TranslationRequest(
-                texts=text_chunks,
+                texts=sentences,
                 source_language=source_language,
                 target_language=target_language,
                 provider=provider
             )
             
-            # 执行翻译
-            translation_result = await self.translation_engine.translate_batch(translation_request)
+            # 执行翻译：文档翻译按批量优先级、以项目为租户调度，不挤占交互式请求
+            with request_scope(RequestPriority.BULK, tenant=document_info.get("project_id")):
+                translation_result = await self.translation_engine.translate_batch(translation_request)
             
-            # 合并翻译结果
+            # 按句子还原各文本块，再合并翻译结果
+            translated_sentences = iter(translation_result.translations)
             translated_text = ""
-            for translation in translation_result.translations:
-                translated_text += translation.translated_text + "\n"
+            for segments in chunk_segments:
+                translated_text += join_sentences(
+                    [next(translated_sentences).translated_text for _ in segments],
+                    [separator for _, separator in segments],
+                    target_language.value
+                ) + "\n"
             
             # 保存翻译结果
             translated_file_path = self._save_translated_document(
@@ -503,8 +521,9 @@ class DocumentProcessor:
                     "translated_file_path": translated_file_path,
                     "translation_stats": {
                         "total_chunks": len(text_chunks),
+                        "total_segments": len(sentences),
                         "success_count": translation_result.success_count,
-                        "failed_count": translation_result.failed_count,
+                        "failed_count": translation_result.total_count - translation_result.success_count,
                         "total_cost": translation_result.total_cost,
                         "quality_summary": translation_result.quality_summary,
                         "processing_time": translation_result.processing_time
@@ -514,7 +533,7 @@ class DocumentProcessor:
                 "translation_time": datetime.now().isoformat()
             }
             
-            logger.info(f"文档翻译完成: {translation_result.success_count}/{len(text_chunks)} 成功")
+            logger.info(f"文档翻译完成: {translation_result.success_count}/{len(sentences)} 个句子成功")
             
             return result
             
@@ -673,7 +692,3 @@ class DocumentProcessor:
         except Exception as e:
             logger.error(f"获取处理统计失败: {e}")
             return {}
-
-
-# 全局文档处理器实例
-document_processor = DocumentProcessor()
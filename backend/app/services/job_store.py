@@ -0,0 +1,775 @@
+"""
+翻译任务存储后端
+持久化保存任务记录，并作为待执行任务的队列：worker 通过 claim 领取任务并获得租约，
+执行期间定期续约；进程崩溃后租约过期，任务会被其他 worker（或重启后的进程）重新领取继续执行。
+任务按子批次执行，每个完成的子批次作为检查点单独保存，失败或取消的任务恢复后从检查点继续
+"""
+import asyncio
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional
+
+from ..core.config import settings
+from ..schemas.translation import (
+    TranslationJob, TranslationProvider, TranslationResult, TranslationStatus
+)
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - redis为可选依赖
+    aioredis = None
+
+_PENDING = TranslationStatus.PENDING.value
+_IN_PROGRESS = TranslationStatus.IN_PROGRESS.value
+_COMPLETED = TranslationStatus.COMPLETED.value
+
+
+def _start_job(job: TranslationJob):
+    """领取任务时更新状态和执行次数（崩溃后重新领取的任务保留最初的开始时间）"""
+    job.status = TranslationStatus.IN_PROGRESS
+    job.attempt += 1
+    if job.started_at is None:
+        job.started_at = datetime.now()
+
+
+def set_job_progress(job: TranslationJob, completed_segments: int, eta_seconds: Optional[float]):
+    """更新任务的已完成句段数、进度和预计剩余时间"""
+    job.completed_segments = completed_segments
+    job.eta_seconds = eta_seconds
+    job.progress = min(1.0, completed_segments / job.total_segments) if job.total_segments else 0.0
+
+
+class JobRun(NamedTuple):
+    """任务当前的执行状态"""
+    status: TranslationStatus
+    # 最近一次领取的执行次数，worker 据此判断任务是否仍由自己执行
+    attempt: int
+    # 是否有worker持有未过期的租约（取消后租约保留到worker停止）
+    leased: bool
+
+
+class JobStore(ABC):
+    """
+    翻译任务存储
+
+    - save 写入或更新任务；状态为 PENDING 的任务进入所属提供商的队列
+    - claim 按创建顺序领取一个 PENDING 任务，或租约已过期的 IN_PROGRESS 任务（崩溃恢复）
+    - save_checkpoint 保存完成的子批次和进度，只写入该子批次，不重写整个任务
+    - 每次领取执行次数加1；取消执行中的任务时保留租约，直到worker停止后写回结果才释放
+    - 已结束的任务保存时带上过期时间，过期后连同检查点被清理；成功完成的任务不再保留检查点
+    """
+
+    name = "job_store"
+
+    @abstractmethod
+    async def save(
+        self,
+        job: TranslationJob,
+        expires_at: Optional[float] = None,
+        keep_lease: bool = False
+    ):
+        """
+        写入或更新任务
+
+        Args:
+            job: 任务
+            expires_at: 过期时间戳，None表示不过期（未结束的任务）
+            keep_lease: 状态不是 IN_PROGRESS 时仍保留租约（取消执行中的任务，worker尚未停止）
+        """
+        pass
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[TranslationJob]:
+        """读取任务（含最新进度），不存在或已过期时返回None"""
+        pass
+
+    @abstractmethod
+    async def get_status(self, job_id: str) -> Optional[TranslationStatus]:
+        """只读取任务状态"""
+        pass
+
+    @abstractmethod
+    async def get_run(self, job_id: str) -> Optional[JobRun]:
+        """读取任务的状态、执行次数和租约，供worker在子批次之间确认任务未被取消且仍归自己执行"""
+        pass
+
+    @abstractmethod
+    async def claim(
+        self,
+        provider: TranslationProvider,
+        lease_seconds: float
+    ) -> Optional[TranslationJob]:
+        """
+        领取提供商队列中的下一个任务，任务状态置为 IN_PROGRESS
+
+        Args:
+            provider: 提供商
+            lease_seconds: 租约时长，期间需调用 renew 续约，否则任务会被重新领取
+
+        Returns:
+            Optional[TranslationJob]: 领取到的任务，队列为空时返回None
+        """
+        pass
+
+    @abstractmethod
+    async def renew(self, job_id: str, lease_seconds: float):
+        """续约执行中（包括已取消但worker尚未停止）的任务"""
+        pass
+
+    @abstractmethod
+    async def save_checkpoint(
+        self,
+        job_id: str,
+        offset: int,
+        result: TranslationResult,
+        completed_segments: int,
+        eta_seconds: Optional[float]
+    ):
+        """
+        保存完成的子批次
+
+        Args:
+            job_id: 任务ID
+            offset: 子批次第一个句段在任务texts中的下标
+            result: 子批次的翻译结果
+            completed_segments: 保存后任务已完成的句段数
+            eta_seconds: 预计剩余时间
+        """
+        pass
+
+    @abstractmethod
+    async def load_checkpoints(self, job_id: str) -> Dict[int, TranslationResult]:
+        """读取任务已保存的子批次，返回 起始下标 -> 翻译结果"""
+        pass
+
+    @abstractmethod
+    async def purge_expired(self) -> int:
+        """
+        清理已过期的任务
+
+        Returns:
+            int: 清理的任务数量（自带过期机制的后端返回0）
+        """
+        pass
+
+    @abstractmethod
+    async def get_stats(self) -> Dict[str, Any]:
+        """队列统计"""
+        pass
+
+    def close(self):
+        """释放连接等资源"""
+        pass
+
+
+class _MemoryJob(NamedTuple):
+    data: str
+    status: TranslationStatus
+    provider: TranslationProvider
+    expires_at: Optional[float]
+    attempt: int
+
+
+class MemoryJobStore(JobStore):
+    """进程内任务存储，重启后任务丢失（仅用于开发和测试）"""
+
+    name = "memory"
+
+    def __init__(self):
+        # 保存序列化后的副本，与持久化后端行为一致
+        self._jobs: Dict[str, _MemoryJob] = {}
+        self._pending: Dict[TranslationProvider, "OrderedDict[str, None]"] = {}
+        # job_id -> 租约到期时间戳
+        self._leases: Dict[str, float] = {}
+        # job_id -> (已完成句段数, 预计剩余时间)
+        self._progress: Dict[str, tuple] = {}
+        # job_id -> {起始下标: 子批次结果JSON}
+        self._checkpoints: Dict[str, Dict[int, str]] = {}
+
+    def _record(self, job_id: str) -> Optional[_MemoryJob]:
+        record = self._jobs.get(job_id)
+        if record is None or (record.expires_at is not None and record.expires_at <= time.time()):
+            return None
+        return record
+
+    async def save(
+        self,
+        job: TranslationJob,
+        expires_at: Optional[float] = None,
+        keep_lease: bool = False
+    ):
+        provider = job.request.provider
+        self._jobs[job.id] = _MemoryJob(job.model_dump_json(), job.status, provider, expires_at, job.attempt)
+        self._progress[job.id] = (job.completed_segments, job.eta_seconds)
+        if job.status == TranslationStatus.COMPLETED:
+            self._checkpoints.pop(job.id, None)
+
+        queue = self._pending.setdefault(provider, OrderedDict())
+        if job.status == TranslationStatus.PENDING:
+            queue[job.id] = None
+        else:
+            queue.pop(job.id, None)
+        if job.status != TranslationStatus.IN_PROGRESS and not keep_lease:
+            self._leases.pop(job.id, None)
+
+    async def get(self, job_id: str) -> Optional[TranslationJob]:
+        record = self._record(job_id)
+        if record is None:
+            return None
+        job = TranslationJob.model_validate_json(record.data)
+        set_job_progress(job, *self._progress.get(job_id, (0, None)))
+        return job
+
+    async def get_status(self, job_id: str) -> Optional[TranslationStatus]:
+        record = self._record(job_id)
+        return record.status if record else None
+
+    async def get_run(self, job_id: str) -> Optional[JobRun]:
+        record = self._record(job_id)
+        if record is None:
+            return None
+        return JobRun(record.status, record.attempt, self._leases.get(job_id, 0) > time.time())
+
+    async def claim(
+        self,
+        provider: TranslationProvider,
+        lease_seconds: float
+    ) -> Optional[TranslationJob]:
+        now = time.time()
+        job_id = next(
+            (job_id for job_id, lease_until in self._leases.items()
+             if lease_until <= now and self._jobs[job_id].provider == provider
+             and self._jobs[job_id].status == TranslationStatus.IN_PROGRESS),
+            None
+        )
+        if job_id is None:
+            queue = self._pending.get(provider)
+            if not queue:
+                return None
+            job_id, _ = queue.popitem(last=False)
+
+        job = TranslationJob.model_validate_json(self._jobs[job_id].data)
+        _start_job(job)
+        self._jobs[job_id] = _MemoryJob(job.model_dump_json(), job.status, provider, None, job.attempt)
+        self._leases[job_id] = now + lease_seconds
+        return job
+
+    async def renew(self, job_id: str, lease_seconds: float):
+        if job_id in self._leases:
+            self._leases[job_id] = time.time() + lease_seconds
+
+    async def save_checkpoint(
+        self,
+        job_id: str,
+        offset: int,
+        result: TranslationResult,
+        completed_segments: int,
+        eta_seconds: Optional[float]
+    ):
+        self._checkpoints.setdefault(job_id, {})[offset] = result.model_dump_json()
+        self._progress[job_id] = (completed_segments, eta_seconds)
+
+    async def load_checkpoints(self, job_id: str) -> Dict[int, TranslationResult]:
+        return {
+            offset: TranslationResult.model_validate_json(data)
+            for offset, data in self._checkpoints.get(job_id, {}).items()
+        }
+
+    async def purge_expired(self) -> int:
+        now = time.time()
+        expired = [
+            job_id for job_id, record in self._jobs.items()
+            if record.expires_at is not None and record.expires_at <= now
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+            self._leases.pop(job_id, None)
+            self._progress.pop(job_id, None)
+            self._checkpoints.pop(job_id, None)
+        return len(expired)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "jobs": len(self._jobs),
+            "pending": sum(len(queue) for queue in self._pending.values()),
+            # 只计未过期的租约，worker崩溃后留下的过期租约不算执行中
+            "in_progress": sum(
+                1 for lease_until in self._leases.values() if lease_until > time.time()
+            )
+        }
+
+
+class SQLiteJobStore(JobStore):
+    """
+    基于SQLite（WAL模式）的持久化任务存储
+
+    领取任务在 BEGIN IMMEDIATE 事务中完成，同一主机的多个worker进程不会领取到同一个任务；
+    所有数据库操作在单线程执行器中串行执行，不阻塞事件循环
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.JOB_STORE_SQLITE_PATH
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-jobs")
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translation_jobs ("
+            "id TEXT PRIMARY KEY, provider TEXT NOT NULL, status TEXT NOT NULL, "
+            "created_at REAL NOT NULL, lease_until REAL, expires_at REAL, "
+            "completed_segments INTEGER NOT NULL DEFAULT 0, eta_seconds REAL, data TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_translation_jobs_queue "
+            "ON translation_jobs (provider, status, created_at)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_translation_jobs_expires_at "
+            "ON translation_jobs (expires_at)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translation_job_checkpoints ("
+            "job_id TEXT NOT NULL, segment_offset INTEGER NOT NULL, data TEXT NOT NULL, "
+            "PRIMARY KEY (job_id, segment_offset)) WITHOUT ROWID"
+        )
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _transaction(self, *statements):
+        """在一个事务中依次执行 (sql, 参数)"""
+        self._conn.execute("BEGIN")
+        try:
+            for sql, params in statements:
+                self._conn.execute(sql, params)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _save_sync(self, job: TranslationJob, expires_at: Optional[float], keep_lease: bool):
+        statements = [(
+            "INSERT INTO translation_jobs (id, provider, status, created_at, lease_until, expires_at, "
+            "completed_segments, eta_seconds, data) VALUES (?, ?, ?, ?, NULL, ?, ?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET status = excluded.status, expires_at = excluded.expires_at, "
+            "completed_segments = excluded.completed_segments, eta_seconds = excluded.eta_seconds, "
+            "data = excluded.data, "
+            "lease_until = CASE WHEN excluded.status = ? OR ? THEN lease_until ELSE NULL END",
+            (
+                job.id, job.request.provider.value, job.status.value, job.created_at.timestamp(),
+                expires_at, job.completed_segments, job.eta_seconds, job.model_dump_json(), _IN_PROGRESS,
+                keep_lease
+            )
+        )]
+        if job.status == TranslationStatus.COMPLETED:
+            statements.append(("DELETE FROM translation_job_checkpoints WHERE job_id = ?", (job.id,)))
+        self._transaction(*statements)
+
+    def _get_sync(self, job_id: str) -> Optional[tuple]:
+        return self._conn.execute(
+            "SELECT data, completed_segments, eta_seconds FROM translation_jobs "
+            "WHERE id = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (job_id, time.time())
+        ).fetchone()
+
+    def _get_status_sync(self, job_id: str) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT status FROM translation_jobs WHERE id = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (job_id, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def _get_run_sync(self, job_id: str) -> Optional[JobRun]:
+        now = time.time()
+        row = self._conn.execute(
+            "SELECT status, json_extract(data, '$.attempt'), lease_until FROM translation_jobs "
+            "WHERE id = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (job_id, now)
+        ).fetchone()
+        if row is None:
+            return None
+        return JobRun(TranslationStatus(row[0]), row[1] or 0, row[2] is not None and row[2] > now)
+
+    def _claim_sync(self, provider: str, lease_seconds: float) -> Optional[TranslationJob]:
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._conn.execute(
+                "SELECT id, data FROM translation_jobs WHERE provider = ? AND "
+                "(status = ? OR (status = ? AND lease_until <= ?)) "
+                "ORDER BY created_at LIMIT 1",
+                (provider, _PENDING, _IN_PROGRESS, now)
+            ).fetchone()
+            if row is None:
+                self._conn.execute("COMMIT")
+                return None
+
+            job = TranslationJob.model_validate_json(row[1])
+            _start_job(job)
+            self._conn.execute(
+                "UPDATE translation_jobs SET status = ?, lease_until = ?, data = ? WHERE id = ?",
+                (_IN_PROGRESS, now + lease_seconds, job.model_dump_json(), row[0])
+            )
+            self._conn.execute("COMMIT")
+            return job
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _renew_sync(self, job_id: str, lease_seconds: float):
+        self._conn.execute(
+            "UPDATE translation_jobs SET lease_until = ? WHERE id = ? AND lease_until IS NOT NULL",
+            (time.time() + lease_seconds, job_id)
+        )
+
+    def _save_checkpoint_sync(
+        self,
+        job_id: str,
+        offset: int,
+        data: str,
+        completed_segments: int,
+        eta_seconds: Optional[float]
+    ):
+        self._transaction(
+            (
+                "INSERT OR REPLACE INTO translation_job_checkpoints (job_id, segment_offset, data) "
+                "VALUES (?, ?, ?)",
+                (job_id, offset, data)
+            ),
+            (
+                "UPDATE translation_jobs SET completed_segments = ?, eta_seconds = ? WHERE id = ?",
+                (completed_segments, eta_seconds, job_id)
+            )
+        )
+
+    def _load_checkpoints_sync(self, job_id: str) -> list:
+        return self._conn.execute(
+            "SELECT segment_offset, data FROM translation_job_checkpoints WHERE job_id = ?",
+            (job_id,)
+        ).fetchall()
+
+    def _purge_sync(self) -> int:
+        now = time.time()
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.execute(
+                "DELETE FROM translation_job_checkpoints WHERE job_id IN ("
+                "SELECT id FROM translation_jobs WHERE expires_at IS NOT NULL AND expires_at <= ?)",
+                (now,)
+            )
+            purged = self._conn.execute(
+                "DELETE FROM translation_jobs WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (now,)
+            ).rowcount
+            self._conn.execute("COMMIT")
+            return purged
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _stats_sync(self) -> Dict[str, int]:
+        return dict(self._conn.execute(
+            "SELECT status, COUNT(*) FROM translation_jobs GROUP BY status"
+        ).fetchall())
+
+    async def save(
+        self,
+        job: TranslationJob,
+        expires_at: Optional[float] = None,
+        keep_lease: bool = False
+    ):
+        await self._run(self._save_sync, job, expires_at, keep_lease)
+
+    async def get(self, job_id: str) -> Optional[TranslationJob]:
+        row = await self._run(self._get_sync, job_id)
+        if row is None:
+            return None
+        job = TranslationJob.model_validate_json(row[0])
+        set_job_progress(job, row[1], row[2])
+        return job
+
+    async def get_status(self, job_id: str) -> Optional[TranslationStatus]:
+        status = await self._run(self._get_status_sync, job_id)
+        return TranslationStatus(status) if status else None
+
+    async def get_run(self, job_id: str) -> Optional[JobRun]:
+        return await self._run(self._get_run_sync, job_id)
+
+    async def claim(
+        self,
+        provider: TranslationProvider,
+        lease_seconds: float
+    ) -> Optional[TranslationJob]:
+        return await self._run(self._claim_sync, provider.value, lease_seconds)
+
+    async def renew(self, job_id: str, lease_seconds: float):
+        await self._run(self._renew_sync, job_id, lease_seconds)
+
+    async def save_checkpoint(
+        self,
+        job_id: str,
+        offset: int,
+        result: TranslationResult,
+        completed_segments: int,
+        eta_seconds: Optional[float]
+    ):
+        await self._run(
+            self._save_checkpoint_sync, job_id, offset, result.model_dump_json(),
+            completed_segments, eta_seconds
+        )
+
+    async def load_checkpoints(self, job_id: str) -> Dict[int, TranslationResult]:
+        rows = await self._run(self._load_checkpoints_sync, job_id)
+        return {offset: TranslationResult.model_validate_json(data) for offset, data in rows}
+
+    async def purge_expired(self) -> int:
+        return await self._run(self._purge_sync)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        counts = await self._run(self._stats_sync)
+        return {
+            "backend": self.name,
+            "jobs": sum(counts.values()),
+            "pending": counts.get(_PENDING, 0),
+            "in_progress": counts.get(_IN_PROGRESS, 0)
+        }
+
+    def close(self):
+        """关闭数据库连接"""
+        self._executor.shutdown(wait=True)
+        self._conn.close()
+
+
+def _text(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+class RedisJobStore(JobStore):
+    """
+    基于Redis的任务存储，多台主机的worker共用同一个队列
+
+    - 任务JSON保存在字符串键中，状态和进度保存在单独的哈希中，检查点按起始下标保存在哈希中；
+      已结束的任务用Redis过期时间清理
+    - 每个提供商一个待执行列表（LPUSH/RPOP），以及一个按租约到期时间排序的执行中有序集合；
+      租约到期时间和执行次数同时写入进度哈希，供 get_run 一次读取
+    """
+
+    name = "redis"
+
+    def __init__(
+        self,
+        client: Any = None,
+        url: Optional[str] = None,
+        key_prefix: str = "translation_jobs:"
+    ):
+        if client is None:
+            if aioredis is None:
+                raise RuntimeError("使用Redis任务存储需要安装redis包")
+            client = aioredis.from_url(url or settings.REDIS_URL)
+
+        self.client = client
+        self.key_prefix = key_prefix
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.key_prefix}job:{job_id}"
+
+    def _progress_key(self, job_id: str) -> str:
+        return f"{self.key_prefix}progress:{job_id}"
+
+    def _checkpoints_key(self, job_id: str) -> str:
+        return f"{self.key_prefix}checkpoints:{job_id}"
+
+    def _pending_key(self, provider: TranslationProvider) -> str:
+        return f"{self.key_prefix}pending:{provider.value}"
+
+    def _leases_key(self, provider: TranslationProvider) -> str:
+        return f"{self.key_prefix}leases:{provider.value}"
+
+    async def save(
+        self,
+        job: TranslationJob,
+        expires_at: Optional[float] = None,
+        keep_lease: bool = False
+    ):
+        ttl = None
+        if expires_at is not None:
+            ttl = max(1, int(expires_at - time.time()))
+        progress_key = self._progress_key(job.id)
+        checkpoints_key = self._checkpoints_key(job.id)
+
+        pipe = self.client.pipeline(transaction=True)
+        pipe.set(self._job_key(job.id), job.model_dump_json(), ex=ttl)
+        pipe.hset(progress_key, mapping={
+            "status": job.status.value,
+            "attempt": job.attempt,
+            "completed_segments": job.completed_segments,
+            "eta_seconds": "" if job.eta_seconds is None else job.eta_seconds
+        })
+        if job.status == TranslationStatus.COMPLETED:
+            pipe.delete(checkpoints_key)
+        if ttl is None:
+            pipe.persist(progress_key)
+            pipe.persist(checkpoints_key)
+        else:
+            pipe.expire(progress_key, ttl)
+            pipe.expire(checkpoints_key, ttl)
+        # 先移除队列中已有的同一任务（取消后恢复的任务可能还在队列中），队列中每个任务只出现一次
+        if job.status in (TranslationStatus.PENDING, TranslationStatus.CANCELLED):
+            pipe.lrem(self._pending_key(job.request.provider), 0, job.id)
+        if job.status == TranslationStatus.PENDING:
+            pipe.lpush(self._pending_key(job.request.provider), job.id)
+        if job.status != TranslationStatus.IN_PROGRESS and not keep_lease:
+            pipe.zrem(self._leases_key(job.request.provider), job.id)
+            pipe.hdel(progress_key, "lease_until")
+        await pipe.execute()
+
+    async def get(self, job_id: str) -> Optional[TranslationJob]:
+        pipe = self.client.pipeline(transaction=False)
+        pipe.get(self._job_key(job_id))
+        pipe.hgetall(self._progress_key(job_id))
+        data, progress = await pipe.execute()
+        if not data:
+            return None
+        job = TranslationJob.model_validate_json(data)
+        progress = {_text(key): _text(value) for key, value in (progress or {}).items()}
+        if progress.get("status"):
+            job.status = TranslationStatus(progress["status"])
+        eta_seconds = progress.get("eta_seconds")
+        set_job_progress(
+            job, int(progress.get("completed_segments") or 0), float(eta_seconds) if eta_seconds else None
+        )
+        return job
+
+    async def get_status(self, job_id: str) -> Optional[TranslationStatus]:
+        status = await self.client.hget(self._progress_key(job_id), "status")
+        return TranslationStatus(_text(status)) if status else None
+
+    async def get_run(self, job_id: str) -> Optional[JobRun]:
+        status, attempt, lease_until = await self.client.hmget(
+            self._progress_key(job_id), "status", "attempt", "lease_until"
+        )
+        if not status:
+            return None
+        return JobRun(
+            TranslationStatus(_text(status)),
+            int(attempt or 0),
+            bool(lease_until) and float(lease_until) > time.time()
+        )
+
+    async def claim(
+        self,
+        provider: TranslationProvider,
+        lease_seconds: float
+    ) -> Optional[TranslationJob]:
+        now = time.time()
+        leases_key = self._leases_key(provider)
+
+        job_id = None
+        # 优先接管租约已过期的任务（其worker已崩溃）；ZREM成功的一方获得该任务
+        expected = TranslationStatus.IN_PROGRESS
+        for expired_id in await self.client.zrangebyscore(leases_key, "-inf", now, start=0, num=1):
+            if await self.client.zrem(leases_key, expired_id):
+                job_id = expired_id
+        if job_id is None:
+            expected = TranslationStatus.PENDING
+            job_id = await self.client.rpop(self._pending_key(provider))
+        if job_id is None:
+            return None
+        job_id = _text(job_id)
+
+        job = await self.get(job_id)
+        # 待执行队列只领取 PENDING 的任务（排队期间已取消、已在执行或已过期的直接丢弃），
+        # 执行中的任务只能通过租约过期接管
+        if job is None or job.status != expected:
+            return None
+        _start_job(job)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.set(self._job_key(job_id), job.model_dump_json())
+        pipe.hset(self._progress_key(job_id), mapping={
+            "status": _IN_PROGRESS,
+            "attempt": job.attempt,
+            "lease_until": now + lease_seconds
+        })
+        pipe.zadd(leases_key, {job_id: now + lease_seconds})
+        await pipe.execute()
+        return job
+
+    async def renew(self, job_id: str, lease_seconds: float):
+        job = await self.get(job_id)
+        if job is None:
+            return
+        lease_until = time.time() + lease_seconds
+        if await self.client.zadd(
+            self._leases_key(job.request.provider), {job_id: lease_until}, xx=True, ch=True
+        ):
+            await self.client.hset(self._progress_key(job_id), "lease_until", lease_until)
+
+    async def save_checkpoint(
+        self,
+        job_id: str,
+        offset: int,
+        result: TranslationResult,
+        completed_segments: int,
+        eta_seconds: Optional[float]
+    ):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(self._checkpoints_key(job_id), str(offset), result.model_dump_json())
+        pipe.hset(self._progress_key(job_id), mapping={
+            "completed_segments": completed_segments,
+            "eta_seconds": "" if eta_seconds is None else eta_seconds
+        })
+        await pipe.execute()
+
+    async def load_checkpoints(self, job_id: str) -> Dict[int, TranslationResult]:
+        checkpoints = await self.client.hgetall(self._checkpoints_key(job_id))
+        return {
+            int(_text(offset)): TranslationResult.model_validate_json(data)
+            for offset, data in checkpoints.items()
+        }
+
+    async def purge_expired(self) -> int:
+        return 0
+
+    async def get_stats(self) -> Dict[str, Any]:
+        pipe = self.client.pipeline(transaction=False)
+        for provider in TranslationProvider:
+            pipe.llen(self._pending_key(provider))
+            pipe.zcard(self._leases_key(provider))
+        counts = await pipe.execute()
+        return {
+            "backend": self.name,
+            "pending": sum(counts[0::2]),
+            "in_progress": sum(counts[1::2])
+        }
+
+
+def create_job_store() -> JobStore:
+    """
+    根据配置创建任务存储
+
+    Returns:
+        JobStore: JOB_STORE_BACKEND=memory 为进程内存储（重启后丢失），
+        sqlite 为本机持久化存储，redis 为多主机共享存储
+    """
+    backend = settings.JOB_STORE_BACKEND.lower()
+
+    if backend == "memory":
+        return MemoryJobStore()
+    if backend == "sqlite":
+        return SQLiteJobStore(path=settings.JOB_STORE_SQLITE_PATH)
+    if backend == "redis":
+        return RedisJobStore(url=settings.REDIS_URL)
+
+    raise ValueError(f"Unsupported job store backend: {settings.JOB_STORE_BACKEND}")
@@ -0,0 +1,179 @@
+"""
+翻译任务工作池
+按提供商划分的有界worker从任务存储中领取任务执行：每个提供商同时执行的任务数受配置限制，
+执行期间定期续约租约；服务重启后，未完成的任务和租约过期的执行中任务会被重新领取继续执行
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from ..core.config import settings
+from ..schemas.translation import TranslationJob, TranslationProvider, TranslationStatus
+from .job_store import JobStore
+
+logger = logging.getLogger(__name__)
+
+# 清理过期任务的间隔（秒）
+_PURGE_INTERVAL = 60.0
+
+
+def parse_provider_concurrency(value: str, default: int) -> Dict[TranslationProvider, int]:
+    """
+    解析各提供商的worker数量
+
+    Args:
+        value: 形如 "openai=1,google=4" 的配置，未列出的提供商使用默认值
+        default: 默认worker数量
+
+    Returns:
+        Dict[TranslationProvider, int]: 提供商 -> worker数量
+    """
+    concurrency = {provider: default for provider in TranslationProvider}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, count = item.partition("=")
+        try:
+            concurrency[TranslationProvider(name.strip().lower())] = int(count)
+        except ValueError:
+            raise ValueError(f"Invalid provider concurrency setting: {item.strip()}")
+    return concurrency
+
+
+class JobWorkerPool:
+    """
+    翻译任务工作池
+
+    提交的任务先写入任务存储，再唤醒对应提供商的worker；worker空闲时也会按 poll_interval
+    轮询存储，以便接管其他进程提交的任务和崩溃遗留的任务
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        handler: Callable[[TranslationJob], Awaitable[None]],
+        concurrency: Optional[Dict[TranslationProvider, int]] = None,
+        lease_seconds: Optional[float] = None,
+        result_ttl: Optional[float] = None,
+        poll_interval: Optional[float] = None
+    ):
+        """
+        Args:
+            store: 任务存储
+            handler: 执行任务的协程函数，直接更新传入任务的状态和结果
+            concurrency: 各提供商的worker数量，默认按配置
+            lease_seconds: 任务租约时长，worker崩溃后任务在租约到期后被重新领取
+            result_ttl: 已结束任务的保留时长
+            poll_interval: 空闲worker轮询任务存储的间隔
+        """
+        self.store = store
+        self.handler = handler
+        self.concurrency = concurrency or parse_provider_concurrency(
+            settings.JOB_PROVIDER_CONCURRENCY, settings.JOB_WORKER_CONCURRENCY
+        )
+        self.lease_seconds = lease_seconds or settings.JOB_LEASE_SECONDS
+        self.result_ttl = result_ttl or settings.JOB_RESULT_TTL
+        self.poll_interval = poll_interval or settings.JOB_POLL_INTERVAL
+
+        self._wakeups: Dict[TranslationProvider, asyncio.Event] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._running: Dict[str, TranslationJob] = {}
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    @property
+    def running_jobs(self) -> int:
+        """当前进程正在执行的任务数"""
+        return len(self._running)
+
+    def start(self):
+        """启动worker和过期任务清理（重复调用无副作用）"""
+        if self._tasks:
+            return
+        for provider, count in self.concurrency.items():
+            self._wakeups[provider] = asyncio.Event()
+            for _ in range(max(0, count)):
+                self._tasks.append(asyncio.create_task(self._worker(provider)))
+        self._tasks.append(asyncio.create_task(self._purge_loop()))
+        logger.info(
+            "翻译任务工作池已启动: "
+            + ", ".join(f"{provider.value}={count}" for provider, count in self.concurrency.items())
+        )
+
+    async def stop(self):
+        """停止全部worker；执行中的任务保留在存储中，租约到期后由下次启动的worker继续执行"""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def submit(self, job: TranslationJob):
+        """提交任务：写入存储并唤醒对应提供商的worker"""
+        self.start()
+        await self.store.save(job)
+        self._wakeups[job.request.provider].set()
+
+    async def _worker(self, provider: TranslationProvider):
+        wakeup = self._wakeups[provider]
+        while True:
+            # 先清除再领取：领取与等待之间提交的任务不会丢失唤醒
+            wakeup.clear()
+            try:
+                job = await self.store.claim(provider, self.lease_seconds)
+            except Exception as e:
+                logger.error(f"领取翻译任务失败: {str(e)}")
+                job = None
+            else:
+                if job is not None:
+                    await self._run(job)
+                    continue
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run(self, job: TranslationJob):
+        """执行一个已领取的任务，执行期间续约，结束后带过期时间写回存储"""
+        self._running[job.id] = job
+        heartbeat = asyncio.create_task(self._heartbeat(job.id))
+        try:
+            try:
+                await self.handler(job)
+            except Exception as e:
+                job.status = TranslationStatus.FAILED
+                job.error_message = str(e)
+                job.completed_at = datetime.now()
+            # 租约过期后任务已被重新领取时不再写回，避免覆盖新一次执行的状态
+            run = await self.store.get_run(job.id)
+            if run is None or run.attempt != job.attempt:
+                logger.warning(f"翻译任务 {job.id} 已由其他worker重新执行，放弃写回")
+                return
+            await self.store.save(job, expires_at=time.time() + self.result_ttl)
+        except Exception as e:
+            # 写回失败时任务保持执行中状态，租约到期后会被重新执行
+            logger.error(f"保存翻译任务 {job.id} 失败: {str(e)}")
+        finally:
+            heartbeat.cancel()
+            self._running.pop(job.id, None)
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await self.store.renew(job_id, self.lease_seconds)
+            except Exception as e:
+                logger.warning(f"续约翻译任务 {job_id} 失败: {str(e)}")
+
+    async def _purge_loop(self):
+        while True:
+            try:
+                purged = await self.store.purge_expired()
+                if purged:
+                    logger.info(f"清理过期翻译任务 {purged} 个")
+            except Exception as e:
+                logger.warning(f"清理过期翻译任务失败: {str(e)}")
+            await asyncio.sleep(_PURGE_INTERVAL)
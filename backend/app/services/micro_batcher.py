@@ -0,0 +1,146 @@
+"""
+跨请求的提供商微批处理
+大量只有几句的翻译请求各自调用一次提供商，而提供商一次可以翻译上百句。
+微批处理器把同一 (提供商, 语言对, 上下文) 的小请求在很短的时间窗口内合并，
+按提供商的句段数和字符数上限打包成整批调用，再把结果按原顺序拆回各个请求
+"""
+import asyncio
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..core.config import settings
+from ..providers.base_provider import BaseTranslationProvider
+from ..providers.request_scheduler import RequestPriority, current_priority, request_scope
+from ..schemas.translation import TranslationItem, TranslationProvider
+
+BatchKey = Tuple[TranslationProvider, str, str, Optional[str]]
+
+
+class _PendingBatch:
+    """等待发出的一批请求"""
+
+    def __init__(self, provider: BaseTranslationProvider):
+        self.provider = provider
+        self.texts: List[str] = []
+        self.chars = 0
+        # (在本批texts中的起始下标, 句段数, 等待结果的future)
+        self.waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self.interactive = False
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+    def add(self, texts: List[str], future: asyncio.Future):
+        self.waiters.append((len(self.texts), len(texts), future))
+        self.texts.extend(texts)
+        self.chars += sum(len(text) for text in texts)
+
+
+class MicroBatcher:
+    """
+    提供商调用的微批处理器
+
+    - 小于提供商批次上限的请求进入对应键的待发批次；第一条请求到达后等待 window_ms 毫秒发出，
+      批次达到句段数上限时立即发出；加入后会超出句段数或字符数上限时先发出当前批次
+    - 达到批次上限的请求直接调用提供商，不参与合并
+    - 合并批次中有交互式请求时按交互式优先级调度，租户取第一个请求
+    - 提供商调用失败时，批次中的所有请求都收到该异常
+    """
+
+    def __init__(self, window_ms: Optional[float] = None, max_chars: Optional[int] = None):
+        """
+        Args:
+            window_ms: 合并窗口（毫秒），0为不合并
+            max_chars: 每批的字符数上限
+        """
+        self.window = (settings.MICRO_BATCH_WINDOW_MS if window_ms is None else window_ms) / 1000
+        self.max_chars = max_chars or settings.MICRO_BATCH_MAX_CHARS
+        self._pending: Dict[BatchKey, _PendingBatch] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {"requests": 0, "batched_requests": 0, "provider_calls": 0}
+
+    async def translate_batch(
+        self,
+        provider: BaseTranslationProvider,
+        texts: List[str],
+        source_lang: str,
+        target_lang: str,
+        context: Optional[str] = None
+    ) -> List[TranslationItem]:
+        """
+        翻译文本，与其他小请求合并后调用提供商
+
+        Returns:
+            List[TranslationItem]: 与texts一一对应的翻译结果
+        """
+        self.stats["requests"] += 1
+        max_segments = getattr(provider, "max_batch_size", None)
+        # 未声明批次上限的提供商不合并
+        if (
+            not isinstance(max_segments, int)
+            or self.window <= 0
+            or not texts
+            or len(texts) >= max_segments
+            or sum(len(text) for text in texts) >= self.max_chars
+        ):
+            self.stats["provider_calls"] += 1
+            return await provider.translate_batch(texts, source_lang, target_lang, context)
+
+        key = (provider.provider_name, source_lang, target_lang, context)
+        batch = self._pending.get(key)
+        chars = sum(len(text) for text in texts)
+        if batch is not None and (
+            len(batch.texts) + len(texts) > max_segments or batch.chars + chars > self.max_chars
+        ):
+            self._flush(key)
+            batch = None
+
+        loop = asyncio.get_running_loop()
+        if batch is None:
+            batch = self._pending[key] = _PendingBatch(provider)
+            batch.timer = loop.call_later(self.window, self._flush, key)
+        future = loop.create_future()
+        batch.add(texts, future)
+        batch.interactive |= current_priority() != RequestPriority.BULK
+        self.stats["batched_requests"] += 1
+
+        if len(batch.texts) >= max_segments:
+            self._flush(key)
+        return await future
+
+    def _flush(self, key: BatchKey):
+        """发出键对应的待发批次"""
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        priority = RequestPriority.INTERACTIVE if batch.interactive else RequestPriority.BULK
+        task = asyncio.ensure_future(self._call_provider(key, batch, priority))
+        # 保留任务引用，避免执行中被回收
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _call_provider(self, key: BatchKey, batch: _PendingBatch, priority: RequestPriority):
+        _, source_lang, target_lang, context = key
+        self.stats["provider_calls"] += 1
+        try:
+            with request_scope(priority):
+                translations = await batch.provider.translate_batch(
+                    batch.texts, source_lang, target_lang, context
+                )
+        except asyncio.CancelledError:
+            for _, _, future in batch.waiters:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, _, future in batch.waiters:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for start, count, future in batch.waiters:
+            if not future.done():
+                future.set_result(translations[start:start + count])
+
+    def get_stats(self) -> Dict[str, float]:
+        """合并统计：请求数、参与合并的请求数、实际提供商调用数"""
+        calls = self.stats["provider_calls"]
+        return {**self.stats, "requests_per_call": self.stats["requests"] / calls if calls else 0}
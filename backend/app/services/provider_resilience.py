@@ -0,0 +1,370 @@
+"""
+提供商容错
+每个提供商一个熔断器（按失败率和慢调用比例熔断），请求按有序的备用提供商链依次尝试：
+首选提供商熔断、抛出异常或部分句段翻译失败时，由链中下一个提供商翻译剩余句段。
+可选对冲请求：首选提供商超过其p95延迟仍未返回时，同时向下一个提供商发出相同请求，先成功的结果生效
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from enum import Enum
+from typing import Deque, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from ..providers.base_provider import BaseTranslationProvider, TranslationError
+from ..providers.provider_factory import provider_factory
+from ..schemas.translation import TranslationItem, TranslationProvider
+from .micro_batcher import MicroBatcher
+from .single_flight import is_failed_translation
+
+logger = logging.getLogger(__name__)
+
+
+def parse_provider_chain(value: str) -> List[TranslationProvider]:
+    """
+    解析备用提供商链
+
+    Args:
+        value: 形如 "google,openai" 的配置
+
+    Returns:
+        List[TranslationProvider]: 按顺序排列的提供商
+    """
+    chain = []
+    for name in value.split(","):
+        if not name.strip():
+            continue
+        try:
+            chain.append(TranslationProvider(name.strip().lower()))
+        except ValueError:
+            raise ValueError(f"Invalid provider in fallback chain: {name.strip()}")
+    return list(dict.fromkeys(chain))
+
+
+class CircuitState(str, Enum):
+    """熔断器状态"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    提供商熔断器
+
+    记录最近 window_size 次调用的结果和耗时；调用数不少于 min_calls 且失败率或慢调用比例超过阈值时熔断，
+    open_seconds 后放行一次试探调用：成功则恢复，失败则继续熔断
+    """
+
+    def __init__(
+        self,
+        failure_rate: Optional[float] = None,
+        slow_call_seconds: Optional[float] = None,
+        slow_call_rate: Optional[float] = None,
+        window_size: Optional[int] = None,
+        min_calls: Optional[int] = None,
+        open_seconds: Optional[float] = None
+    ):
+        self.failure_rate = failure_rate if failure_rate is not None else settings.CIRCUIT_BREAKER_FAILURE_RATE
+        self.slow_call_seconds = slow_call_seconds or settings.CIRCUIT_BREAKER_SLOW_CALL_SECONDS
+        self.slow_call_rate = slow_call_rate if slow_call_rate is not None else settings.CIRCUIT_BREAKER_SLOW_CALL_RATE
+        self.min_calls = min_calls or settings.CIRCUIT_BREAKER_MIN_CALLS
+        self.open_seconds = open_seconds if open_seconds is not None else settings.CIRCUIT_BREAKER_OPEN_SECONDS
+
+        # (是否成功, 耗时)
+        self._calls: Deque[Tuple[bool, float]] = deque(maxlen=window_size or settings.CIRCUIT_BREAKER_WINDOW)
+        self.state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow_request(self) -> bool:
+        """是否放行一次调用（熔断到期后只放行一次试探调用）"""
+        if self.state == CircuitState.CLOSED:
+            return True
+        if self.state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self.state = CircuitState.HALF_OPEN
+            self._trial_in_flight = False
+        if self.state == CircuitState.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def is_available(self) -> bool:
+        """不占用试探名额地判断是否可能放行"""
+        if self.state == CircuitState.CLOSED:
+            return True
+        if self.state == CircuitState.OPEN:
+            return time.monotonic() - self._opened_at >= self.open_seconds
+        return not self._trial_in_flight
+
+    def record(self, success: bool, duration: float):
+        """记录一次调用结果"""
+        if self.state == CircuitState.HALF_OPEN:
+            self._trial_in_flight = False
+            if success:
+                self.state = CircuitState.CLOSED
+                self._calls.clear()
+                self._calls.append((success, duration))
+            else:
+                self._open()
+            return
+
+        self._calls.append((success, duration))
+        if self.state == CircuitState.CLOSED and len(self._calls) >= self.min_calls:
+            failures = sum(1 for ok, _ in self._calls if not ok)
+            slow = sum(1 for _, elapsed in self._calls if elapsed >= self.slow_call_seconds)
+            if failures / len(self._calls) >= self.failure_rate or slow / len(self._calls) >= self.slow_call_rate:
+                self._open()
+
+    def release(self):
+        """调用被取消、未产生结果时归还试探名额"""
+        if self.state == CircuitState.HALF_OPEN:
+            self._trial_in_flight = False
+
+    def _open(self):
+        self.state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        logger.warning(f"提供商熔断 {self.open_seconds} 秒")
+
+    def latency_p95(self) -> Optional[float]:
+        """最近成功调用的p95耗时，样本不足时为None"""
+        durations = sorted(elapsed for ok, elapsed in self._calls if ok)
+        if len(durations) < self.min_calls:
+            return None
+        return durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+
+    def get_stats(self) -> Dict[str, object]:
+        failures = sum(1 for ok, _ in self._calls if not ok)
+        return {
+            "state": self.state.value,
+            "calls": len(self._calls),
+            "failure_rate": failures / len(self._calls) if self._calls else 0.0,
+            "latency_p95": self.latency_p95()
+        }
+
+
+class ResilientTranslator:
+    """
+    带熔断、备用链和对冲请求的提供商调用
+
+    首选提供商在前，其后是 TRANSLATION_FALLBACK_CHAIN 中的其他提供商；
+    未配置（初始化失败）的备用提供商直接跳过。返回结果时同时返回每个句段实际完成翻译的提供商
+    """
+
+    def __init__(
+        self,
+        micro_batcher: MicroBatcher,
+        fallback_chain: Optional[List[TranslationProvider]] = None,
+        hedging: Optional[bool] = None,
+        hedge_min_delay: Optional[float] = None
+    ):
+        """
+        Args:
+            micro_batcher: 实际调用提供商的微批处理器
+            fallback_chain: 备用提供商链，默认按配置
+            hedging: 是否启用对冲请求，默认按配置
+            hedge_min_delay: 对冲请求的最短等待时间（秒）
+        """
+        self.micro_batcher = micro_batcher
+        self.fallback_chain = (
+            parse_provider_chain(settings.TRANSLATION_FALLBACK_CHAIN) if fallback_chain is None else fallback_chain
+        )
+        self.hedging = settings.TRANSLATION_HEDGING_ENABLED if hedging is None else hedging
+        self.hedge_min_delay = settings.TRANSLATION_HEDGE_MIN_DELAY if hedge_min_delay is None else hedge_min_delay
+        self.breakers: Dict[TranslationProvider, CircuitBreaker] = {}
+        self.stats = {"fallbacks": 0, "hedged": 0, "hedge_wins": 0, "rejected": 0}
+
+    def breaker(self, provider: TranslationProvider) -> CircuitBreaker:
+        if provider not in self.breakers:
+            self.breakers[provider] = CircuitBreaker()
+        return self.breakers[provider]
+
+    def _chain(self, provider: TranslationProvider) -> List[TranslationProvider]:
+        return [provider] + [p for p in self.fallback_chain if p != provider]
+
+    async def translate_batch(
+        self,
+        provider: TranslationProvider,
+        texts: List[str],
+        source_lang: str,
+        target_lang: str,
+        context: Optional[str] = None
+    ) -> Tuple[List[TranslationItem], List[TranslationProvider]]:
+        """
+        翻译文本，首选提供商不可用或失败时依次使用备用提供商
+
+        Returns:
+            Tuple[List[TranslationItem], List[TranslationProvider]]: (与texts一一对应的翻译结果, 每个句段实际
+            完成翻译的提供商)；所有提供商都失败的句段为最后一次的失败结果
+
+        Raises:
+            TranslationError: 所有提供商都熔断或调用失败
+        """
+        chain = self._chain(provider)
+        results: List[Optional[TranslationItem]] = [None] * len(texts)
+        answered_by: List[Optional[TranslationProvider]] = [None] * len(texts)
+        pending = list(range(len(texts)))
+        last_error: Optional[Exception] = None
+
+        position = 0
+        while pending and position < len(chain):
+            current = chain[position]
+            position += 1
+            instance = self._resolve(current, required=current == provider)
+            if instance is None:
+                continue
+            if not self.breaker(current).allow_request():
+                self.stats["rejected"] += 1
+                continue
+            if current != provider:
+                self.stats["fallbacks"] += 1
+
+            hedge = None
+            if self.hedging:
+                for candidate in chain[position:]:
+                    candidate_instance = self._resolve(candidate)
+                    if candidate_instance is not None and self.breaker(candidate).is_available():
+                        hedge = (candidate, candidate_instance)
+                        break
+            batch_texts = [texts[i] for i in pending]
+            try:
+                if hedge is None:
+                    items = await self._call(current, instance, batch_texts, source_lang, target_lang, context)
+                    used = current
+                else:
+                    items, used = await self._call_hedged(
+                        (current, instance), hedge, batch_texts, source_lang, target_lang, context
+                    )
+            except Exception as e:
+                last_error = e
+                logger.warning(f"提供商 {current.value} 翻译失败: {str(e)}")
+                continue
+            if used != current:
+                # 对冲请求胜出，链中跳过该提供商
+                position = chain.index(used) + 1
+
+            still_failed = []
+            for i, item in zip(pending, items):
+                results[i] = item
+                answered_by[i] = used
+                if is_failed_translation(item):
+                    still_failed.append(i)
+            # 返回的结果少于请求的句段时，缺少的句段按失败处理，交给下一个提供商
+            for i in pending[len(items):]:
+                results[i] = TranslationItem(
+                    original_text=texts[i],
+                    translated_text="[翻译失败: 提供商未返回结果]",
+                    confidence=0.0,
+                    provider=used,
+                    quality_score=0.0
+                )
+                answered_by[i] = used
+                still_failed.append(i)
+            pending = still_failed
+
+        if any(item is None for item in results):
+            if last_error is not None:
+                raise last_error
+            raise TranslationError(
+                f"No translation provider available (circuit open): {', '.join(p.value for p in chain)}",
+                provider.value
+            )
+        return results, answered_by
+
+    def _resolve(self, provider: TranslationProvider, required: bool = False) -> Optional[BaseTranslationProvider]:
+        """获取提供商实例；未配置的备用提供商返回None，首选提供商未配置时抛出异常"""
+        try:
+            return provider_factory.get_provider(provider)
+        except Exception:
+            if required:
+                raise
+            return None
+
+    async def _call(
+        self,
+        provider: TranslationProvider,
+        instance: BaseTranslationProvider,
+        texts: List[str],
+        source_lang: str,
+        target_lang: str,
+        context: Optional[str]
+    ) -> List[TranslationItem]:
+        """调用一个提供商并记录到其熔断器（全部句段失败视为调用失败）"""
+        breaker = self.breaker(provider)
+        start = time.monotonic()
+        try:
+            items = await self.micro_batcher.translate_batch(instance, texts, source_lang, target_lang, context)
+        except asyncio.CancelledError:
+            # 对冲请求中落败被取消
+            breaker.release()
+            raise
+        except Exception:
+            breaker.record(False, time.monotonic() - start)
+            raise
+        breaker.record(
+            not items or not all(is_failed_translation(item) for item in items),
+            time.monotonic() - start
+        )
+        return items
+
+    async def _call_hedged(
+        self,
+        primary: Tuple[TranslationProvider, BaseTranslationProvider],
+        secondary: Tuple[TranslationProvider, BaseTranslationProvider],
+        texts: List[str],
+        source_lang: str,
+        target_lang: str,
+        context: Optional[str]
+    ) -> Tuple[List[TranslationItem], TranslationProvider]:
+        """
+        对冲调用：首选提供商超过其p95耗时仍未返回时同时调用备用提供商，取先成功的结果
+
+        Args:
+            primary: (首选提供商, 实例)
+            secondary: (对冲使用的备用提供商, 实例)
+
+        Returns:
+            Tuple[List[TranslationItem], TranslationProvider]: (翻译结果, 结果来自的提供商)
+        """
+        primary_task = asyncio.ensure_future(
+            self._call(*primary, texts, source_lang, target_lang, context)
+        )
+        tasks = {primary_task: primary[0]}
+        # 调用方被取消或出错时，未完成的请求一并取消
+        try:
+            p95 = self.breaker(primary[0]).latency_p95()
+            if p95 is None:
+                return await primary_task, primary[0]
+
+            done, _ = await asyncio.wait({primary_task}, timeout=max(p95, self.hedge_min_delay))
+            if done or not self.breaker(secondary[0]).allow_request():
+                return await primary_task, primary[0]
+
+            self.stats["hedged"] += 1
+            hedge_task = asyncio.ensure_future(
+                self._call(*secondary, texts, source_lang, target_lang, context)
+            )
+            tasks[hedge_task] = secondary[0]
+            while True:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    used = tasks.pop(task)
+                    # 先成功的结果生效；另一个也结束时取最后结束的结果（或异常）
+                    if not tasks or (
+                        task.exception() is None
+                        and not all(is_failed_translation(i) for i in task.result())
+                    ):
+                        if used == secondary[0]:
+                            self.stats["hedge_wins"] += 1
+                        return task.result(), used
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def get_stats(self) -> Dict[str, object]:
+        """容错统计：各提供商熔断器状态、备用和对冲次数"""
+        return {
+            **self.stats,
+            "breakers": {provider.value: breaker.get_stats() for provider, breaker in self.breakers.items()}
+        }
@@ -0,0 +1,124 @@
+"""
+翻译请求合并（single-flight）
+并发请求中相同的未缓存句段只调用一次翻译提供商，其余请求等待并共享结果；
+最近翻译失败的句段在短时间内直接返回失败，避免反复请求故障中的提供商
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..schemas.translation import TranslationItem
+
+# 等待者收到该值表示leader已被取消、键已释放，需要重新认领（其中一个等待者成为新的leader）
+ABANDONED: Any = object()
+
+
+def is_failed_translation(item: TranslationItem) -> bool:
+    """提供商返回的失败结果（置信度为0）"""
+    return item.confidence <= 0
+
+
+class SingleFlight:
+    """
+    进行中翻译的登记表
+
+    - claim 按键登记：未在进行中的键由调用方负责翻译（leader），
+      已在进行中的键返回对应的 Future，调用方等待即可（follower）
+    - leader 必须对认领的每个键调用 resolve、fail 或 abandon；等待者只会收到翻译项、None（失败）
+      或 ABANDONED，leader的异常和取消不会传给其他请求
+    - 失败的键进入负缓存，failure_ttl 秒内的 claim 直接归为失败
+    """
+
+    def __init__(self, failure_ttl: float = 30.0):
+        self.failure_ttl = failure_ttl
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        # key -> 失败记录过期时间；TTL相同，插入顺序即过期顺序
+        self._failures: "OrderedDict[str, float]" = OrderedDict()
+
+        self.coalesced = 0
+        self.suppressed = 0
+
+    def claim(
+        self,
+        keys: List[str],
+        now: Optional[float] = None
+    ) -> Tuple[List[int], Dict[int, asyncio.Future], List[int]]:
+        """
+        认领一批键
+
+        Args:
+            keys: 键列表（可以有重复，重复的键只有第一个成为leader）
+            now: 当前时间戳（测试用）
+
+        Returns:
+            Tuple[List[int], Dict[int, asyncio.Future], List[int]]:
+            (需要调用方翻译的下标, 需要等待的 下标->Future, 近期失败直接跳过的下标)
+        """
+        now = time.time() if now is None else now
+        self._purge_failures(now)
+
+        leaders: List[int] = []
+        followers: Dict[int, asyncio.Future] = {}
+        failing: List[int] = []
+        loop = asyncio.get_running_loop()
+
+        for i, key in enumerate(keys):
+            if key in self._failures:
+                failing.append(i)
+                continue
+            future = self._in_flight.get(key)
+            if future is not None:
+                followers[i] = future
+                continue
+            self._in_flight[key] = loop.create_future()
+            leaders.append(i)
+
+        self.coalesced += len(followers)
+        self.suppressed += len(failing)
+        return leaders, followers, failing
+
+    def resolve(self, key: str, item: TranslationItem, now: Optional[float] = None):
+        """leader完成翻译，唤醒等待者；失败结果同时记入负缓存"""
+        future = self._in_flight.pop(key, None)
+        if is_failed_translation(item):
+            self._record_failure(key, time.time() if now is None else now)
+        if future is not None and not future.done():
+            future.set_result(item)
+
+    def fail(self, keys: Iterable[str], now: Optional[float] = None):
+        """leader翻译出错，等待者收到None（按失败处理），这些键记入负缓存"""
+        now = time.time() if now is None else now
+        for key in keys:
+            future = self._in_flight.pop(key, None)
+            self._record_failure(key, now)
+            if future is not None and not future.done():
+                future.set_result(None)
+
+    def abandon(self, keys: Iterable[str]):
+        """leader被取消（如客户端断开），释放这些键，等待者收到 ABANDONED 后重新认领"""
+        for key in keys:
+            future = self._in_flight.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(ABANDONED)
+
+    def _record_failure(self, key: str, now: float):
+        self._failures.pop(key, None)
+        self._failures[key] = now + self.failure_ttl
+
+    def _purge_failures(self, now: float):
+        failures = self._failures
+        while failures:
+            key, expires_at = next(iter(failures.items()))
+            if expires_at > now:
+                break
+            del failures[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """合并和失败抑制统计"""
+        return {
+            "in_flight": len(self._in_flight),
+            "coalesced": self.coalesced,
+            "recent_failures": len(self._failures),
+            "suppressed": self.suppressed
+        }
@@ -0,0 +1,134 @@
+"""
+翻译请求分阶段计时
+记录一次请求在预处理、缓存查询、提供商调用、质量评估、缓存写入、成本跟踪等阶段的耗时，
+用于响应的 Server-Timing 头和按阶段的延迟直方图
+"""
+import bisect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+# 直方图桶上界（毫秒），最后一个桶收集更慢的请求
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+_current_timer: ContextVar[Optional["StageTimer"]] = ContextVar("translation_stage_timer", default=None)
+
+
+class StageTimer:
+    """
+    一次请求的分阶段计时器
+
+    同名阶段多次进入时耗时累加；使用单调时钟，不受系统时间调整影响
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.durations: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """计时一个阶段"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] = self.durations.get(name, 0.0) + time.perf_counter() - start
+
+    def elapsed(self) -> float:
+        """从创建到现在的秒数"""
+        return time.perf_counter() - self.started_at
+
+    def as_milliseconds(self) -> Dict[str, float]:
+        """各阶段耗时（毫秒），另加 total 为总耗时"""
+        timings = {name: round(seconds * 1000, 3) for name, seconds in self.durations.items()}
+        timings["total"] = round(self.elapsed() * 1000, 3)
+        return timings
+
+    def server_timing_header(self) -> str:
+        """
+        Server-Timing 响应头的值
+
+        Returns:
+            str: 形如 "preprocess;dur=0.12, provider;dur=83.4, total;dur=90.1"
+        """
+        return ", ".join(f"{name};dur={duration}" for name, duration in self.as_milliseconds().items())
+
+
+@contextmanager
+def stage_timing(timer: StageTimer) -> Iterator[StageTimer]:
+    """在当前上下文中启用计时器，引擎内部各阶段通过 timed_stage 记录到该计时器"""
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_timer.reset(token)
+
+
+@contextmanager
+def timed_stage(name: str) -> Iterator[None]:
+    """当前上下文启用了计时器时计时一个阶段，否则什么都不做"""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    with timer.stage(name):
+        yield
+
+
+class _Histogram:
+    """固定桶的延迟直方图"""
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+
+    def record(self, milliseconds: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, milliseconds)] += 1
+        self.total += 1
+        self.sum_ms += milliseconds
+
+    def percentile(self, p: float) -> Optional[float]:
+        """分位数的桶上界估计（落在最后一个桶时为 inf）"""
+        if not self.total:
+            return None
+        rank = p * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else float("inf")
+        return float("inf")
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "count": self.total,
+            "mean_ms": round(self.sum_ms / self.total, 3) if self.total else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": {
+                **{f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS_MS, self.counts)},
+                "le_inf": self.counts[-1]
+            }
+        }
+
+
+class StageLatencyHistograms:
+    """按阶段聚合的延迟直方图，分位数为桶上界估计"""
+
+    def __init__(self):
+        self._histograms: Dict[str, _Histogram] = {}
+
+    def record(self, timer: StageTimer):
+        """记录一次请求的各阶段耗时"""
+        for name, milliseconds in timer.as_milliseconds().items():
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = _Histogram()
+            histogram.record(milliseconds)
+
+    def get_stats(self) -> Dict[str, Dict[str, object]]:
+        """各阶段的请求数、平均耗时、p50/p95/p99 和桶计数"""
+        return {name: histogram.get_stats() for name, histogram in self._histograms.items()}
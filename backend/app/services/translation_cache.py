@@ -2,28 +2,122 @@
 翻译缓存服务
 """
 import hashlib
-import json
-from typing import List, Optional, Dict, Any
+import heapq
+import logging
+import time
+from contextlib import asynccontextmanager
+from json.encoder import encode_basestring
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple, Union
 from datetime import datetime, timedelta
+from ..core.config import settings
+from ..utils.text_utils import normalize_text
 from ..schemas.translation import TranslationItem, TranslationProvider, TranslationCache as CacheModel
+from .cache_admission import TinyLFUAdmission
+from .cache_backends import MemoryCacheBackend, SharedCacheBackend, create_shared_backend
+from .cache_entry import CacheEntry
+from .cache_import import ImportRecord
+from .cache_search_index import CacheSearchIndex, facet_token
+from .cache_stats import CacheStatistics
+from .translation_memory import FuzzyTranslationMemory, patch_translation
+
+logger = logging.getLogger(__name__)
+# 开启DEBUG级别时逐条记录L1查询的缓存键，供 tests/performance/simulate_cache_policy.py 离线回放
+trace_logger = logging.getLogger(__name__ + ".trace")
+
+# 缓存键格式版本，键的规范化元组或哈希算法变化时递增
+# v1: 无版本前缀的 sha256(text|src|tgt|provider)，写入时语言对固定为en->zh，数据不可信
+# v2: "v2:" + blake2b-128(text, src, tgt, provider, model)
+CACHE_KEY_VERSION = 2
+CACHE_KEY_PREFIX = f"v{CACHE_KEY_VERSION}:"
+_KEY_SEPARATOR = "\x1f"
+
+
+def _import_record_json(cache_key: str, record: ImportRecord, timestamp: str) -> str:
+    """
+    导入记录直接序列化为L2缓存项（CacheModel）的JSON，不逐条构造 CacheEntry 和缓存模型
+
+    语言代码、提供商和质量分数已由导入器校验，只有文本和模型名需要转义
+    """
+    model_used = "null" if record.model_used is None else encode_basestring(record.model_used)
+    return (
+        f'{{"id":"{cache_key}","source_text":{encode_basestring(record.source_text)},'
+        f'"translated_text":{encode_basestring(record.translated_text)},'
+        f'"source_language":"{record.source_language}","target_language":"{record.target_language}",'
+        f'"provider":"{record.provider.value}","model_used":{model_used},'
+        f'"quality_score":{record.quality_score!r},"hit_count":0,'
+        f'"created_at":"{timestamp}","last_used_at":"{timestamp}"}}'
+    )
 
 
 class TranslationCache:
-    """翻译缓存管理器"""
+    """
+    翻译缓存管理器
     
-    def __init__(self):
-        # 内存缓存（生产环境应使用Redis）
-        self._cache: Dict[str, CacheModel] = {}
-        self.max_cache_size = 10000
+    两级缓存：每个worker进程内的L1（MemoryCacheBackend），
+    以及可选的跨进程共享L2（如Redis）。写入时同时写两级，
+    L2命中后提升到L1。L1保存紧凑的 CacheEntry，CacheModel 只在写入L2或返回给API时构建。
+    """
+    
+    def __init__(self, shared_backend: Optional[SharedCacheBackend] = None):
         self.cache_ttl_days = 30
         self.min_quality_for_cache = 0.6
+        # L1中超过该字节数的文本压缩保存
+        self.compress_min_bytes = settings.CACHE_COMPRESS_MIN_BYTES
+        # L1缓存内容的倒排索引，随L1写入/淘汰同步
+        self._search_index = CacheSearchIndex()
+        # L1缓存内容的统计，随L1写入/命中/淘汰增量维护
+        self._stats = CacheStatistics()
+        # 进程内L1缓存，tinylfu 时只出现一次的句段不会挤掉热点缓存项
+        self._cache = MemoryCacheBackend(
+            max_size=settings.CACHE_MAX_SIZE,
+            ttl_seconds=self.cache_ttl_days * 24 * 3600,
+            on_remove=self._on_l1_remove,
+            on_add=self._on_l1_add,
+            admission=self._create_admission_policy()
+        )
+        # 共享L2缓存，未显式传入时按配置创建（CACHE_BACKEND=memory 时为None）
+        self._shared: Optional[SharedCacheBackend] = shared_backend or create_shared_backend()
+        # 模糊翻译记忆，与精确缓存并列，用于近似重复句段；只收录L1中的项，随L1淘汰同步删除
+        self.fuzzy_memory = FuzzyTranslationMemory(
+            max_segments=settings.TRANSLATION_MEMORY_MAX_SEGMENTS,
+            similarity_threshold=settings.FUZZY_MATCH_THRESHOLD
+        )
+        
+        # 各级缓存命中统计
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def _create_admission_policy() -> Optional[TinyLFUAdmission]:
+        """根据配置创建L1准入策略，lru 时不使用准入过滤"""
+        policy = settings.CACHE_ADMISSION_POLICY.lower()
+        if policy == "lru":
+            return None
+        if policy == "tinylfu":
+            return TinyLFUAdmission(
+                capacity=settings.CACHE_MAX_SIZE,
+                window_ratio=settings.CACHE_ADMISSION_WINDOW_RATIO
+            )
+        
+        raise ValueError(f"Unsupported cache admission policy: {settings.CACHE_ADMISSION_POLICY}")
+    
+    @property
+    def max_cache_size(self) -> int:
+        """缓存最大条目数"""
+        return self._cache.max_size
+    
+    @max_cache_size.setter
+    def max_cache_size(self, value: int):
+        self._cache.max_size = value
     
     async def get_cached_translation(
         self,
         text: str,
         source_lang: str,
         target_lang: str,
-        provider: TranslationProvider
+        provider: TranslationProvider,
+        model: Optional[str] = None
     ) -> Optional[TranslationItem]:
         """
         获取缓存的翻译
@@ -33,193 +127,593 @@ class TranslationCache:
             source_lang: 源语言
             target_lang: 目标语言
             provider: 翻译提供商
+            model: 提供商使用的模型
             
         Returns:
             Optional[TranslationItem]: 缓存的翻译项，如果不存在则返回None
         """
-        cache_key = self._generate_cache_key(text, source_lang, target_lang, provider)
+        cache_key = self._generate_cache_key(text, source_lang, target_lang, provider, model)
+        if trace_logger.isEnabledFor(logging.DEBUG):
+            trace_logger.debug(cache_key)
         
+        # 过期项由后端在读取时惰性删除
         cached_item = self._cache.get(cache_key)
-        if not cached_item:
-            return None
+        if cached_item is not None:
+            self.l1_hits += 1
+        else:
+            cached_item = (await self._get_many_from_shared([cache_key]))[0]
+            if cached_item is None:
+                self.misses += 1
+                return None
+            self.l2_hits += 1
+        
+        return self._to_translation_item(cached_item, time.time())
+    
+    async def get_cached_translations_many(
+        self,
+        texts: List[str],
+        source_lang: str,
+        target_lang: str,
+        provider: TranslationProvider,
+        model: Optional[str] = None
+    ) -> Tuple[Dict[int, TranslationItem], List[int]]:
+        """
+        批量获取缓存的翻译
         
-        # 检查是否过期
-        if self._is_expired(cached_item):
-            del self._cache[cache_key]
-            return None
+        一次性计算所有缓存键，先查L1，L1未命中的键再对L2做一次批量读取（Redis上为MGET）。
+        
+        Args:
+            texts: 源文本列表
+            source_lang: 源语言
+            target_lang: 目标语言
+            provider: 翻译提供商
+            model: 提供商使用的模型
+            
+        Returns:
+            Tuple[Dict[int, TranslationItem], List[int]]: (命中的 下标->翻译项, 未命中的下标列表)
+        """
+        make_key = self._generate_cache_key
+        keys = [make_key(text, source_lang, target_lang, provider, model) for text in texts]
+        if trace_logger.isEnabledFor(logging.DEBUG):
+            for key in keys:
+                trace_logger.debug(key)
+        
+        l1_get = self._cache.get
+        found: Dict[int, CacheEntry] = {}
+        l1_miss_indices: List[int] = []
+        for i, key in enumerate(keys):
+            cached_item = l1_get(key)
+            if cached_item is not None:
+                found[i] = cached_item
+            else:
+                l1_miss_indices.append(i)
+        self.l1_hits += len(found)
+        
+        miss_indices = l1_miss_indices
+        if l1_miss_indices and self._shared is not None:
+            shared_items = await self._get_many_from_shared([keys[i] for i in l1_miss_indices])
+            miss_indices = []
+            for i, cached_item in zip(l1_miss_indices, shared_items):
+                if cached_item is not None:
+                    found[i] = cached_item
+                    self.l2_hits += 1
+                else:
+                    miss_indices.append(i)
+        self.misses += len(miss_indices)
+        
+        now = time.time()
+        hits = {i: self._to_translation_item(cached_item, now) for i, cached_item in found.items()}
+        
+        return hits, miss_indices
+    
+    def get_fuzzy_translation(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        provider: TranslationProvider,
+        threshold: Optional[float] = None,
+        model: Optional[str] = None
+    ) -> Optional[TranslationItem]:
+        """
+        从模糊翻译记忆中查找可复用的译文
+        
+        只有与匹配句段相比仅数字不同、且数字能在译文中定位时才复用（替换数字后返回），
+        其他差异（人名、措辞等）仍交给翻译提供商。
         
-        # 更新使用统计
+        Args:
+            text: 源文本
+            source_lang: 源语言
+            target_lang: 目标语言
+            provider: 翻译提供商
+            threshold: 相似度阈值，默认使用配置值
+            model: 模型名，只复用同一模型的译文
+            
+        Returns:
+            Optional[TranslationItem]: 修补后的翻译项，没有可复用的匹配时返回None
+        """
+        matches = self.fuzzy_memory.lookup(
+            text, source_lang, target_lang, provider=provider.value, threshold=threshold,
+            model=model
+        )
+        for match in matches:
+            patched = patch_translation(match.source_text, match.translated_text, text)
+            if patched is None:
+                continue
+            
+            return TranslationItem.model_construct(
+                original_text=text,
+                translated_text=patched,
+                confidence=min(0.9, match.similarity),
+                provider=provider,
+                model_used=model,
+                quality_score=match.quality_score
+            )
+        return None
+    
+    def _to_translation_item(self, cached_item: CacheEntry, now: float) -> TranslationItem:
+        """更新命中统计并把缓存项转换为TranslationItem（压缩保存的文本在这里解压）"""
+        self._stats.record_hit(cached_item, now)
         cached_item.hit_count += 1
-        cached_item.last_used_at = datetime.now()
+        cached_item.last_used_at = now
         
-        # 转换为TranslationItem
-        return TranslationItem(
+        # 缓存中的数据在写入时已校验过，这里跳过Pydantic校验
+        return TranslationItem.model_construct(
             original_text=cached_item.source_text,
             translated_text=cached_item.translated_text,
             confidence=0.9,  # 缓存的翻译给予较高置信度
             provider=cached_item.provider,
+            model_used=cached_item.model_used,
             quality_score=cached_item.quality_score
         )
     
-    async def cache_translation(self, translation: TranslationItem):
+    async def cache_translation(
+        self,
+        translation: TranslationItem,
+        source_lang: str,
+        target_lang: str,
+        model: Optional[str] = None
+    ):
         """
         缓存单个翻译
         
         Args:
             translation: 翻译项
+            source_lang: 源语言
+            target_lang: 目标语言
+            model: 提供商使用的模型
         """
-        await self.cache_translations([translation])
+        await self.cache_translations([translation], source_lang, target_lang, model)
     
-    async def cache_translations(self, translations: List[TranslationItem]):
+    async def cache_translations(
+        self,
+        translations: List[TranslationItem],
+        source_lang: str,
+        target_lang: str,
+        model: Optional[str] = None
+    ):
         """
         批量缓存翻译
         
         Args:
             translations: 翻译项列表
+            source_lang: 源语言
+            target_lang: 目标语言
+            model: 提供商使用的模型，需与查询时传入的一致
         """
+        stored = []
         for translation in translations:
             # 只缓存质量足够好的翻译
             if (translation.quality_score and 
                 translation.quality_score >= self.min_quality_for_cache and
                 translation.confidence > 0.5):
                 
-                await self._store_translation(translation)
-        
-        # 清理过期缓存
-        await self._cleanup_expired_cache()
+                stored.append(await self._store_translation(
+                    translation, source_lang, target_lang, model
+                ))
         
-        # 如果缓存过大，清理最少使用的项
-        if len(self._cache) > self.max_cache_size:
-            await self._cleanup_lru_cache()
+        # 写穿到共享缓存（一次pipeline）
+        await self._set_to_shared(stored)
     
-    async def _store_translation(self, translation: TranslationItem):
-        """存储翻译到缓存"""
-        # 这里假设我们知道源语言和目标语言
-        # 在实际实现中，这些信息应该从翻译请求中传递
-        source_lang = "en"  # 默认值，实际应该从上下文获取
-        target_lang = "zh"
-        
+    async def _get_many_from_shared(self, cache_keys: List[str]) -> List[Optional[CacheEntry]]:
+        """从共享缓存批量读取，命中项转换为条目并提升到L1"""
+        if self._shared is None:
+            return [None] * len(cache_keys)
+        
+        try:
+            cached_items = await self._shared.get_many(cache_keys)
+        except Exception as e:
+            # 共享缓存不可用时降级为仅使用L1
+            logger.warning(f"共享缓存读取失败: {e}")
+            return [None] * len(cache_keys)
+        
+        entries: List[Optional[CacheEntry]] = []
+        for cache_key, cached_item in zip(cache_keys, cached_items):
+            if cached_item is None:
+                entries.append(None)
+                continue
+            entry = CacheEntry.from_model(cached_item, self.compress_min_bytes)
+            self._set_l1(cache_key, entry, cached_item.source_text, cached_item.translated_text)
+            entries.append(entry)
+        return entries
+    
+    async def _set_to_shared(self, items: List[Tuple[str, CacheEntry, float]]):
+        """批量写入共享缓存"""
+        if self._shared is None or not items:
+            return
+        
+        try:
+            await self._shared.set_many([
+                (cache_key, entry.to_model(cache_key), expires_at)
+                for cache_key, entry, expires_at in items
+            ])
+        except Exception as e:
+            logger.warning(f"共享缓存写入失败: {e}")
+    
+    async def _store_translation(
+        self,
+        translation: TranslationItem,
+        source_lang: str,
+        target_lang: str,
+        model: Optional[str] = None
+    ) -> Tuple[str, CacheEntry, float]:
+        """存储翻译到L1缓存，返回供写穿L2使用的 (键, 缓存条目, 过期时间戳)"""
         cache_key = self._generate_cache_key(
             translation.original_text,
             source_lang,
             target_lang,
-            translation.provider
+            translation.provider,
+            model
         )
         
-        cache_item = CacheModel(
-            id=cache_key,
-            source_text=translation.original_text,
-            translated_text=translation.translated_text,
-            source_language=source_lang,
-            target_language=target_lang,
-            provider=translation.provider,
-            quality_score=translation.quality_score or 0.8,
+        now = time.time()
+        cache_item = CacheEntry(
+            translation.original_text,
+            translation.translated_text,
+            source_lang,
+            target_lang,
+            translation.provider,
+            model,
+            translation.quality_score or 0.8,
             hit_count=1,
-            created_at=datetime.now(),
-            last_used_at=datetime.now()
+            created_at=now,
+            last_used_at=now,
+            compress_min_bytes=self.compress_min_bytes
         )
         
-        self._cache[cache_key] = cache_item
+        expires_at = self._set_l1(
+            cache_key, cache_item, translation.original_text, translation.translated_text
+        )
+        return cache_key, cache_item, expires_at
+    
+    def _set_l1(
+        self,
+        cache_key: str,
+        cache_item: CacheEntry,
+        source_text: str,
+        translated_text: str
+    ) -> float:
+        """写入L1并更新倒排索引和模糊翻译记忆，返回过期时间戳（传入明文，避免为建索引解压）"""
+        # 后端负责分批清理过期项和LRU淘汰，离开L1的项通过 _on_l1_remove 撤销索引
+        expires_at = self._expires_at(cache_item.created_at)
+        self._cache.set(cache_key, cache_item, expires_at=expires_at)
+        if cache_key in self._cache:
+            # 写入时就被淘汰的项不进入模糊翻译记忆
+            self.fuzzy_memory.add(
+                source_text,
+                translated_text,
+                cache_item.source_language,
+                cache_item.target_language,
+                cache_item.provider.value,
+                cache_item.quality_score,
+                model=cache_item.model_used,
+                key=cache_key,
+                expires_at=expires_at
+            )
+        self._search_index.add(
+            cache_key,
+            source_text,
+            translated_text,
+            self._search_facets(
+                cache_item.source_language, cache_item.target_language, cache_item.provider
+            )
+        )
+        return expires_at
+    
+    def _on_l1_add(self, cache_key: str, cache_item: CacheEntry):
+        """L1写入缓存项时计入统计"""
+        self._stats.add(cache_item)
+    
+    def _on_l1_remove(self, cache_key: str, cache_item: CacheEntry):
+        """L1淘汰、过期、删除或覆盖缓存项时撤销索引、统计和模糊翻译记忆"""
+        self._search_index.remove(cache_key)
+        self._stats.remove(cache_item)
+        self.fuzzy_memory.discard(cache_key)
+    
+    @staticmethod
+    def _search_facets(
+        source_lang: Optional[str] = None,
+        target_lang: Optional[str] = None,
+        provider: Optional[TranslationProvider] = None
+    ) -> List[str]:
+        """把语言对和提供商过滤条件转换为索引词项"""
+        facets = []
+        if source_lang:
+            facets.append(facet_token("src", getattr(source_lang, "value", source_lang).lower()))
+        if target_lang:
+            facets.append(facet_token("tgt", getattr(target_lang, "value", target_lang).lower()))
+        if provider:
+            facets.append(facet_token("provider", getattr(provider, "value", provider)))
+        return facets
     
     def _generate_cache_key(
         self,
         text: str,
         source_lang: str,
         target_lang: str,
-        provider: TranslationProvider
+        provider: TranslationProvider,
+        model: Optional[str] = None
     ) -> str:
-        """生成缓存键"""
-        # 标准化文本（移除多余空格，统一换行符）
-        normalized_text = ' '.join(text.split())
+        """
+        生成缓存键
+        
+        对规范化元组 (文本, 源语言, 目标语言, 提供商, 模型) 计算 blake2b-128，
+        并加上键版本前缀，便于整体迁移或丢弃旧版本的缓存项。
+        引擎传入的已规范化文本不再重复规范化，算出的键记在文本实例上供同一请求复用。
+        """
+        normalized_text = normalize_text(text)
+        params = (source_lang, target_lang, provider, model)
+        cache_key = normalized_text.cache_keys.get(params)
+        if cache_key is not None:
+            return cache_key
         
-        # 创建缓存键的组合字符串
-        key_components = [
+        key_string = _KEY_SEPARATOR.join((
             normalized_text,
-            source_lang,
-            target_lang,
-            provider.value
-        ]
+            source_lang.lower(),
+            target_lang.lower(),
+            provider.value,
+            model or ""
+        ))
+        
+        digest = hashlib.blake2b(key_string.encode('utf-8'), digest_size=16).hexdigest()
+        cache_key = normalized_text.cache_keys[params] = CACHE_KEY_PREFIX + digest
+        return cache_key
+    
+    def cache_key(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        provider: TranslationProvider,
+        model: Optional[str] = None
+    ) -> str:
+        """计算缓存键（供请求合并等需要与缓存使用同一键的场景）"""
+        return self._generate_cache_key(text, source_lang, target_lang, provider, model)
+    
+    def _cache_key_for_item(self, cache_item: Union[CacheEntry, CacheModel]) -> str:
+        """根据缓存项自身的元数据计算当前版本的缓存键"""
+        return self._generate_cache_key(
+            cache_item.source_text,
+            cache_item.source_language,
+            cache_item.target_language,
+            cache_item.provider,
+            cache_item.model_used
+        )
+    
+    async def migrate_cache_keys(self) -> Dict[str, int]:
+        """
+        迁移旧版本缓存键
+        
+        - 带版本前缀但版本不是当前版本的缓存项：按缓存项元数据重新计算键后写回
+        - 无版本前缀的v1缓存项：语言对被固定写成en->zh，元数据不可信，直接丢弃
         
-        key_string = '|'.join(key_components)
+        Returns:
+            Dict[str, int]: 迁移和丢弃的缓存项数量
+        """
+        migrated = 0
+        dropped = 0
         
-        # 使用SHA256生成哈希
-        return hashlib.sha256(key_string.encode('utf-8')).hexdigest()
+        for key, cache_item in list(self._cache.items()):
+            if key.startswith(CACHE_KEY_PREFIX):
+                continue
+            self._cache.delete(key)
+            if self._is_versioned_key(key):
+                new_key = self._cache_key_for_item(cache_item)
+                self._set_l1(new_key, cache_item, cache_item.source_text, cache_item.translated_text)
+                migrated += 1
+            else:
+                dropped += 1
+        
+        if self._shared is not None:
+            try:
+                shared_migrated, shared_dropped = await self._migrate_shared_keys()
+                migrated += shared_migrated
+                dropped += shared_dropped
+            except Exception as e:
+                logger.warning(f"共享缓存键迁移失败: {e}")
+        
+        return {"migrated": migrated, "dropped": dropped}
+    
+    async def _migrate_shared_keys(self, batch_size: int = 500) -> Tuple[int, int]:
+        """分批迁移共享缓存中的旧版本缓存键"""
+        migrated = 0
+        dropped = 0
+        stale_keys = []
+        
+        async for key in self._shared.scan_keys():
+            if not key.startswith(CACHE_KEY_PREFIX):
+                stale_keys.append(key)
+        
+        for start in range(0, len(stale_keys), batch_size):
+            batch = stale_keys[start:start + batch_size]
+            versioned = [key for key in batch if self._is_versioned_key(key)]
+            
+            rewritten = []
+            for cache_item in await self._shared.get_many(versioned):
+                if cache_item is None:
+                    continue
+                new_key = self._cache_key_for_item(cache_item)
+                cache_item.id = new_key
+                rewritten.append((new_key, cache_item, self._expires_at(cache_item.created_at.timestamp())))
+            
+            await self._shared.set_many(rewritten)
+            await self._shared.delete_many(batch)
+            migrated += len(rewritten)
+            dropped += len(batch) - len(rewritten)
+        
+        return migrated, dropped
     
-    def _is_expired(self, cache_item: CacheModel) -> bool:
+    @staticmethod
+    def _is_versioned_key(key: str) -> bool:
+        """是否为带版本前缀（v<N>:）的缓存键"""
+        version, sep, _ = key.partition(":")
+        return bool(sep) and version.startswith("v") and version[1:].isdigit()
+    
+    def _expires_at(self, created_at: float) -> float:
+        """根据创建时间戳计算过期时间戳"""
+        return created_at + self.cache_ttl_days * 24 * 3600
+    
+    def _is_expired(self, cache_item: CacheEntry) -> bool:
         """检查缓存项是否过期"""
-        expiry_date = cache_item.created_at + timedelta(days=self.cache_ttl_days)
-        return datetime.now() > expiry_date
-    
-    async def _cleanup_expired_cache(self):
-        """清理过期的缓存项"""
-        expired_keys = []
-        
-        for key, cache_item in self._cache.items():
-            if self._is_expired(cache_item):
-                expired_keys.append(key)
-        
-        for key in expired_keys:
-            del self._cache[key]
-    
-    async def _cleanup_lru_cache(self):
-        """清理最少使用的缓存项"""
-        # 按最后使用时间排序，删除最旧的项
-        sorted_items = sorted(
-            self._cache.items(),
-            key=lambda x: x[1].last_used_at
-        )
+        return time.time() > self._expires_at(cache_item.created_at)
+    
+    async def purge_expired(self) -> int:
+        """
+        清理全部过期的缓存项
+        
+        Returns:
+            int: 清理的缓存项数量
+        """
+        return self._cache.purge_expired()
+    
+    async def compact_cache(self, vacuum: bool = False) -> Dict[str, int]:
+        """
+        压缩缓存存储：清理L1过期项，并压缩持久化的L2（如SQLite的过期删除和空闲页回收）
+        
+        Args:
+            vacuum: 是否完整重建L2存储文件
+            
+        Returns:
+            Dict[str, int]: 各级缓存删除的缓存项数量
+        """
+        l1_removed = await self.purge_expired()
+        l2_removed = await self._shared.compact(vacuum) if self._shared is not None else 0
+        
+        return {"l1_removed": l1_removed, "l2_removed": l2_removed}
+    
+    async def aclose(self):
+        """释放L2共享缓存的连接和执行器（进程关闭时调用）"""
+        if self._shared is not None:
+            await self._shared.aclose()
+
+    async def import_translations(self, records: List[ImportRecord]) -> Dict[str, int]:
+        """
+        批量导入翻译（缓存预热）
+
+        L1只填充空闲容量，不挤掉已有的热点项（L1的索引、统计和模糊翻译记忆只为这部分记录更新）；
+        配置了共享缓存时全部记录直接序列化后一次写入L2，写入失败时抛出异常，由调用方报告导入失败
+
+        Args:
+            records: 导入记录列表
+
+        Returns:
+            Dict[str, int]: 加载到L1和写入L2的记录数
+        """
+        now = time.time()
+        expires_at = self._expires_at(now)
+        created_at = datetime.fromtimestamp(now).isoformat()
+        make_key = self._generate_cache_key
+        l1_free = self._cache.max_size - len(self._cache)
+        l1_loaded = 0
+        shared_items = []
+
+        for record in records:
+            to_l1 = l1_loaded < l1_free
+            if not to_l1 and self._shared is None:
+                break
+            cache_key = make_key(
+                record.source_text,
+                record.source_language,
+                record.target_language,
+                record.provider,
+                record.model_used
+            )
+            if to_l1:
+                entry = CacheEntry(
+                    record.source_text,
+                    record.translated_text,
+                    record.source_language,
+                    record.target_language,
+                    record.provider,
+                    record.model_used,
+                    record.quality_score,
+                    hit_count=0,
+                    created_at=now,
+                    last_used_at=now,
+                    compress_min_bytes=self.compress_min_bytes
+                )
+                self._set_l1(cache_key, entry, record.source_text, record.translated_text)
+                l1_loaded += 1
+            if self._shared is not None:
+                shared_items.append((cache_key, _import_record_json(cache_key, record, created_at), expires_at))
+
+        if shared_items:
+            await self._shared.set_many_raw(shared_items)
+        return {"l1_loaded": l1_loaded, "l2_loaded": len(shared_items)}
+
+    @asynccontextmanager
+    async def bulk_import(self) -> AsyncIterator[None]:
+        """批量导入期间让共享缓存进入批量写入模式（SQLite暂停WAL自动检查点）"""
+        if self._shared is None:
+            yield
+            return
+        async with self._shared.bulk_load():
+            yield
+
+    def get_tier_stats(self) -> Dict[str, Any]:
+        """获取各级缓存的命中统计"""
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        # 只有L1未命中的查询才会访问L2
+        l2_lookups = self.l2_hits + self.misses
         
-        # 删除最旧的20%
-        items_to_remove = int(len(sorted_items) * 0.2)
+        admission = self._cache.admission
         
-        for i in range(items_to_remove):
-            key = sorted_items[i][0]
-            del self._cache[key]
+        return {
+            "backend": self._shared.name if self._shared else "memory",
+            "admission_policy": "tinylfu" if admission else "lru",
+            "l1_evictions": self._cache.evictions,
+            "admission_rejections": admission.rejected if admission else 0,
+            "lookups": lookups,
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "l1_hit_rate": round(self.l1_hits / lookups, 4) if lookups else 0.0,
+            "l2_hit_rate": round(self.l2_hits / l2_lookups, 4) if l2_lookups else 0.0,
+            "overall_hit_rate": round((self.l1_hits + self.l2_hits) / lookups, 4) if lookups else 0.0
+        }
     
     async def get_cache_stats(self) -> Dict[str, Any]:
-        """获取缓存统计信息"""
-        if not self._cache:
-            return {
-                "total_items": 0,
-                "cache_size_mb": 0,
-                "hit_rate": 0.0,
-                "average_quality": 0.0,
-                "provider_distribution": {},
-                "language_pairs": {}
-            }
-        
-        total_hits = sum(item.hit_count for item in self._cache.values())
-        total_quality = sum(item.quality_score for item in self._cache.values())
-        
-        # 提供商分布
-        provider_dist = {}
-        for item in self._cache.values():
-            provider = item.provider.value
-            provider_dist[provider] = provider_dist.get(provider, 0) + 1
-        
-        # 语言对分布
-        language_pairs = {}
-        for item in self._cache.values():
-            pair = f"{item.source_language}-{item.target_language}"
-            language_pairs[pair] = language_pairs.get(pair, 0) + 1
-        
-        # 估算缓存大小
-        cache_size_bytes = sum(
-            len(item.source_text.encode('utf-8')) + 
-            len(item.translated_text.encode('utf-8'))
-            for item in self._cache.values()
-        )
+        """获取缓存统计信息（读取增量维护的计数，不遍历缓存）"""
+        stats = self._stats
+        total_items = stats.total_items
+        oldest = stats.oldest_created_at
+        newest = stats.newest_created_at
+        tier_stats = self.get_tier_stats()
         
         return {
-            "total_items": len(self._cache),
-            "cache_size_mb": round(cache_size_bytes / (1024 * 1024), 2),
-            "total_hits": total_hits,
-            "average_hits_per_item": round(total_hits / len(self._cache), 2),
-            "average_quality": round(total_quality / len(self._cache), 3),
-            "provider_distribution": provider_dist,
-            "language_pairs": language_pairs,
-            "oldest_item": min(item.created_at for item in self._cache.values()).isoformat(),
-            "newest_item": max(item.created_at for item in self._cache.values()).isoformat()
+            "total_items": total_items,
+            "cache_size_mb": round(stats.total_bytes / (1024 * 1024), 2),
+            "hits": self.l1_hits + self.l2_hits,
+            "misses": self.misses,
+            "hit_rate": tier_stats["overall_hit_rate"],
+            "total_hits": stats.total_hits,
+            "average_hits_per_item": round(stats.total_hits / total_items, 2) if total_items else 0.0,
+            "average_quality": round(stats.total_quality / total_items, 3) if total_items else 0.0,
+            "provider_distribution": dict(stats.provider_counts),
+            "language_pairs": dict(stats.language_pair_counts),
+            "oldest_item": oldest.isoformat() if oldest else None,
+            "newest_item": newest.isoformat() if newest else None,
+            "tier_stats": tier_stats
         }
     
     async def search_cache(
@@ -233,6 +727,9 @@ class TranslationCache:
         """
         搜索缓存内容
         
+        通过倒排索引查找同时包含查询中所有词项（英文按单词、CJK按二元组）
+        且满足过滤条件的缓存项，按质量分数、命中次数排序后取前limit条。
+        
         Args:
             query: 搜索查询
             source_lang: 源语言过滤
@@ -243,30 +740,19 @@ class TranslationCache:
         Returns:
             List[CacheModel]: 匹配的缓存项
         """
-        results = []
-        query_lower = query.lower()
-        
-        for cache_item in self._cache.values():
-            # 应用过滤条件
-            if source_lang and cache_item.source_language != source_lang:
-                continue
-            if target_lang and cache_item.target_language != target_lang:
-                continue
-            if provider and cache_item.provider != provider:
-                continue
-            
-            # 检查是否匹配查询
-            if (query_lower in cache_item.source_text.lower() or
-                query_lower in cache_item.translated_text.lower()):
-                results.append(cache_item)
-            
-            if len(results) >= limit:
-                break
-        
-        # 按质量分数排序
-        results.sort(key=lambda x: x.quality_score, reverse=True)
+        matched_keys = self._search_index.search(
+            query, self._search_facets(source_lang, target_lang, provider)
+        )
         
-        return results
+        results = []
+        for key in matched_keys:
+            cache_item = self._cache.peek(key)
+            if cache_item is not None:
+                results.append((key, cache_item))
+        
+        # 先排序再截断，只为返回的条目构建CacheModel
+        top = heapq.nlargest(limit, results, key=lambda x: (x[1].quality_score, x[1].hit_count))
+        return [cache_item.to_model(key) for key, cache_item in top]
     
     async def clear_cache(
         self,
@@ -276,13 +762,19 @@ class TranslationCache:
         """
         清理缓存
         
+        不带过滤条件时同时清空共享缓存；带过滤条件时，
+        共享缓存中只删除本进程L1里匹配到的条目。
+        
         Args:
             provider: 只清理指定提供商的缓存
             older_than_days: 只清理超过指定天数的缓存
         """
         keys_to_remove = []
+        cutoff = None
+        if older_than_days:
+            cutoff = (datetime.now() - timedelta(days=older_than_days)).timestamp()
         
-        for key, cache_item in self._cache.items():
+        for key, cache_item in list(self._cache.items()):
             should_remove = True
             
             # 提供商过滤
@@ -290,82 +782,71 @@ class TranslationCache:
                 should_remove = False
             
             # 时间过滤
-            if older_than_days:
-                cutoff_date = datetime.now() - timedelta(days=older_than_days)
-                if cache_item.created_at > cutoff_date:
-                    should_remove = False
+            if cutoff is not None and cache_item.created_at > cutoff:
+                should_remove = False
             
             if should_remove:
                 keys_to_remove.append(key)
         
         for key in keys_to_remove:
-            del self._cache[key]
+            self._cache.delete(key)
+
+        if provider is None and older_than_days is None:
+            self.fuzzy_memory.clear()
+
+        if self._shared is not None:
+            try:
+                if provider is None and older_than_days is None:
+                    await self._shared.clear()
+                else:
+                    await self._shared.delete_many(keys_to_remove)
+            except Exception as e:
+                logger.warning(f"共享缓存清理失败: {e}")
     
     async def get_cache_efficiency_report(self) -> Dict[str, Any]:
-        """获取缓存效率报告"""
-        if not self._cache:
+        """获取缓存效率报告（读取增量维护的计数，不遍历缓存）"""
+        stats = self._stats
+        total_items = stats.total_items
+        if not total_items:
             return {"message": "缓存为空"}
         
-        # 计算各种效率指标
-        items = list(self._cache.values())
-        
-        # 命中率分析
-        hit_counts = [item.hit_count for item in items]
-        high_hit_items = len([h for h in hit_counts if h > 5])
-        low_hit_items = len([h for h in hit_counts if h == 1])
-        
-        # 质量分析
-        quality_scores = [item.quality_score for item in items]
-        high_quality_items = len([q for q in quality_scores if q > 0.8])
-        low_quality_items = len([q for q in quality_scores if q < 0.6])
-        
-        # 时间分析
-        now = datetime.now()
-        recent_items = len([
-            item for item in items 
-            if (now - item.last_used_at).days < 7
-        ])
+        recent_items = stats.used_within_days(7)
         
         return {
-            "total_items": len(items),
+            "total_items": total_items,
             "efficiency_metrics": {
-                "high_hit_items": high_hit_items,
-                "low_hit_items": low_hit_items,
-                "hit_efficiency": round((high_hit_items / len(items)) * 100, 1),
-                "high_quality_items": high_quality_items,
-                "low_quality_items": low_quality_items,
-                "quality_efficiency": round((high_quality_items / len(items)) * 100, 1),
+                "high_hit_items": stats.high_hit_items,
+                "low_hit_items": stats.single_hit_items,
+                "hit_efficiency": round((stats.high_hit_items / total_items) * 100, 1),
+                "high_quality_items": stats.high_quality_items,
+                "low_quality_items": stats.low_quality_items,
+                "quality_efficiency": round((stats.high_quality_items / total_items) * 100, 1),
                 "recent_usage_items": recent_items,
-                "usage_efficiency": round((recent_items / len(items)) * 100, 1)
+                "usage_efficiency": round((recent_items / total_items) * 100, 1)
             },
-            "recommendations": self._generate_cache_recommendations(items)
+            "recommendations": self._generate_cache_recommendations()
         }
     
-    def _generate_cache_recommendations(self, items: List[CacheModel]) -> List[str]:
+    def _generate_cache_recommendations(self) -> List[str]:
         """生成缓存优化建议"""
         recommendations = []
+        stats = self._stats
+        total_items = stats.total_items
         
         # 分析命中率
-        low_hit_items = len([item for item in items if item.hit_count == 1])
-        if low_hit_items > len(items) * 0.5:
+        if stats.single_hit_items > total_items * 0.5:
             recommendations.append("考虑提高缓存质量阈值，减少低命中率项目")
         
         # 分析质量
-        low_quality_items = len([item for item in items if item.quality_score < 0.6])
-        if low_quality_items > len(items) * 0.2:
+        if stats.low_quality_items > total_items * 0.2:
             recommendations.append("考虑清理低质量缓存项目")
         
         # 分析使用时间
-        now = datetime.now()
-        old_items = len([
-            item for item in items 
-            if (now - item.last_used_at).days > 14
-        ])
-        if old_items > len(items) * 0.3:
+        if stats.unused_for_days(14) > total_items * 0.3:
             recommendations.append("考虑清理长时间未使用的缓存项目")
         
         # 分析缓存大小
-        if len(items) > self.max_cache_size * 0.8:
+        if total_items > self.max_cache_size * 0.8:
             recommendations.append("缓存接近容量限制，考虑扩容或清理")
         
         return recommendations
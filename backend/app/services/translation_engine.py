@@ -1,18 +1,32 @@
 """
 智能翻译引擎核心服务
 """
+import asyncio
+import logging
 import uuid
 import time
-from typing import List, Dict, Optional, Tuple
+from typing import AsyncIterator, List, Dict, Optional, Set, Tuple, Union
 from datetime import datetime
 from ..schemas.translation import (
     TranslationRequest, TranslationResult, TranslationItem, TranslationJob,
-    TranslationProvider, TranslationStatus, QualityLevel, TranslationSuggestion
+    TranslationProvider, TranslationStatus, QualityLevel, TranslationSuggestion,
+    TranslationStreamItem, TranslationStreamSummary
 )
+from ..core.config import settings
 from ..providers.provider_factory import provider_factory
+from ..providers.request_scheduler import RequestPriority, current_priority, request_scope
+from ..utils.text_utils import NormalizedText, normalize_text
 from .translation_cache import TranslationCache
 from .translation_quality import QualityAssessor
 from .cost_tracker import CostTracker
+from .single_flight import ABANDONED, SingleFlight
+from .job_store import create_job_store, set_job_progress
+from .job_workers import JobWorkerPool
+from .micro_batcher import MicroBatcher
+from .provider_resilience import ResilientTranslator
+from .stage_timing import StageLatencyHistograms, StageTimer, stage_timing, timed_stage
+
+logger = logging.getLogger(__name__)
 
 
 class TranslationEngine:
@@ -22,58 +36,79 @@ class TranslationEngine:
         self.cache = TranslationCache()
         self.quality_assessor = QualityAssessor()
         self.cost_tracker = CostTracker()
-        self.active_jobs: Dict[str, TranslationJob] = {}
+        # 翻译任务持久化在任务存储中，由按提供商限流的工作池执行
+        self.job_store = create_job_store()
+        self.job_workers = JobWorkerPool(self.job_store, self._execute_translation_job)
+        # 并发请求中相同句段的翻译合并，以及近期失败句段的负缓存
+        self.single_flight = SingleFlight(failure_ttl=settings.TRANSLATION_FAILURE_CACHE_TTL)
+        # 并发的小请求合并为整批提供商调用
+        self.micro_batcher = MicroBatcher()
+        # 提供商熔断、备用提供商链和对冲请求
+        self.resilience = ResilientTranslator(self.micro_batcher)
+        # 按阶段聚合的请求延迟
+        self.stage_latency = StageLatencyHistograms()
     
-    async def translate_batch(self, request: TranslationRequest) -> TranslationResult:
+    async def translate_batch(
+        self,
+        request: TranslationRequest,
+        timer: Optional[StageTimer] = None
+    ) -> TranslationResult:
         """
         批量翻译文本
         
         Args:
             request: 翻译请求
+            timer: 分阶段计时器，调用方需要各阶段耗时（如 Server-Timing 头）时传入
             
         Returns:
-            TranslationResult: 翻译结果
+            TranslationResult: 翻译结果，request.include_timings 为真时带各阶段耗时
         """
+        timer = timer or StageTimer()
+        with stage_timing(timer):
+            result = await self._translate_batch(request)
+        
+        self.stage_latency.record(timer)
+        if request.include_timings:
+            result.stage_timings = timer.as_milliseconds()
+        return result
+    
+    async def _translate_batch(self, request: TranslationRequest) -> TranslationResult:
+        """批量翻译的各个阶段，在 translate_batch 启用的计时器下分别计时"""
         start_time = time.time()
         
         # 1. 预处理文本
-        cleaned_texts = self._preprocess_texts(request.texts)
+        with timed_stage("preprocess"):
+            cleaned_texts = self._preprocess_texts(request.texts)
+            
+            # 批内去重：规范化后相同的文本只查一次缓存、只翻译和评估一次，最后按位置展开
+            unique_texts, positions = self._dedupe_texts(cleaned_texts)
         
         # 2. 检查缓存
-        cached_results, uncached_texts = await self._check_cache(
-            cleaned_texts, request
-        ) if request.use_cache else ([], cleaned_texts)
+        if request.use_cache:
+            with timed_stage("cache_lookup"):
+                cached_results, miss_indices = await self._check_cache(unique_texts, request)
+        else:
+            cached_results, miss_indices = {}, list(range(len(unique_texts)))
+        uncached_texts = [unique_texts[i] for i in miss_indices]
         
-        # 3. 翻译未缓存的文本
-        new_translations = []
+        # 3. 翻译未缓存的文本（含质量评估和写缓存），与并发请求中相同的句段合并为一次调用
+        new_translations: List[Optional[TranslationItem]] = []
+        usage: Dict[TranslationProvider, Dict[str, int]] = {}
         if uncached_texts:
-            new_translations = await self._translate_uncached_texts(
+            new_translations, usage = await self._translate_uncached_texts(
                 uncached_texts, request
             )
-            
-            # 4. 质量评估
-            quality_scores = await self.quality_assessor.assess_batch(
-                uncached_texts, [t.translated_text for t in new_translations]
-            )
-            
-            # 更新质量分数
-            for translation, quality in zip(new_translations, quality_scores):
-                translation.quality_score = quality.overall_score
-            
-            # 5. 缓存新翻译
-            if request.use_cache:
-                await self.cache.cache_translations(new_translations)
         
-        # 6. 合并结果
-        all_translations = self._merge_translation_results(
-            cached_results, new_translations, cleaned_texts
+        # 6. 合并结果，展开到原始位置
+        unique_translations = self._merge_translation_results(
+            cached_results, miss_indices, new_translations, unique_texts
         )
+        all_translations = [unique_translations[j] for j in positions]
+        cache_hit_count = sum(1 for j in positions if j in cached_results)
         
-        # 7. 成本跟踪
-        total_cost = await self.cost_tracker.track_translation_usage(
-            request.provider, len(uncached_texts), 
-            sum(len(t) for t in uncached_texts)
-        )
+        # 7. 成本跟踪（只计实际发给提供商的文本，按实际完成翻译的提供商记录）
+        with timed_stage("cost_tracking"):
+            total_cost = await self._track_usage(request.provider, usage)
         
         # 8. 生成结果
         processing_time = time.time() - start_time
@@ -82,21 +117,146 @@ class TranslationEngine:
             translations=all_translations,
             total_count=len(all_translations),
             success_count=len([t for t in all_translations if t.confidence > 0]),
-            cache_hit_count=len(cached_results),
-            cache_hit_rate=len(cached_results) / len(cleaned_texts) if cleaned_texts else 0,
+            cache_hit_count=cache_hit_count,
+            cache_hit_rate=cache_hit_count / len(cleaned_texts) if cleaned_texts else 0,
+            dedup_ratio=1 - len(unique_texts) / len(cleaned_texts) if cleaned_texts else 0,
             provider_used=request.provider,
             total_cost=total_cost,
             processing_time=processing_time,
             quality_summary=self._generate_quality_summary(all_translations)
         )
     
+    async def translate_batch_stream(
+        self,
+        request: TranslationRequest
+    ) -> AsyncIterator[Union[TranslationStreamItem, TranslationStreamSummary]]:
+        """
+        流式批量翻译
+        
+        按 TRANSLATION_STREAM_BATCH_SIZE 分窗口查缓存，命中项立即返回；未命中的句段凑满一个子批次
+        就发给提供商，最多 TRANSLATION_STREAM_CONCURRENCY 个子批次同时进行，哪个先完成先返回。
+        结果不保证按下标顺序返回，最后返回一条汇总记录。
+        
+        Args:
+            request: 翻译请求
+            
+        Yields:
+            Union[TranslationStreamItem, TranslationStreamSummary]: 单条结果，最后一条为汇总
+        """
+        start_time = time.time()
+        batch_size = max(1, settings.TRANSLATION_STREAM_BATCH_SIZE)
+        concurrency = max(1, settings.TRANSLATION_STREAM_CONCURRENCY)
+        
+        cleaned_texts = self._preprocess_texts(request.texts)
+        quality_summary = {level.value: 0 for level in QualityLevel}
+        counts = {"success": 0, "cache_hits": 0}
+        usage: Dict[TranslationProvider, Dict[str, int]] = {}
+        
+        def emit(index: int, translation: TranslationItem, cached: bool) -> TranslationStreamItem:
+            if translation.confidence > 0:
+                counts["success"] += 1
+            quality_summary[self._get_quality_level(translation.quality_score or 0.0).value] += 1
+            return TranslationStreamItem(index=index, cached=cached, translation=translation)
+        
+        pending: Set[asyncio.Task] = set()
+        miss_buffer: List[int] = []
+        
+        def submit(indices: List[int]):
+            pending.add(asyncio.ensure_future(
+                self._translate_stream_batch(indices, [cleaned_texts[i] for i in indices], request)
+            ))
+        
+        def collect(done: Set[asyncio.Task]):
+            for task in done:
+                results, batch_usage = task.result()
+                self._merge_usage(usage, batch_usage)
+                for index, translation in results:
+                    yield emit(index, translation, False)
+        
+        try:
+            for start in range(0, len(cleaned_texts), batch_size):
+                window = cleaned_texts[start:start + batch_size]
+                if request.use_cache:
+                    cached_results, miss_indices = await self._check_cache(window, request)
+                else:
+                    cached_results, miss_indices = {}, list(range(len(window)))
+                
+                counts["cache_hits"] += len(cached_results)
+                for i in sorted(cached_results):
+                    yield emit(start + i, cached_results[i], True)
+                
+                miss_buffer.extend(start + i for i in miss_indices)
+                while len(miss_buffer) >= batch_size:
+                    submit(miss_buffer[:batch_size])
+                    del miss_buffer[:batch_size]
+                
+                # 已完成的子批次先返回；并发已满时等待其中一个完成
+                while pending:
+                    done = {task for task in pending if task.done()}
+                    if not done and len(pending) < concurrency:
+                        break
+                    if not done:
+                        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    pending -= done
+                    for item in collect(done):
+                        yield item
+            
+            if miss_buffer:
+                submit(miss_buffer)
+                miss_buffer = []
+            
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for item in collect(done):
+                    yield item
+        finally:
+            # 客户端断开或出错时取消还在进行的子批次
+            for task in pending:
+                task.cancel()
+        
+        # 成本跟踪（只计实际发给提供商的文本，按实际完成翻译的提供商记录）
+        total_cost = await self._track_usage(request.provider, usage)
+        
+        yield TranslationStreamSummary(
+            total_count=len(cleaned_texts),
+            success_count=counts["success"],
+            cache_hit_count=counts["cache_hits"],
+            cache_hit_rate=counts["cache_hits"] / len(cleaned_texts) if cleaned_texts else 0,
+            provider_used=request.provider,
+            total_cost=total_cost,
+            processing_time=time.time() - start_time,
+            quality_summary=quality_summary
+        )
+    
+    async def _translate_stream_batch(
+        self,
+        indices: List[int],
+        texts: List[str],
+        request: TranslationRequest
+    ) -> Tuple[List[Tuple[int, TranslationItem]], Dict[TranslationProvider, Dict[str, int]]]:
+        """
+        翻译流式请求的一个子批次
+        
+        Returns:
+            Tuple[List[Tuple[int, TranslationItem]], Dict[TranslationProvider, Dict[str, int]]]:
+            ((下标, 翻译项)列表, 各提供商的使用量)
+        """
+        translations, usage = await self._translate_uncached_texts(texts, request)
+        results = [
+            (index, translation if translation is not None else self._failed_translation(text))
+            for index, text, translation in zip(indices, texts, translations)
+        ]
+        return results, usage
+    
     async def get_translation_suggestions(
         self, 
         text: str,
         providers: List[TranslationProvider],
         source_lang: str = "en",
         target_lang: str = "zh",
-        context: Optional[str] = None
+        context: Optional[str] = None,
+        timeout: Optional[float] = None,
+        min_quality_score: Optional[float] = None
     ) -> List[TranslationSuggestion]:
         """
         获取多个提供商的翻译建议
@@ -107,72 +267,146 @@ class TranslationEngine:
             source_lang: 源语言
             target_lang: 目标语言
             context: 翻译上下文
+            timeout: 等待提供商的最长时间（秒），默认 TRANSLATION_SUGGESTION_TIMEOUT
+            min_quality_score: 设置时得到第一个达到该分数的建议后取消其余提供商
             
         Returns:
-            List[TranslationSuggestion]: 翻译建议列表
+            List[TranslationSuggestion]: 翻译建议列表（按质量分数排序）
         """
-        suggestions = []
-        
-        for provider in providers:
-            try:
-                # 检查缓存
-                cached_result = await self.cache.get_cached_translation(
-                    text, source_lang, target_lang, provider
-                )
-                
-                if cached_result:
-                    # 使用缓存结果
-                    suggestion = TranslationSuggestion(
-                        original_text=text,
-                        translated_text=cached_result.translated_text,
-                        provider=provider,
-                        confidence=cached_result.confidence,
-                        quality_score=cached_result.quality_score or 0.8,
-                        quality_level=self._get_quality_level(cached_result.quality_score or 0.8),
-                        is_cached=True,
-                        cost=0.0
-                    )
-                else:
-                    # 调用翻译服务
-                    provider_instance = provider_factory.get_provider(provider)
-                    translation_item = await provider_instance.translate_single(
-                        text, source_lang, target_lang, context
-                    )
-                    
-                    # 质量评估
-                    quality_score = await self.quality_assessor.assess_single(
-                        text, translation_item.translated_text
-                    )
-                    
-                    # 估算成本
-                    cost = provider_instance.estimate_cost([text])
-                    
-                    suggestion = TranslationSuggestion(
-                        original_text=text,
-                        translated_text=translation_item.translated_text,
-                        provider=provider,
-                        confidence=translation_item.confidence,
-                        quality_score=quality_score.overall_score,
-                        quality_level=quality_score.confidence_level,
-                        is_cached=False,
-                        cost=cost
-                    )
-                    
-                    # 缓存结果
-                    await self.cache.cache_translation(translation_item)
-                
-                suggestions.append(suggestion)
-                
-            except Exception as e:
-                # 记录错误但继续处理其他提供商
-                print(f"Error getting suggestion from {provider}: {str(e)}")
-                continue
+        suggestions = [
+            suggestion async for suggestion in self.iter_translation_suggestions(
+                text, providers, source_lang, target_lang, context, timeout, min_quality_score
+            )
+        ]
         
         # 按质量分数排序
         suggestions.sort(key=lambda x: x.quality_score, reverse=True)
         
         return suggestions
     
+    async def iter_translation_suggestions(
+        self,
+        text: str,
+        providers: List[TranslationProvider],
+        source_lang: str = "en",
+        target_lang: str = "zh",
+        context: Optional[str] = None,
+        timeout: Optional[float] = None,
+        min_quality_score: Optional[float] = None
+    ) -> AsyncIterator[TranslationSuggestion]:
+        """
+        并发向各提供商获取翻译建议，按完成顺序返回
+        
+        到达截止时间后取消仍未返回的提供商，只返回已经得到的建议；
+        设置 min_quality_score 时返回第一个达到该分数的建议后取消其余提供商。
+        
+        Args:
+            参数同 get_translation_suggestions
+            
+        Yields:
+            TranslationSuggestion: 翻译建议
+        """
+        timeout = settings.TRANSLATION_SUGGESTION_TIMEOUT if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        
+        pending: Dict[asyncio.Task, TranslationProvider] = {
+            asyncio.ensure_future(
+                self._get_provider_suggestion(text, provider, source_lang, target_lang, context)
+            ): provider
+            for provider in dict.fromkeys(providers)
+        }
+        
+        try:
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                done, _ = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    provider = pending.pop(task)
+                    try:
+                        suggestion = task.result()
+                    except Exception as e:
+                        # 记录错误但继续处理其他提供商
+                        logger.warning(f"Error getting suggestion from {provider.value}: {e}")
+                        continue
+                    
+                    yield suggestion
+                    if min_quality_score is not None and suggestion.quality_score >= min_quality_score:
+                        return
+            
+            if pending:
+                logger.info(
+                    "Suggestion deadline reached, cancelled providers: "
+                    + ", ".join(provider.value for provider in pending.values())
+                )
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _get_provider_suggestion(
+        self,
+        text: str,
+        provider: TranslationProvider,
+        source_lang: str,
+        target_lang: str,
+        context: Optional[str]
+    ) -> TranslationSuggestion:
+        """获取单个提供商的翻译建议（先查缓存，未命中时翻译、评估质量并写缓存）"""
+        # 检查缓存
+        model = self._get_provider_model(provider)
+        cached_result = await self.cache.get_cached_translation(
+            text, source_lang, target_lang, provider, model
+        )
+        
+        if cached_result:
+            # 使用缓存结果
+            return TranslationSuggestion(
+                original_text=text,
+                translated_text=cached_result.translated_text,
+                provider=provider,
+                confidence=cached_result.confidence,
+                quality_score=cached_result.quality_score or 0.8,
+                quality_level=self._get_quality_level(cached_result.quality_score or 0.8),
+                is_cached=True,
+                cost=0.0
+            )
+        
+        # 调用翻译服务
+        provider_instance = provider_factory.get_provider(provider)
+        # 翻译建议是编辑器中的交互式请求，优先于批量翻译调度
+        with request_scope(RequestPriority.INTERACTIVE):
+            translation_item = await provider_instance.translate_single(
+                text, source_lang, target_lang, context
+            )
+        
+        # 质量评估
+        quality_score = await self.quality_assessor.assess_single(
+            text, translation_item.translated_text
+        )
+        
+        # 估算成本
+        cost = provider_instance.estimate_cost([text])
+        
+        # 缓存结果
+        await self.cache.cache_translation(
+            translation_item, source_lang, target_lang, model
+        )
+        
+        return TranslationSuggestion(
+            original_text=text,
+            translated_text=translation_item.translated_text,
+            provider=provider,
+            confidence=translation_item.confidence,
+            quality_score=quality_score.overall_score,
+            quality_level=quality_score.confidence_level,
+            is_cached=False,
+            cost=cost
+        )
+    
     async def create_translation_job(
         self, 
         request: TranslationRequest,
@@ -198,14 +432,12 @@ class TranslationEngine:
             user_id=user_id,
             status=TranslationStatus.PENDING,
             request=request,
-            created_at=datetime.now()
+            created_at=datetime.now(),
+            total_segments=len(request.texts)
         )
         
-        self.active_jobs[job_id] = job
-        
-        # 异步执行翻译任务
-        import asyncio
-        asyncio.create_task(self._execute_translation_job(job_id))
+        # 写入任务存储后由工作池异步执行
+        await self.job_workers.submit(job)
         
         return job_id
     
@@ -217,131 +449,462 @@ class TranslationEngine:
             job_id: 任务ID
             
         Returns:
-            Optional[TranslationJob]: 任务信息
+            Optional[TranslationJob]: 任务信息，不存在或已过期时为None
         """
-        return self.active_jobs.get(job_id)
+        return await self.job_store.get(job_id)
     
-    async def _execute_translation_job(self, job_id: str):
-        """执行翻译任务"""
-        job = self.active_jobs.get(job_id)
-        if not job:
-            return
+    async def cancel_translation_job(self, job_id: str) -> Optional[TranslationJob]:
+        """
+        取消翻译任务
+        
+        排队中的任务不再执行；执行中的任务在当前子批次完成后停止，已完成的子批次保留，可恢复继续。
+        执行中的任务取消后租约保留到worker停止，期间不能恢复
         
+        Args:
+            job_id: 任务ID
+            
+        Returns:
+            Optional[TranslationJob]: 任务信息，不存在时为None
+            
+        Raises:
+            ValueError: 任务已结束
+        """
+        job = await self.job_store.get(job_id)
+        if job is None:
+            return None
+        if job.status not in (TranslationStatus.PENDING, TranslationStatus.IN_PROGRESS):
+            raise ValueError(f"Job is already {job.status.value}")
+        
+        job.status = TranslationStatus.CANCELLED
+        job.completed_at = datetime.now()
+        await self.job_store.save(
+            job, expires_at=time.time() + settings.JOB_RESULT_TTL, keep_lease=True
+        )
+        return job
+    
+    async def resume_translation_job(self, job_id: str) -> Optional[TranslationJob]:
+        """
+        恢复失败或已取消的翻译任务，从最后保存的检查点继续执行
+        
+        Args:
+            job_id: 任务ID
+            
+        Returns:
+            Optional[TranslationJob]: 任务信息，不存在时为None
+            
+        Raises:
+            ValueError: 任务不是失败或已取消状态，或取消后worker仍在执行当前子批次
+        """
+        job = await self.job_store.get(job_id)
+        if job is None:
+            return None
+        if job.status not in (TranslationStatus.FAILED, TranslationStatus.CANCELLED):
+            raise ValueError(
+                f"Only failed or cancelled jobs can be resumed, job is {job.status.value}"
+            )
+        run = await self.job_store.get_run(job_id)
+        if run is not None and run.leased:
+            raise ValueError(
+                "Job is still stopping, resume it after the current sub-batch finishes"
+            )
+        
+        job.status = TranslationStatus.PENDING
+        job.error_message = None
+        job.completed_at = None
+        job.eta_seconds = None
+        await self.job_workers.submit(job)
+        return job
+    
+    async def _execute_translation_job(self, job: TranslationJob):
+        """执行工作池领取的翻译任务（状态已置为进行中），提供商请求按批量优先级、以项目为租户调度"""
+        with request_scope(RequestPriority.BULK, tenant=job.project_id):
+            await self._translate_job_batches(job)
+    
+    async def _translate_job_batches(self, job: TranslationJob):
+        """
+        按子批次执行翻译任务
+        
+        任务按 JOB_CHECKPOINT_SEGMENTS 分成子批次依次翻译，每完成一个子批次保存一次检查点；
+        重新执行时（崩溃恢复，或失败/取消后恢复）跳过已保存的子批次
+        """
+        texts = job.request.texts
         try:
-            # 更新状态
-            job.status = TranslationStatus.IN_PROGRESS
-            job.started_at = datetime.now()
+            checkpoints = await self.job_store.load_checkpoints(job.id)
+            offset = 0
+            results: List[TranslationResult] = []
+            # 已保存的子批次：从头按检查点长度依次跳过（检查点大小改变后也能正确衔接）
+            while offset in checkpoints and offset < len(texts):
+                results.append(checkpoints[offset])
+                offset += checkpoints[offset].total_count
+            completed = offset
+            set_job_progress(job, completed, None)
             
-            # 执行翻译
-            result = await self.translate_batch(job.request)
+            run_started = time.time()
+            while offset < len(texts):
+                # 子批次之间确认任务仍由本worker执行（租约过期后可能已被重新领取），且未被取消
+                run = await self.job_store.get_run(job.id)
+                if run is None or run.attempt != job.attempt:
+                    logger.warning(f"翻译任务 {job.id} 已由其他worker重新执行，停止当前执行")
+                    return
+                if run.status == TranslationStatus.CANCELLED:
+                    job.status = TranslationStatus.CANCELLED
+                    job.completed_at = datetime.now()
+                    return
+                
+                chunk = texts[offset:offset + settings.JOB_CHECKPOINT_SEGMENTS]
+                result = await self.translate_batch(job.request.model_copy(update={"texts": chunk}))
+                results.append(result)
+                
+                # 预计剩余时间按本次执行的平均速度估算
+                eta_seconds = (len(texts) - offset - len(chunk)) * (time.time() - run_started) / (
+                    offset + len(chunk) - completed
+                )
+                await self.job_store.save_checkpoint(
+                    job.id, offset, result, offset + len(chunk), eta_seconds
+                )
+                offset += len(chunk)
+                set_job_progress(job, offset, eta_seconds)
             
             # 更新结果
-            job.result = result
+            job.result = self._combine_results(results, job.request.provider)
             job.status = TranslationStatus.COMPLETED
             job.completed_at = datetime.now()
+            set_job_progress(job, len(texts), 0.0)
             
         except Exception as e:
-            # 处理错误
+            # 处理错误，已保存的检查点保留，恢复任务后从这里继续
             job.status = TranslationStatus.FAILED
             job.error_message = str(e)
             job.completed_at = datetime.now()
     
-    def _preprocess_texts(self, texts: List[str]) -> List[str]:
-        """预处理文本"""
-        cleaned_texts = []
-        
-        for text in texts:
-            if not text or not text.strip():
-                cleaned_texts.append("")
-                continue
-            
-            # 清理文本
-            cleaned = ' '.join(text.split())
-            cleaned = ''.join(char for char in cleaned if ord(char) >= 32 or char in '\n\t')
-            cleaned_texts.append(cleaned.strip())
+    def _combine_results(
+        self,
+        results: List[TranslationResult],
+        provider: TranslationProvider
+    ) -> TranslationResult:
+        """合并各子批次的翻译结果"""
+        translations = [item for result in results for item in result.translations]
+        total_count = len(translations)
+        cache_hit_count = sum(result.cache_hit_count for result in results)
         
-        return cleaned_texts
+        return TranslationResult(
+            translations=translations,
+            total_count=total_count,
+            success_count=sum(result.success_count for result in results),
+            cache_hit_count=cache_hit_count,
+            cache_hit_rate=cache_hit_count / total_count if total_count else 0,
+            dedup_ratio=sum(result.dedup_ratio * result.total_count for result in results) / total_count
+            if total_count else 0,
+            provider_used=provider,
+            total_cost=sum(result.total_cost for result in results),
+            processing_time=sum(result.processing_time for result in results),
+            quality_summary=self._generate_quality_summary(translations)
+        )
+    
+    def _preprocess_texts(self, texts: List[str]) -> List[NormalizedText]:
+        """预处理文本：每个请求只规范化一次，之后缓存和提供商直接使用规范化结果"""
+        return [normalize_text(text) for text in texts]
+    
+    def _dedupe_texts(self, texts: List[str]) -> Tuple[List[str], List[int]]:
+        """
+        批内去重
+        
+        Returns:
+            Tuple[List[str], List[int]]: (去重后的文本, 每个原始位置对应的去重后下标)
+        """
+        unique_index: Dict[str, int] = {}
+        positions = [unique_index.setdefault(text, len(unique_index)) for text in texts]
+        return list(unique_index), positions
     
     async def _check_cache(
         self, 
         texts: List[str], 
         request: TranslationRequest
-    ) -> Tuple[List[TranslationItem], List[str]]:
-        """检查缓存"""
-        cached_results = []
-        uncached_texts = []
+    ) -> Tuple[Dict[int, TranslationItem], List[int]]:
+        """
+        检查缓存
+        
+        Returns:
+            Tuple[Dict[int, TranslationItem], List[int]]: (命中的 下标->翻译项, 需要翻译的下标列表)
+        """
+        cached_results: Dict[int, TranslationItem] = {}
+        lookup_indices = []
         
-        for text in texts:
+        for i, text in enumerate(texts):
             if not text:
                 # 空文本直接返回空翻译
-                cached_results.append(TranslationItem(
+                cached_results[i] = TranslationItem(
                     original_text=text,
                     translated_text="",
                     confidence=1.0,
                     provider=request.provider,
                     quality_score=1.0
-                ))
-                continue
-            
-            cached_item = await self.cache.get_cached_translation(
-                text, 
-                request.source_language.value,
-                request.target_language.value,
-                request.provider
-            )
-            
-            if cached_item and cached_item.quality_score >= request.quality_threshold:
-                cached_results.append(cached_item)
+                )
             else:
-                uncached_texts.append(text)
-                cached_results.append(None)  # 占位符
+                lookup_indices.append(i)
+        
+        if not lookup_indices:
+            return cached_results, []
         
-        return cached_results, uncached_texts
+        model = self._get_provider_model(request.provider)
+        hits, misses = await self.cache.get_cached_translations_many(
+            [texts[i] for i in lookup_indices],
+            request.source_language.value,
+            request.target_language.value,
+            request.provider,
+            model
+        )
+        
+        miss_indices = [lookup_indices[j] for j in misses]
+        for j, cached_item in hits.items():
+            if cached_item.quality_score >= request.quality_threshold:
+                cached_results[lookup_indices[j]] = cached_item
+            else:
+                miss_indices.append(lookup_indices[j])
+        miss_indices.sort()
+        
+        # 精确缓存未命中时查模糊翻译记忆，只有数字不同的句段直接修补复用
+        if settings.FUZZY_MATCH_ENABLED and miss_indices:
+            remaining = []
+            for i in miss_indices:
+                fuzzy_item = self.cache.get_fuzzy_translation(
+                    texts[i],
+                    request.source_language.value,
+                    request.target_language.value,
+                    request.provider,
+                    model=model
+                )
+                if fuzzy_item is not None and fuzzy_item.quality_score >= request.quality_threshold:
+                    cached_results[i] = fuzzy_item
+                else:
+                    remaining.append(i)
+            miss_indices = remaining
+        
+        return cached_results, miss_indices
+    
+    def _get_provider_model(self, provider: TranslationProvider) -> Optional[str]:
+        """获取提供商当前使用的模型，作为缓存键的一部分（模型切换后旧缓存不再命中）"""
+        try:
+            model = getattr(provider_factory.get_provider(provider), 'model', None)
+        except Exception:
+            return None
+        return model if isinstance(model, str) else None
     
     async def _translate_uncached_texts(
         self, 
         texts: List[str], 
         request: TranslationRequest
-    ) -> List[TranslationItem]:
-        """翻译未缓存的文本"""
-        provider_instance = provider_factory.get_provider(request.provider)
+    ) -> Tuple[List[Optional[TranslationItem]], Dict[TranslationProvider, Dict[str, int]]]:
+        """
+        翻译未缓存的文本
         
-        return await provider_instance.translate_batch(
-            texts,
-            request.source_language.value,
-            request.target_language.value,
-            request.context
-        )
+        按缓存键（加上下文）登记到 single_flight：其他请求正在翻译的句段直接等待其结果，
+        近期失败的句段直接返回失败（None），其余句段由本请求调用提供商翻译。
+        等待的句段在对方请求出错时为失败（None）；对方请求被取消时重新认领，由本请求或其他等待者翻译。
+        
+        Returns:
+            Tuple[List[Optional[TranslationItem]], Dict[TranslationProvider, Dict[str, int]]]:
+            (与texts对应的翻译项，失败为None, 实际完成翻译的提供商 -> 本请求发给它的句段数 texts、字符数 characters
+            和打包节省的提示token tokens_saved)
+        """
+        model = self._get_provider_model(request.provider)
+        source_lang = request.source_language.value
+        target_lang = request.target_language.value
+        keys = [
+            self._flight_key(
+                text, source_lang, target_lang, request.provider, model, request.context
+            )
+            for text in texts
+        ]
+        
+        results: List[Optional[TranslationItem]] = [None] * len(texts)
+        usage: Dict[TranslationProvider, Dict[str, int]] = {}
+        
+        pending = list(range(len(texts)))
+        while pending:
+            claimed_leaders, claimed_followers, _ = self.single_flight.claim(
+                [keys[i] for i in pending]
+            )
+            leaders = [pending[j] for j in claimed_leaders]
+            
+            if leaders:
+                try:
+                    translations, answered_by = await self._translate_and_assess(
+                        [texts[i] for i in leaders], request, model
+                    )
+                except asyncio.CancelledError:
+                    # 本请求被取消：释放认领，等待这些句段的请求接手翻译
+                    self.single_flight.abandon([keys[i] for i in leaders])
+                    raise
+                except BaseException:
+                    # 等待的请求按失败处理，异常只返回给本请求
+                    self.single_flight.fail([keys[i] for i in leaders])
+                    raise
+                for i, translation, provider in zip(leaders, translations, answered_by):
+                    results[i] = translation
+                    self.single_flight.resolve(keys[i], translation)
+                    self._merge_usage(usage, {provider: {
+                        "texts": 1,
+                        "characters": len(texts[i]),
+                        "tokens_saved": translation.tokens_saved or 0
+                    }})
+                # 提供商返回的结果少于请求的句段时，其余句段按失败处理（本请求中为None），
+                # 否则等待这些句段的请求会一直挂起，登记也不会被移除
+                missing = leaders[min(len(translations), len(answered_by)):]
+                if missing:
+                    logger.warning(
+                        f"提供商 {request.provider.value} 返回 {len(translations)} 条结果，"
+                        f"少于请求的 {len(leaders)} 条"
+                    )
+                    self.single_flight.fail([keys[i] for i in missing])
+            
+            # 认领方被取消的句段重新认领
+            abandoned = []
+            if claimed_followers:
+                with timed_stage("coalesced_wait"):
+                    for j, future in claimed_followers.items():
+                        # shield: 本请求被取消时不影响其他等待同一结果的请求
+                        result = await asyncio.shield(future)
+                        if result is ABANDONED:
+                            abandoned.append(pending[j])
+                        else:
+                            results[pending[j]] = result
+            pending = abandoned
+        
+        return results, usage
+    
+    async def _translate_and_assess(
+        self,
+        texts: List[str],
+        request: TranslationRequest,
+        model: Optional[str]
+    ) -> Tuple[List[TranslationItem], List[TranslationProvider]]:
+        """
+        调用提供商翻译（首选提供商不可用时使用备用提供商），评估质量并写入缓存
+        
+        备用提供商的译文不写缓存：缓存键按请求的提供商和模型计算，之后的请求在首选提供商恢复后应重新翻译
+        
+        Returns:
+            Tuple[List[TranslationItem], List[TranslationProvider]]: (翻译项, 每个句段实际完成翻译的提供商)
+        """
+        # 调用方未指定优先级时按请求规模调度：小批量为交互式，大批量为批量
+        with request_scope(current_priority() or self._request_priority(request)), timed_stage("provider"):
+            translations, answered_by = await self.resilience.translate_batch(
+                request.provider,
+                texts,
+                request.source_language.value,
+                request.target_language.value,
+                request.context
+            )
+        
+        # 质量评估
+        with timed_stage("quality"):
+            quality_scores = await self.quality_assessor.assess_batch(
+                texts, [t.translated_text for t in translations]
+            )
+        
+        # 更新质量分数
+        for translation, quality in zip(translations, quality_scores):
+            translation.quality_score = quality.overall_score
+        
+        # 缓存首选提供商的新翻译
+        cacheable = [
+            translation for translation, provider in zip(translations, answered_by)
+            if provider == request.provider
+        ]
+        if request.use_cache and cacheable:
+            with timed_stage("cache_write"):
+                await self.cache.cache_translations(
+                    cacheable,
+                    request.source_language.value,
+                    request.target_language.value,
+                    model
+                )
+        
+        return translations, answered_by
+    
+    async def _track_usage(
+        self,
+        provider: TranslationProvider,
+        usage: Dict[TranslationProvider, Dict[str, int]]
+    ) -> float:
+        """
+        记录一次请求的使用量
+        
+        Args:
+            provider: 请求的提供商，没有发给任何提供商的文本时按它记录一条空的使用记录
+            usage: 实际完成翻译的提供商 -> 句段数 texts、字符数 characters 和打包节省的提示token tokens_saved
+            
+        Returns:
+            float: 各提供商的估算成本之和
+        """
+        total_cost = 0.0
+        for used, counts in (usage or {provider: {"texts": 0, "characters": 0}}).items():
+            total_cost += await self.cost_tracker.track_translation_usage(
+                used, counts["texts"], counts["characters"],
+                tokens_saved=counts.get("tokens_saved")
+            )
+        return total_cost
+    
+    @staticmethod
+    def _merge_usage(
+        total: Dict[TranslationProvider, Dict[str, int]],
+        usage: Dict[TranslationProvider, Dict[str, int]]
+    ):
+        """把一个子批次的使用量累加到 total"""
+        for provider, counts in usage.items():
+            provider_total = total.setdefault(provider, {})
+            for name, value in counts.items():
+                provider_total[name] = provider_total.get(name, 0) + value
+    
+    def _request_priority(self, request: TranslationRequest) -> RequestPriority:
+        """按请求的句段数判断调度优先级"""
+        if len(request.texts) <= settings.TRANSLATION_INTERACTIVE_MAX_SEGMENTS:
+            return RequestPriority.INTERACTIVE
+        return RequestPriority.BULK
+    
+    def _flight_key(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        provider: TranslationProvider,
+        model: Optional[str],
+        context: Optional[str]
+    ) -> str:
+        """请求合并的键：缓存键加上翻译上下文（上下文不同的请求不合并）"""
+        key = self.cache.cache_key(text, source_lang, target_lang, provider, model)
+        return f"{key}\x1f{context}" if context else key
     
     def _merge_translation_results(
         self,
-        cached_results: List[Optional[TranslationItem]],
+        cached_results: Dict[int, TranslationItem],
+        miss_indices: List[int],
         new_translations: List[TranslationItem],
         original_texts: List[str]
     ) -> List[TranslationItem]:
         """合并翻译结果"""
+        new_results = dict(zip(miss_indices, new_translations))
         merged_results = []
-        new_translation_index = 0
         
-        for i, cached_item in enumerate(cached_results):
-            if cached_item is not None:
-                merged_results.append(cached_item)
-            else:
-                if new_translation_index < len(new_translations):
-                    merged_results.append(new_translations[new_translation_index])
-                    new_translation_index += 1
-                else:
-                    # 创建错误结果
-                    merged_results.append(TranslationItem(
-                        original_text=original_texts[i],
-                        translated_text="[翻译失败]",
-                        confidence=0.0,
-                        provider=TranslationProvider.GOOGLE,
-                        quality_score=0.0
-                    ))
+        for i, text in enumerate(original_texts):
+            translation = cached_results.get(i) or new_results.get(i)
+            if translation is None:
+                translation = self._failed_translation(text)
+            merged_results.append(translation)
         
         return merged_results
     
+    def _failed_translation(self, text: str) -> TranslationItem:
+        """翻译失败时返回的结果"""
+        return TranslationItem(
+            original_text=text,
+            translated_text="[翻译失败]",
+            confidence=0.0,
+            provider=TranslationProvider.GOOGLE,
+            quality_score=0.0
+        )
+    
     def _generate_quality_summary(self, translations: List[TranslationItem]) -> Dict[str, int]:
         """生成质量统计摘要"""
         summary = {
@@ -378,6 +941,11 @@ class TranslationEngine:
             "providers_health": {p.value: status for p, status in provider_health.items()},
             "cache_stats": cache_stats,
             "cost_stats": cost_stats,
-            "active_jobs": len(self.active_jobs),
+            "active_jobs": self.job_workers.running_jobs,
+            "job_queue": await self.job_store.get_stats(),
+            "single_flight": self.single_flight.get_stats(),
+            "micro_batching": self.micro_batcher.get_stats(),
+            "resilience": self.resilience.get_stats(),
+            "stage_latency": self.stage_latency.get_stats(),
             "available_providers": [p.value for p in provider_factory.get_available_providers()]
         }
@@ -0,0 +1,326 @@
+"""
+模糊翻译记忆库
+基于字符n-gram的MinHash/LSH索引，查找与待译文本高度相似的已译句段
+"""
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+_MASK64 = (1 << 64) - 1
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+_NUMBER_PATTERN = re.compile(r'\d+(?:[.,]\d+)*')
+# (源文本, 译文, 分区键, 提供商, 质量分数, 缓存键, 过期时间)
+_Segment = Tuple[str, str, str, str, float, Optional[str], Optional[float]]
+
+
+@dataclass
+class FuzzyMatch:
+    """模糊匹配结果"""
+    segment_id: int
+    source_text: str
+    translated_text: str
+    similarity: float
+    quality_score: float
+    provider: str
+
+
+class FuzzyTranslationMemory:
+    """
+    模糊翻译记忆库
+
+    - 每个句段按字符n-gram计算一次哈希，用单排列MinHash（one permutation hashing）
+      生成 num_bins 维签名，代价与文本长度成线性关系
+    - 签名按 bands x rows 分段做LSH分桶，查询只检查同桶候选，与库大小无关
+    - 候选再用n-gram Jaccard精确打分，低于阈值的丢弃
+    - 签名和打分前把每个数字串替换为占位符0，只有数字不同的句段相似度为1，
+      数字差异交给 patch_translation 处理
+    - 按语言对和模型分区，不同模型的译文互不命中；句段可带过期时间，过期后查询时删除，
+      也可按缓存键 discard，与精确缓存同步淘汰
+    """
+
+    def __init__(
+        self,
+        max_segments: int = 100000,
+        ngram_size: int = 3,
+        bands: int = 4,
+        rows: int = 4,
+        similarity_threshold: float = 0.8,
+        max_candidates: int = 32
+    ):
+        self.max_segments = max_segments
+        self.ngram_size = ngram_size
+        self.bands = bands
+        self.rows = rows
+        self.num_bins = bands * rows
+        self.similarity_threshold = similarity_threshold
+        self.max_candidates = max_candidates
+
+        self._next_id = 0
+        # segment_id -> 句段，按插入顺序淘汰
+        self._segments: "OrderedDict[int, _Segment]" = OrderedDict()
+        # (分区键, 规范化源文本) -> segment_id，规范化后相同的句段只保留最新一条
+        self._exact: Dict[Tuple[str, str], int] = {}
+        # 缓存键 -> segment_id
+        self._keys: Dict[str, int] = {}
+        # LSH桶：hash((分区键, band, 签名片段)) -> segment_id 或 segment_id列表
+        self._buckets: Dict[int, object] = {}
+
+    def add(
+        self,
+        source_text: str,
+        translated_text: str,
+        source_lang: str,
+        target_lang: str,
+        provider: str,
+        quality_score: float = 0.8,
+        model: Optional[str] = None,
+        key: Optional[str] = None,
+        expires_at: Optional[float] = None
+    ) -> int:
+        """
+        添加已译句段
+
+        Args:
+            source_text: 源文本
+            translated_text: 译文
+            source_lang: 源语言
+            target_lang: 目标语言
+            provider: 翻译提供商
+            quality_score: 质量分数
+            model: 生成译文的模型
+            key: 对应的精确缓存键，供 discard 使用
+            expires_at: 过期时间戳，None表示不过期
+
+        Returns:
+            int: 句段ID
+        """
+        partition = self._partition_key(source_lang, target_lang, model)
+        normalized = self._normalize(source_text)
+
+        existing_id = self._exact.get((partition, normalized))
+        if existing_id is not None:
+            self.remove(existing_id)
+        if key is not None and key in self._keys:
+            self.remove(self._keys[key])
+
+        segment_id = self._next_id
+        self._next_id += 1
+        self._segments[segment_id] = (
+            source_text, translated_text, partition, provider, quality_score, key, expires_at
+        )
+        self._exact[(partition, normalized)] = segment_id
+        if key is not None:
+            self._keys[key] = segment_id
+
+        for bucket_key in self._bucket_keys(partition, normalized):
+            bucket = self._buckets.get(bucket_key)
+            if bucket is None:
+                self._buckets[bucket_key] = segment_id
+            elif isinstance(bucket, list):
+                bucket.append(segment_id)
+            else:
+                self._buckets[bucket_key] = [bucket, segment_id]
+
+        while len(self._segments) > self.max_segments:
+            self.remove(next(iter(self._segments)))
+
+        return segment_id
+
+    def remove(self, segment_id: int) -> bool:
+        """删除句段"""
+        segment = self._segments.pop(segment_id, None)
+        if segment is None:
+            return False
+
+        source_text, _, partition, _, _, key, _ = segment
+        normalized = self._normalize(source_text)
+        if self._exact.get((partition, normalized)) == segment_id:
+            del self._exact[(partition, normalized)]
+        if key is not None and self._keys.get(key) == segment_id:
+            del self._keys[key]
+
+        for bucket_key in self._bucket_keys(partition, normalized):
+            bucket = self._buckets.get(bucket_key)
+            if bucket == segment_id:
+                del self._buckets[bucket_key]
+            elif isinstance(bucket, list) and segment_id in bucket:
+                bucket.remove(segment_id)
+                if len(bucket) == 1:
+                    self._buckets[bucket_key] = bucket[0]
+        return True
+
+    def discard(self, key: str) -> bool:
+        """删除缓存键对应的句段（精确缓存淘汰、过期或删除该键时调用）"""
+        segment_id = self._keys.get(key)
+        return segment_id is not None and self.remove(segment_id)
+
+    def lookup(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        provider: Optional[str] = None,
+        threshold: Optional[float] = None,
+        top_k: int = 3,
+        model: Optional[str] = None
+    ) -> List[FuzzyMatch]:
+        """
+        查找相似句段
+
+        Args:
+            text: 待译文本
+            source_lang: 源语言
+            target_lang: 目标语言
+            provider: 只返回指定提供商的译文
+            threshold: 相似度阈值，默认使用 similarity_threshold
+            top_k: 最多返回的匹配数
+            model: 只返回该模型生成的译文
+
+        Returns:
+            List[FuzzyMatch]: 按相似度从高到低排序的匹配结果
+        """
+        threshold = self.similarity_threshold if threshold is None else threshold
+        partition = self._partition_key(source_lang, target_lang, model)
+        normalized = self._normalize(text)
+
+        candidates: Dict[int, int] = {}
+        for bucket_key in self._bucket_keys(partition, normalized):
+            bucket = self._buckets.get(bucket_key)
+            if bucket is None:
+                continue
+            for segment_id in (bucket if isinstance(bucket, list) else (bucket,)):
+                candidates[segment_id] = candidates.get(segment_id, 0) + 1
+
+        if not candidates:
+            return []
+
+        # 命中桶数越多越可能相似，优先精确打分
+        ranked = sorted(candidates, key=candidates.get, reverse=True)[:self.max_candidates]
+        query_ngrams = self._ngrams(normalized)
+        now = time.time()
+
+        matches = []
+        for segment_id in ranked:
+            (source_text, translated_text, _, segment_provider, quality_score,
+             _, expires_at) = self._segments[segment_id]
+            if expires_at is not None and expires_at <= now:
+                self.remove(segment_id)
+                continue
+            if provider is not None and segment_provider != provider:
+                continue
+
+            similarity = self._jaccard(query_ngrams, self._ngrams(self._normalize(source_text)))
+            if similarity >= threshold:
+                matches.append(FuzzyMatch(
+                    segment_id=segment_id,
+                    source_text=source_text,
+                    translated_text=translated_text,
+                    similarity=round(similarity, 4),
+                    quality_score=quality_score,
+                    provider=segment_provider
+                ))
+
+        matches.sort(key=lambda m: (m.similarity, m.quality_score), reverse=True)
+        return matches[:top_k]
+
+    def clear(self):
+        """清空记忆库"""
+        self._segments.clear()
+        self._exact.clear()
+        self._keys.clear()
+        self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._segments)
+
+    @staticmethod
+    def _partition_key(source_lang: str, target_lang: str, model: Optional[str] = None) -> str:
+        partition = f"{source_lang.lower()}>{target_lang.lower()}"
+        return f"{partition}@{model}" if model else partition
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """规范化空白和大小写，并把数字串替换为占位符"""
+        return _NUMBER_PATTERN.sub('0', _WHITESPACE_PATTERN.sub(' ', text).strip().lower())
+
+    def _ngrams(self, normalized: str) -> Set[str]:
+        n = self.ngram_size
+        if len(normalized) <= n:
+            return {normalized}
+        return {normalized[i:i + n] for i in range(len(normalized) - n + 1)}
+
+    @staticmethod
+    def _jaccard(a: Set[str], b: Set[str]) -> float:
+        if not a or not b:
+            return 0.0
+        intersection = len(a & b)
+        return intersection / (len(a) + len(b) - intersection)
+
+    def _signature(self, normalized: str) -> List[int]:
+        """单排列MinHash签名：每个n-gram只哈希一次，按哈希值分箱取最小值"""
+        num_bins = self.num_bins
+        signature = [_MASK64] * num_bins
+
+        for ngram in self._ngrams(normalized):
+            h = hash(ngram) & _MASK64
+            index = h % num_bins
+            value = h // num_bins
+            if value < signature[index]:
+                signature[index] = value
+
+        # 旋转致密化：空箱借用右侧最近的非空箱，并按距离加偏移
+        original = signature[:]
+        if _MASK64 in original and any(value != _MASK64 for value in original):
+            for i in range(num_bins):
+                if original[i] != _MASK64:
+                    continue
+                distance = 1
+                while original[(i + distance) % num_bins] == _MASK64:
+                    distance += 1
+                signature[i] = original[(i + distance) % num_bins] + distance
+        return signature
+
+    def _bucket_keys(self, partition: str, normalized: str) -> List[int]:
+        signature = self._signature(normalized)
+        rows = self.rows
+        return [
+            hash((partition, band, tuple(signature[band * rows:(band + 1) * rows])))
+            for band in range(self.bands)
+        ]
+
+
+def patch_translation(match_source: str, match_translation: str, new_source: str) -> Optional[str]:
+    """
+    对只有数字不同的匹配句段进行修补
+
+    仅当两段源文本去掉数字后完全相同，且变化的数字能在译文中唯一定位时才修补，
+    否则返回None，由调用方交给翻译提供商处理。
+
+    Args:
+        match_source: 记忆库中的源文本
+        match_translation: 记忆库中的译文
+        new_source: 待译文本
+
+    Returns:
+        Optional[str]: 修补后的译文
+    """
+    if _NUMBER_PATTERN.sub('#', match_source) != _NUMBER_PATTERN.sub('#', new_source):
+        return None
+
+    replacements: Dict[str, str] = {}
+    for old, new in zip(_NUMBER_PATTERN.findall(match_source), _NUMBER_PATTERN.findall(new_source)):
+        if replacements.setdefault(old, new) != new:
+            # 同一个数字对应多个新值，无法确定替换关系
+            return None
+
+    changed = {old: new for old, new in replacements.items() if old != new}
+    if not changed:
+        return match_translation
+
+    translation_numbers = _NUMBER_PATTERN.findall(match_translation)
+    if any(old not in translation_numbers for old in changed):
+        return None
+
+    return _NUMBER_PATTERN.sub(lambda m: changed.get(m.group(0), m.group(0)), match_translation)
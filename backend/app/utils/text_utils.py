@@ -183,3 +183,127 @@ def standardize_format(lines: List[str]) -> List[str]:
             i += 1
     
     return cleaned_lines
+
+
+# 空白以外的C0控制字符（\t\n\r\v\f 和 \x1c-\x1f 属于空白，按空白折叠）
+_CONTROL_CHARS = ''.join(chr(code) for code in range(32) if not chr(code).isspace())
+_CONTROL_CHARS_TABLE = str.maketrans('', '', _CONTROL_CHARS)
+_CONTROL_CHARS_PATTERN = re.compile(f"[{re.escape(_CONTROL_CHARS)}]")
+
+
+class NormalizedText(str):
+    """
+    已规范化的文本
+
+    规范化只在请求入口做一次，之后引擎、缓存和提供商遇到该类型直接使用，不再重复规范化；
+    缓存键在首次计算后记在实例上，同一请求内的缓存查询和请求合并共用
+    """
+
+    def __new__(cls, value: str = ""):
+        text = super().__new__(cls, value)
+        text.cache_keys = {}
+        return text
+
+
+def normalize_text(text: str) -> NormalizedText:
+    """
+    规范化待翻译文本：去除控制字符，连续空白（含换行）折叠为一个空格，去掉首尾空白
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        NormalizedText: 规范化后的文本，已规范化的文本原样返回
+    """
+    if isinstance(text, NormalizedText):
+        return text
+    if not text:
+        return NormalizedText()
+    # 多数文本不含控制字符，先用正则判断，避免逐字符查表
+    if _CONTROL_CHARS_PATTERN.search(text):
+        text = text.translate(_CONTROL_CHARS_TABLE)
+    return NormalizedText(' '.join(text.split()))
+
+
+# 英文句末标点后需跟空白才断句；中日文句末标点后直接断句；换行总是断句
+_SENTENCE_END_PATTERN = re.compile(
+    r'([.!?]+["\'”’)\]]*)(\s+)'
+    r'|([。！？…]+[”’」』）》]*)(\s*)'
+    r'|(\s*\n\s*)'
+)
+
+# 句号后不断句的常见英文缩写
+_ABBREVIATIONS = {
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'vs', 'etc', 'e.g', 'i.e',
+    'no', 'fig', 'inc', 'ltd', 'co', 'jan', 'feb', 'mar', 'apr', 'jun', 'jul',
+    'aug', 'sep', 'sept', 'oct', 'nov', 'dec'
+}
+
+# 句子之间不加空格的目标语言
+_NO_SPACE_LANGUAGES = ('zh', 'ja')
+
+
+def split_sentences(text: str) -> List[Tuple[str, str]]:
+    """
+    按中英文句末标点和换行切分句子，保留句间分隔符以便还原
+    
+    Args:
+        text: 文本
+        
+    Returns:
+        List[Tuple[str, str]]: (句子, 句后分隔符) 列表，依次拼接即为去掉首尾空白的原文
+    """
+    text = text.strip()
+    segments: List[Tuple[str, str]] = []
+    start = 0
+    
+    for match in _SENTENCE_END_PATTERN.finditer(text):
+        if match.group(1):
+            # 缩写、姓名首字母，或句号后是小写字母时不断句
+            previous_word = text[start:match.start(1)].rsplit(None, 1)[-1:] or ['']
+            word = previous_word[0].lower().lstrip('("\'“‘')
+            if (word in _ABBREVIATIONS or (len(word) == 1 and word.isalpha())
+                    or text[match.end():match.end() + 1].islower()):
+                continue
+            sentence_end, separator = match.end(1), match.group(2)
+        elif match.group(3):
+            sentence_end, separator = match.end(3), match.group(4)
+        else:
+            sentence_end, separator = match.start(5), match.group(5)
+        
+        sentence = text[start:sentence_end]
+        if sentence:
+            segments.append((sentence, separator))
+        elif segments:
+            last_sentence, last_separator = segments[-1]
+            segments[-1] = (last_sentence, last_separator + separator)
+        start = match.end()
+    
+    if start < len(text):
+        segments.append((text[start:], ''))
+    
+    return segments
+
+
+def join_sentences(sentences: List[str], separators: List[str], target_language: str = '') -> str:
+    """
+    按原分隔符拼接（翻译后的）句子
+    
+    目标语言为中文、日文时，句子之间不换行的空白分隔符去掉
+    
+    Args:
+        sentences: 句子列表
+        separators: 与句子对应的句后分隔符
+        target_language: 目标语言代码
+        
+    Returns:
+        str: 拼接后的文本
+    """
+    no_space = target_language.lower().startswith(_NO_SPACE_LANGUAGES)
+    parts = []
+    for sentence, separator in zip(sentences, separators):
+        parts.append(sentence)
+        if no_space and '\n' not in separator:
+            continue
+        parts.append(separator)
+    return ''.join(parts)
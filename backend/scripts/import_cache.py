@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+翻译缓存导入脚本
+把缓存导出文件（JSON/NDJSON）或逐行对齐的双语语料批量写入翻译缓存，用于预热共享缓存
+
+用法:
+    python scripts/import_cache.py export backups/translation_data.json
+    python scripts/import_cache.py export cache.ndjson --batch-size 5000
+    python scripts/import_cache.py aligned ../sample/en_clean.txt ../sample/cn_clean.txt --source-language en --target-language zh
+"""
+import asyncio
+import sys
+import time
+import logging
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.schemas.translation import LanguageCode, TranslationProvider
+from app.services.cache_import import CacheImporter, is_ndjson_file
+from app.services.translation_cache import TranslationCache
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    """主函数"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="翻译缓存导入工具")
+    subparsers = parser.add_subparsers(dest='command', help='可用命令')
+    
+    # 导出文件
+    export_parser = subparsers.add_parser('export', help='导入缓存导出文件（JSON或NDJSON）')
+    export_parser.add_argument('input_file', help='导出文件路径（.ndjson/.jsonl 按NDJSON解析）')
+    
+    # 对齐语料
+    aligned_parser = subparsers.add_parser('aligned', help='导入逐行对齐的双语语料')
+    aligned_parser.add_argument('source_file', help='原文文件路径')
+    aligned_parser.add_argument('target_file', help='译文文件路径')
+    
+    for sub_parser in (export_parser, aligned_parser):
+        sub_parser.add_argument('--source-language', default=LanguageCode.ENGLISH.value,
+                                choices=[code.value for code in LanguageCode], help='源语言')
+        sub_parser.add_argument('--target-language', default=LanguageCode.CHINESE.value,
+                                choices=[code.value for code in LanguageCode], help='目标语言')
+        sub_parser.add_argument('--provider', default=TranslationProvider.GOOGLE.value,
+                                choices=[provider.value for provider in TranslationProvider], help='提供商')
+        sub_parser.add_argument('--model', help='模型名，需与翻译时使用的一致')
+        sub_parser.add_argument('--batch-size', type=int, default=1000, help='每批写入的记录数')
+    
+    args = parser.parse_args()
+    
+    if not args.command:
+        parser.print_help()
+        return
+    
+    if settings.CACHE_BACKEND.lower() == "memory":
+        print("CACHE_BACKEND=memory 时缓存只存在于进程内，请配置 redis 或 sqlite 后再导入")
+        sys.exit(1)
+    
+    paths = [args.input_file] if args.command == 'export' else [args.source_file, args.target_file]
+    for path in paths:
+        if not Path(path).exists():
+            print(f"输入文件不存在: {path}")
+            sys.exit(1)
+    
+    importer = CacheImporter(
+        TranslationCache(),
+        source_language=LanguageCode(args.source_language),
+        target_language=LanguageCode(args.target_language),
+        provider=TranslationProvider(args.provider),
+        model=args.model,
+        batch_size=args.batch_size
+    )
+    
+    start_time = time.time()
+    if args.command == 'export':
+        with open(args.input_file, encoding='utf-8-sig') as f:
+            stats = await importer.import_export(f, ndjson=is_ndjson_file(args.input_file))
+    else:
+        with open(args.source_file, encoding='utf-8-sig') as source, \
+                open(args.target_file, encoding='utf-8-sig') as target:
+            stats = await importer.import_aligned(source, target)
+    elapsed = time.time() - start_time
+    
+    rate = stats['imported'] / elapsed if elapsed > 0 else 0
+    print(f"导入完成: {stats['imported']} 条，跳过 {stats['skipped']} 条，"
+          f"耗时 {elapsed:.2f}秒（{rate:,.0f} 条/秒）")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -24,6 +24,10 @@ def mock_translation_cache():
     """模拟翻译缓存"""
     cache = Mock(spec=TranslationCache)
     cache.get_cached_translation = AsyncMock(return_value=None)
+    cache.get_cached_translations_many = AsyncMock(
+        side_effect=lambda texts, *args: ({}, list(range(len(texts))))
+    )
+    cache.get_fuzzy_translation = Mock(return_value=None)
     cache.cache_translation = AsyncMock()
     cache.get_cache_stats = Mock(return_value={
         "total_items": 100,
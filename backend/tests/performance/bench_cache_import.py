@@ -0,0 +1,78 @@
+"""
+翻译缓存批量导入基准测试
+生成合成NDJSON导出文件，测量导入到SQLite共享缓存的吞吐量，以及峰值内存不随文件大小增长
+
+用法:
+    python tests/performance/bench_cache_import.py
+    python tests/performance/bench_cache_import.py --entries 1000000 --batch-size 5000
+    python tests/performance/bench_cache_import.py --trace-memory
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.services.cache_backends import SQLiteCacheBackend  # noqa: E402
+from app.services.cache_import import CacheImporter  # noqa: E402
+from app.services.translation_cache import TranslationCache  # noqa: E402
+
+
+def write_export(path: Path, entries: int):
+    """写入合成NDJSON导出文件"""
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(entries):
+            f.write(json.dumps({
+                "source_text": f"segment number {i} from the bulk import benchmark",
+                "translated_text": f"批量导入基准测试的第 {i} 个句段",
+                "source_language": "en", "target_language": "zh",
+                "provider": "google", "quality_score": 0.8
+            }, ensure_ascii=False) + "\n")
+
+
+async def run(export_path: Path, db_path: Path, batch_size: int, trace_memory: bool) -> dict:
+    """导入导出文件，返回导入统计、耗时和（可选）峰值内存"""
+    cache = TranslationCache(shared_backend=SQLiteCacheBackend(path=str(db_path)))
+    importer = CacheImporter(cache, batch_size=batch_size)
+
+    # tracemalloc 会明显拖慢导入，只在需要时开启
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with open(export_path, encoding="utf-8") as f:
+        stats = await importer.import_export(f, ndjson=True)
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {**stats, "seconds": elapsed, "peak_mb": peak / (1024 * 1024)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="翻译缓存批量导入基准测试")
+    parser.add_argument("--entries", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--trace-memory", action="store_true", help="统计峰值内存（会降低吞吐量）")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export_path = Path(tmp) / "export.ndjson"
+        write_export(export_path, args.entries)
+        result = asyncio.run(run(export_path, Path(tmp) / "cache.db", args.batch_size, args.trace_memory))
+
+    print(f"entries: {args.entries}, batch size: {args.batch_size}")
+    print(f"imported {result['imported']} (L1 {result['l1_loaded']}, L2 {result['l2_loaded']}, skipped {result['skipped']}) "
+          f"in {result['seconds']:.2f}s = {result['imported'] / result['seconds']:,.0f} entries/s")
+    if args.trace_memory:
+        print(f"peak traced memory {result['peak_mb']:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
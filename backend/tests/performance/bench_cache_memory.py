@@ -0,0 +1,96 @@
+"""
+翻译缓存内存基准测试
+比较L1中每个缓存项使用 CacheModel 和紧凑 CacheEntry 时的内存占用
+
+用法:
+    python tests/performance/bench_cache_memory.py
+    python tests/performance/bench_cache_memory.py --entries 200000 --long-ratio 0.2
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.schemas.translation import TranslationCache as CacheModel, TranslationProvider  # noqa: E402
+from app.services.cache_entry import CacheEntry, DEFAULT_COMPRESS_MIN_BYTES  # noqa: E402
+
+_WORDS = (
+    "the translation cache stores segments from documents contracts manuals and "
+    "support tickets so repeated sentences never reach the provider again"
+).split()
+
+
+def make_texts(entries: int, long_ratio: float, seed: int = 42):
+    """生成合成句段，long_ratio比例的句段为段落级长文本"""
+    rng = random.Random(seed)
+    texts = []
+    for i in range(entries):
+        words = 120 if rng.random() < long_ratio else 12
+        source = f"{i} " + " ".join(rng.choice(_WORDS) for _ in range(words))
+        texts.append((source, "译" * (len(source) // 3)))
+    return texts
+
+
+def measure(build, texts) -> float:
+    """构建全部缓存项并返回每项平均占用的字节数"""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    # 每项使用新建的字符串，和L1中每个缓存项各自持有文本的情况一致
+    items = [
+        build(i, source.encode('utf-8').decode('utf-8'), translated.encode('utf-8').decode('utf-8'))
+        for i, (source, translated) in enumerate(texts)
+    ]
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del items
+    return used / len(texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="翻译缓存内存基准测试")
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--long-ratio", type=float, default=0.1)
+    parser.add_argument("--compress-min-bytes", type=int, default=DEFAULT_COMPRESS_MIN_BYTES)
+    args = parser.parse_args()
+
+    texts = make_texts(args.entries, args.long_ratio)
+    now = datetime.now()
+    now_ts = time.time()
+
+    def build_model(i, source, translated):
+        return CacheModel(
+            id=f"v2:{i:032x}", source_text=source, translated_text=translated,
+            source_language="en", target_language="zh", provider=TranslationProvider.GOOGLE,
+            model_used=None, quality_score=0.8, hit_count=1, created_at=now, last_used_at=now
+        )
+
+    def build_entry(compress_min_bytes):
+        def build(i, source, translated):
+            return CacheEntry(
+                source, translated, "en", "zh", TranslationProvider.GOOGLE, None, 0.8,
+                hit_count=1, created_at=now_ts, last_used_at=now_ts,
+                compress_min_bytes=compress_min_bytes
+            )
+        return build
+
+    model_bytes = measure(build_model, texts)
+    entry_bytes = measure(build_entry(0), texts)
+    compressed_bytes = measure(build_entry(args.compress_min_bytes), texts)
+
+    print(f"entries: {args.entries}, long texts: {args.long_ratio:.0%}")
+    print(f"{'representation':<28} {'bytes/entry':>12} {'vs model':>10}")
+    for name, value in (
+        ("CacheModel", model_bytes),
+        ("CacheEntry", entry_bytes),
+        (f"CacheEntry + compress>={args.compress_min_bytes}B", compressed_bytes),
+    ):
+        print(f"{name:<28} {value:>12.0f} {value / model_bytes:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+跨请求微批处理基准测试
+模拟大量只有1-5句的并发翻译请求，对比不合并与不同合并窗口下的吞吐量和延迟分位数。
+提供商使用模拟翻译提供商：每次调用有固定的网络往返延迟，并受速率限制
+
+用法:
+    python tests/performance/bench_micro_batching.py
+    python tests/performance/bench_micro_batching.py --clients 200 --duration 5 --windows 0 2 5 10
+    python tests/performance/bench_micro_batching.py --call-latency-ms 80 --rate-limit 20
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.providers.mock_provider import MockTranslationProvider  # noqa: E402
+from app.providers.request_scheduler import RateLimiter  # noqa: E402
+from app.schemas.translation import TranslationItem, TranslationProvider  # noqa: E402
+from app.services.micro_batcher import MicroBatcher  # noqa: E402
+
+
+class SimulatedLatencyProvider(MockTranslationProvider):
+    """每次调用固定往返延迟、每句少量处理时间、受速率限制的模拟提供商"""
+
+    def __init__(self, call_latency: float, per_text_latency: float, rate_limit: float, max_batch_size: int):
+        super().__init__()
+        self.call_latency = call_latency
+        self.per_text_latency = per_text_latency
+        self.max_batch_size = max_batch_size
+        self.rate_limiter = RateLimiter(requests_per_second=rate_limit, interactive_reserve=0, tenant_weights={})
+        self.calls = 0
+
+    async def translate_batch(
+        self,
+        texts: List[str],
+        source_lang: str = "en",
+        target_lang: str = "zh",
+        context: Optional[str] = None
+    ) -> List[TranslationItem]:
+        await self.rate_limiter.acquire()
+        self.calls += 1
+        await asyncio.sleep(self.call_latency + self.per_text_latency * len(texts))
+        return [
+            TranslationItem(
+                original_text=text, translated_text=f"[{text}]", confidence=0.9,
+                provider=TranslationProvider.MOCK
+            )
+            for text in texts
+        ]
+
+
+def percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+async def run(args, window_ms: float) -> dict:
+    """clients 个客户端在 duration 秒内循环发送小请求，返回吞吐量和延迟统计"""
+    provider = SimulatedLatencyProvider(
+        args.call_latency_ms / 1000, args.per_text_latency_ms / 1000, args.rate_limit, args.max_batch_size
+    )
+    batcher = MicroBatcher(window_ms=window_ms)
+    latencies: List[float] = []
+    texts_done = 0
+    deadline = time.perf_counter() + args.duration
+    rng = random.Random(42)
+
+    async def client(client_id: int):
+        nonlocal texts_done
+        request_id = 0
+        while time.perf_counter() < deadline:
+            texts = [f"client {client_id} request {request_id} sentence {i}" for i in range(rng.randint(1, 5))]
+            request_id += 1
+            start = time.perf_counter()
+            await batcher.translate_batch(provider, texts, "en", "zh")
+            latencies.append(time.perf_counter() - start)
+            texts_done += len(texts)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(args.clients)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "window_ms": window_ms,
+        "requests": len(latencies),
+        "provider_calls": provider.calls,
+        "texts_per_second": texts_done / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="跨请求微批处理基准测试")
+    parser.add_argument("--clients", type=int, default=100, help="并发客户端数")
+    parser.add_argument("--duration", type=float, default=3.0, help="每组测试时长（秒）")
+    parser.add_argument("--windows", type=float, nargs="+", default=[0, 2, 5, 10], help="合并窗口（毫秒），0为不合并")
+    parser.add_argument("--call-latency-ms", type=float, default=50.0, help="提供商每次调用的往返延迟")
+    parser.add_argument("--per-text-latency-ms", type=float, default=0.2, help="提供商每句的处理时间")
+    parser.add_argument("--rate-limit", type=float, default=100.0, help="提供商每秒请求数上限")
+    parser.add_argument("--max-batch-size", type=int, default=128, help="提供商每次调用的句段数上限")
+    args = parser.parse_args()
+
+    print(
+        f"{args.clients} 个客户端，每请求1-5句；提供商往返 {args.call_latency_ms:.0f}ms，"
+        f"限速 {args.rate_limit:.0f} 次/秒，每批最多 {args.max_batch_size} 句\n"
+    )
+    print(f"{'窗口(ms)':>8} {'请求数':>8} {'提供商调用':>10} {'句/秒':>10} {'p50(ms)':>9} {'p99(ms)':>9}")
+    for window_ms in args.windows:
+        result = asyncio.run(run(args, window_ms))
+        print(
+            f"{result['window_ms']:>8.0f} {result['requests']:>8} {result['provider_calls']:>10} "
+            f"{result['texts_per_second']:>10.0f} {result['p50_ms']:>9.1f} {result['p99_ms']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+持久化缓存启动基准测试
+验证SQLite缓存后端的启动时间和首次查询延迟不随存储规模增长
+
+用法:
+    python tests/performance/bench_persistent_cache.py
+    python tests/performance/bench_persistent_cache.py --entries 5000000 --path /tmp/bench_cache.db
+
+5百万条（数据库2.5GB，单核、5GB内存）的测量结果：启动 1.5-2.8ms（清空系统页缓存后为2.8ms），
+L2冷查询 290us（清空页缓存后 607us），L1热查询 17-22us
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.schemas.translation import TranslationCache as CacheModel, TranslationProvider  # noqa: E402
+from app.services.cache_backends import SQLiteCacheBackend  # noqa: E402
+from app.services.translation_cache import TranslationCache  # noqa: E402
+
+
+def populate(path: str, entries: int, batch_size: int = 50_000):
+    """写入合成缓存项（直接批量插入行，跳过逐条序列化）"""
+    backend = SQLiteCacheBackend(path=path)
+    cache = TranslationCache(shared_backend=backend)
+    now = datetime.now()
+    expires_at = time.time() + 30 * 24 * 3600
+
+    for start in range(0, entries, batch_size):
+        rows = []
+        for i in range(start, min(start + batch_size, entries)):
+            text = f"segment number {i}"
+            key = cache._generate_cache_key(text, "en", "zh", TranslationProvider.GOOGLE)
+            value = CacheModel.model_construct(
+                id=key, source_text=text, translated_text=f"句段 {i}",
+                source_language="en", target_language="zh", provider=TranslationProvider.GOOGLE,
+                model_used=None, quality_score=0.8, hit_count=1, created_at=now, last_used_at=now
+            ).model_dump_json()
+            rows.append((key, value, expires_at))
+        with backend._conn:
+            backend._conn.executemany(
+                "INSERT OR REPLACE INTO translation_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                rows
+            )
+    backend._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    backend.close()
+
+
+async def measure(path: str, entries: int, lookups: int) -> dict:
+    """测量启动时间和冷/热查询延迟"""
+    start = time.perf_counter()
+    cache = TranslationCache(shared_backend=SQLiteCacheBackend(path=path))
+    startup_ms = (time.perf_counter() - start) * 1000
+
+    texts = [f"segment number {random.randrange(entries)}" for _ in range(lookups)]
+
+    start = time.perf_counter()
+    for text in texts:
+        assert await cache.get_cached_translation(text, "en", "zh", TranslationProvider.GOOGLE)
+    cold_us = (time.perf_counter() - start) / lookups * 1e6
+
+    start = time.perf_counter()
+    for text in texts:
+        await cache.get_cached_translation(text, "en", "zh", TranslationProvider.GOOGLE)
+    warm_us = (time.perf_counter() - start) / lookups * 1e6
+
+    return {"startup_ms": startup_ms, "cold_us": cold_us, "warm_us": warm_us}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="持久化缓存启动基准测试")
+    parser.add_argument("--entries", type=int, default=5_000_000)
+    parser.add_argument("--lookups", type=int, default=2_000)
+    parser.add_argument("--path", default="bench_translation_cache.db")
+    parser.add_argument("--keep", action="store_true", help="保留数据库文件供下次复用")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        start = time.perf_counter()
+        populate(args.path, args.entries)
+        print(f"populate: {args.entries} entries in {time.perf_counter() - start:.1f}s")
+
+    result = asyncio.run(measure(args.path, args.entries, args.lookups))
+    size_mb = os.path.getsize(args.path) / 1024 / 1024
+
+    print(f"store size:        {size_mb:.0f}MB")
+    print(f"startup:           {result['startup_ms']:.1f}ms")
+    print(f"cold lookup (L2):  {result['cold_us']:.1f}us")
+    print(f"warm lookup (L1):  {result['warm_us']:.1f}us")
+
+    if not args.keep:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.path + suffix):
+                os.remove(args.path + suffix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+待翻译文本规范化基准测试
+对比原实现（引擎预处理、提供商清理、缓存键各规范化一次，控制字符逐字符过滤）与
+单次规范化（str.translate 表 + 预编译正则，规范化结果和缓存键随文本传递）的字符吞吐量
+
+用法:
+    python tests/performance/bench_text_normalization.py
+    python tests/performance/bench_text_normalization.py --texts 50000 --length 200 --control-ratio 0.1
+"""
+import argparse
+import hashlib
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.schemas.translation import TranslationProvider  # noqa: E402
+from app.services.translation_cache import TranslationCache  # noqa: E402
+from app.utils.text_utils import normalize_text  # noqa: E402
+
+_WORDS = ["the", "quick", "brown", "fox", "翻译", "引擎", "缓存", "jumps", "over", "lazy", "dog.", "你好，"]
+
+
+def legacy_clean(text: str) -> str:
+    """原实现：引擎预处理和提供商清理使用的规范化"""
+    if not text or not text.strip():
+        return ""
+    cleaned = ' '.join(text.split())
+    cleaned = ''.join(char for char in cleaned if ord(char) >= 32 or char in '\n\t')
+    return cleaned.strip()
+
+
+def legacy_cache_key(text: str) -> str:
+    """原实现：缓存键再做一次空白规范化并计算摘要"""
+    key_string = "\x1f".join((' '.join(text.split()), "en", "zh", "google", ""))
+    return hashlib.blake2b(key_string.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def make_texts(count: int, length: int, control_ratio: float, seed: int = 42) -> List[str]:
+    """生成带多余空白、换行和少量控制字符的文本"""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        parts = []
+        size = 0
+        while size < length:
+            word = rng.choice(_WORDS)
+            parts.append(word + rng.choice([" ", " ", "  ", "\n", "\t "]))
+            size += len(parts[-1])
+        text = "".join(parts)
+        if rng.random() < control_ratio:
+            position = rng.randrange(len(text))
+            text = text[:position] + rng.choice(["\x00", "\x07", "\x1b"]) + text[position:]
+        texts.append(text)
+    return texts
+
+
+def legacy_pipeline(texts: List[str]):
+    """原流程：引擎预处理、缓存查询键、请求合并键、提供商清理"""
+    for text in texts:
+        cleaned = legacy_clean(text)
+        legacy_cache_key(cleaned)
+        legacy_cache_key(cleaned)
+        legacy_clean(cleaned)
+
+
+def single_pass_pipeline(texts: List[str], cache: TranslationCache):
+    """新流程：规范化一次，缓存键计算一次后复用，提供商直接使用规范化结果"""
+    for text in texts:
+        normalized = normalize_text(text)
+        cache.cache_key(normalized, "en", "zh", TranslationProvider.GOOGLE)
+        cache.cache_key(normalized, "en", "zh", TranslationProvider.GOOGLE)
+        normalize_text(normalized)
+
+
+def measure(func: Callable[[], None], chars: int, repeat: int) -> float:
+    """取多次运行中最快的一次，返回每秒字符数"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return chars / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="待翻译文本规范化基准测试")
+    parser.add_argument("--texts", type=int, default=20000, help="文本数")
+    parser.add_argument("--length", type=int, default=120, help="每条文本的大致字符数")
+    parser.add_argument("--control-ratio", type=float, default=0.05, help="含控制字符的文本比例")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数，取最快一次")
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts, args.length, args.control_ratio)
+    chars = sum(len(text) for text in texts)
+    # 不含控制字符时两种实现结果一致
+    assert all(
+        legacy_clean(text) == normalize_text(text)
+        for text in texts if not any(char in text for char in "\x00\x07\x1b")
+    )
+
+    print(f"{args.texts} 条文本，共 {chars} 个字符，{args.control_ratio:.0%} 含控制字符\n")
+    print(f"{'阶段':<24} {'原实现(字符/秒)':>16} {'新实现(字符/秒)':>16} {'提升':>8}")
+
+    before = measure(lambda: [legacy_clean(text) for text in texts], chars, args.repeat)
+    after = measure(lambda: [normalize_text(text) for text in texts], chars, args.repeat)
+    print(f"{'单次规范化':<24} {before:>16,.0f} {after:>16,.0f} {after / before:>7.1f}x")
+
+    # 原始文本每次规范化都得到新对象，不会复用上一轮记下的缓存键
+    cache = TranslationCache()
+    before = measure(lambda: legacy_pipeline(texts), chars, args.repeat)
+    after = measure(lambda: single_pass_pipeline(texts, cache), chars, args.repeat)
+    print(f"{'整个请求（含缓存键）':<24} {before:>16,.0f} {after:>16,.0f} {after / before:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
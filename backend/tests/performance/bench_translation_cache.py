@@ -0,0 +1,66 @@
+"""
+翻译缓存微基准测试
+验证缓存读写和淘汰的单次操作延迟不随缓存规模增长
+
+用法:
+    python tests/performance/bench_translation_cache.py
+    python tests/performance/bench_translation_cache.py --sizes 10000 100000 1000000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.services.cache_backends import MemoryCacheBackend  # noqa: E402
+
+
+def bench_size(size: int, operations: int) -> dict:
+    """在指定规模下测量 get/put/evict 的单次平均延迟(纳秒)"""
+    backend = MemoryCacheBackend(max_size=size, ttl_seconds=3600)
+    for i in range(size):
+        backend.set(f"key-{i}", i)
+
+    keys = [f"key-{random.randrange(size)}" for _ in range(operations)]
+
+    # 命中读取
+    start = time.perf_counter_ns()
+    for key in keys:
+        backend.get(key)
+    get_ns = (time.perf_counter_ns() - start) / operations
+
+    # 覆盖写入（不触发淘汰）
+    start = time.perf_counter_ns()
+    for key in keys:
+        backend.set(key, 0)
+    put_ns = (time.perf_counter_ns() - start) / operations
+
+    # 新键写入（每次都触发一次LRU淘汰）
+    new_keys = [f"new-{i}" for i in range(operations)]
+    start = time.perf_counter_ns()
+    for key in new_keys:
+        backend.set(key, 0)
+    evict_ns = (time.perf_counter_ns() - start) / operations
+
+    return {"size": size, "get_ns": get_ns, "put_ns": put_ns, "put_evict_ns": evict_ns}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="翻译缓存微基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--operations", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"{'entries':>10} {'get(ns)':>10} {'put(ns)':>10} {'put+evict(ns)':>14}")
+    for size in args.sizes:
+        result = bench_size(size, args.operations)
+        print(
+            f"{result['size']:>10} {result['get_ns']:>10.0f} "
+            f"{result['put_ns']:>10.0f} {result['put_evict_ns']:>14.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+模糊翻译记忆基准测试
+在合成句段库上测量近似重复句段的召回率和单次查询延迟
+
+查询文本由库中句段扰动得到：改数字、改标点或替换一个词（模拟人名差异）
+
+用法:
+    python tests/performance/bench_translation_memory.py
+    python tests/performance/bench_translation_memory.py --size 100000 --queries 2000
+"""
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.services.translation_memory import FuzzyTranslationMemory  # noqa: E402
+
+
+def make_vocabulary(size: int, rng: random.Random) -> list:
+    """生成随机词表"""
+    return [
+        ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+        for _ in range(size)
+    ]
+
+
+def make_sentence(vocabulary: list, rng: random.Random) -> str:
+    """生成带数字的随机句子"""
+    words = rng.sample(vocabulary, rng.randint(8, 16))
+    words.insert(rng.randrange(len(words)), str(rng.randint(1, 9999)))
+    return ' '.join(words).capitalize() + '.'
+
+
+def perturb(sentence: str, vocabulary: list, rng: random.Random) -> str:
+    """对句子做一处小改动"""
+    words = sentence[:-1].split(' ')
+    kind = rng.choice(("number", "punctuation", "word"))
+    if kind == "number":
+        for i, word in enumerate(words):
+            if word.isdigit():
+                words[i] = str(rng.randint(1, 9999))
+        return ' '.join(words) + '.'
+    if kind == "punctuation":
+        return ' '.join(words) + rng.choice(('!', '?', ';', '...'))
+    words[rng.randrange(len(words))] = rng.choice(vocabulary)
+    return ' '.join(words) + '.'
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模糊翻译记忆基准测试")
+    parser.add_argument("--size", type=int, default=1_000_000, help="记忆库句段数")
+    parser.add_argument("--queries", type=int, default=5_000)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(20_000, rng)
+    memory = FuzzyTranslationMemory(max_segments=args.size, similarity_threshold=args.threshold)
+
+    start = time.perf_counter()
+    segment_ids = []
+    sentences = []
+    for _ in range(args.size):
+        sentence = make_sentence(vocabulary, rng)
+        sentences.append(sentence)
+        segment_ids.append(memory.add(sentence, sentence.upper(), "en", "zh", "google"))
+    build_seconds = time.perf_counter() - start
+
+    # 召回率只统计与原句段真实相似度达到阈值的查询
+    eligible = 0
+    hits = 0
+    latencies_us = []
+    for _ in range(args.queries):
+        index = rng.randrange(args.size)
+        query = perturb(sentences[index], vocabulary, rng)
+
+        start = time.perf_counter_ns()
+        matches = memory.lookup(query, "en", "zh")
+        latencies_us.append((time.perf_counter_ns() - start) / 1000)
+
+        similarity = memory._jaccard(
+            memory._ngrams(memory._normalize(query)),
+            memory._ngrams(memory._normalize(sentences[index]))
+        )
+        if similarity < args.threshold:
+            continue
+        eligible += 1
+        if any(match.segment_id == segment_ids[index] for match in matches):
+            hits += 1
+
+    print(f"segments:       {len(memory)}")
+    print(f"build:          {build_seconds:.1f}s ({build_seconds / args.size * 1e6:.1f}us/segment)")
+    print(f"eligible:       {eligible}/{args.queries} queries with similarity >= {args.threshold}")
+    print(f"recall@3:       {hits / max(eligible, 1):.4f}")
+    print(f"lookup p50:     {percentile(latencies_us, 0.50):.1f}us")
+    print(f"lookup p99:     {percentile(latencies_us, 0.99):.1f}us")
+    print(f"lookup mean:    {sum(latencies_us) / len(latencies_us):.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+翻译缓存策略离线模拟
+回放缓存键访问序列，比较不同淘汰/准入策略在各容量下的命中率
+
+访问序列可以来自线上记录：把 app.services.translation_cache.trace 日志器设为DEBUG，
+每次L1查询会输出一行缓存键；回放时取每行最后一个字段作为缓存键。
+不指定 --trace 时生成合成序列（Zipf分布的热点句段 + 只出现一次的句段）。
+
+用法:
+    python tests/performance/simulate_cache_policy.py
+    python tests/performance/simulate_cache_policy.py --trace cache_trace.log --capacities 1000 10000
+"""
+import argparse
+import random
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.services.cache_admission import TinyLFUAdmission  # noqa: E402
+from app.services.cache_backends import MemoryCacheBackend  # noqa: E402
+
+# 策略名 -> 根据容量创建准入策略（None表示纯LRU）
+POLICIES: Dict[str, Callable[[int], Optional[TinyLFUAdmission]]] = {
+    "lru": lambda capacity: None,
+    "tinylfu": lambda capacity: TinyLFUAdmission(capacity=capacity),
+}
+
+
+def load_trace(path: str) -> List[str]:
+    """读取访问序列，每行最后一个字段为缓存键"""
+    keys = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            fields = line.split()
+            if fields:
+                keys.append(fields[-1])
+    return keys
+
+
+def synthetic_trace(
+    length: int,
+    hot_segments: int,
+    one_off_ratio: float,
+    zipf_s: float = 1.0,
+    seed: int = 42
+) -> List[str]:
+    """生成合成访问序列：热点句段按Zipf分布重复出现，其余为只出现一次的句段"""
+    rng = random.Random(seed)
+    weights = [1 / (rank ** zipf_s) for rank in range(1, hot_segments + 1)]
+    hot = rng.choices(range(hot_segments), weights=weights, k=length)
+
+    trace = []
+    for i, rank in enumerate(hot):
+        if rng.random() < one_off_ratio:
+            trace.append(f"once-{i}")
+        else:
+            trace.append(f"hot-{rank}")
+    return trace
+
+
+def replay(trace: Iterable[str], capacity: int, policy: str) -> float:
+    """回放访问序列，未命中时写入缓存，返回命中率"""
+    backend = MemoryCacheBackend(
+        max_size=capacity, ttl_seconds=float("inf"), admission=POLICIES[policy](capacity)
+    )
+    hits = 0
+    total = 0
+    for key in trace:
+        total += 1
+        if backend.get(key) is not None:
+            hits += 1
+        else:
+            backend.set(key, True)
+    return hits / total if total else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="翻译缓存策略离线模拟")
+    parser.add_argument("--trace", help="访问序列文件（每行最后一个字段为缓存键）")
+    parser.add_argument("--capacities", type=int, nargs="+", default=[500, 2_000, 10_000])
+    parser.add_argument("--policies", nargs="+", choices=sorted(POLICIES), default=sorted(POLICIES))
+    parser.add_argument("--length", type=int, default=500_000, help="合成序列长度")
+    parser.add_argument("--hot-segments", type=int, default=50_000, help="合成序列的热点句段数")
+    parser.add_argument("--one-off-ratio", type=float, default=0.5, help="合成序列中只出现一次的句段比例")
+    args = parser.parse_args()
+
+    if args.trace:
+        trace = load_trace(args.trace)
+        source = args.trace
+    else:
+        trace = synthetic_trace(args.length, args.hot_segments, args.one_off_ratio)
+        source = f"synthetic (hot={args.hot_segments}, one-off={args.one_off_ratio:.0%})"
+
+    print(f"trace: {source}, {len(trace)} lookups, {len(set(trace))} distinct keys")
+    print(f"{'capacity':>10} " + " ".join(f"{policy:>10}" for policy in args.policies))
+    for capacity in args.capacities:
+        ratios = [replay(trace, capacity, policy) for policy in args.policies]
+        print(f"{capacity:>10} " + " ".join(f"{ratio:>10.2%}" for ratio in ratios))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""
+翻译任务队列单元测试
+"""
+import asyncio
+import time
+import uuid
+import pytest
+from datetime import datetime
+from app.services.job_store import MemoryJobStore, RedisJobStore, SQLiteJobStore
+from app.services.job_workers import JobWorkerPool, parse_provider_concurrency
+from app.schemas.translation import (
+    LanguageCode, TranslationItem, TranslationJob, TranslationProvider, TranslationRequest,
+    TranslationResult, TranslationStatus
+)
+
+
+def make_job(provider: TranslationProvider = TranslationProvider.GOOGLE) -> TranslationJob:
+    return TranslationJob(
+        total_segments=1,
+        id=str(uuid.uuid4()),
+        project_id="test-project",
+        user_id="test-user",
+        status=TranslationStatus.PENDING,
+        request=TranslationRequest(
+            texts=["Hello"],
+            source_language=LanguageCode.ENGLISH,
+            target_language=LanguageCode.CHINESE,
+            provider=provider
+        ),
+        created_at=datetime.now()
+    )
+
+
+def make_result(texts) -> TranslationResult:
+    translations = [
+        TranslationItem(
+            original_text=text, translated_text=f"译{text}", confidence=0.9,
+            provider=TranslationProvider.GOOGLE, quality_score=0.9
+        )
+        for text in texts
+    ]
+    return TranslationResult(
+        translations=translations, total_count=len(texts), success_count=len(texts),
+        cache_hit_count=0, cache_hit_rate=0, provider_used=TranslationProvider.GOOGLE,
+        total_cost=0.01, processing_time=0.1, quality_summary={}
+    )
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        store = MemoryJobStore()
+    else:
+        store = SQLiteJobStore(path=str(tmp_path / "jobs.db"))
+    yield store
+    store.close()
+
+
+class TestJobStore:
+    """测试任务存储"""
+
+    @pytest.mark.asyncio
+    async def test_claim_in_submission_order_per_provider(self, store):
+        first, second = make_job(), make_job()
+        other = make_job(TranslationProvider.OPENAI)
+        for job in (first, other, second):
+            await store.save(job)
+
+        claimed = await store.claim(TranslationProvider.GOOGLE, lease_seconds=60)
+        assert claimed.id == first.id
+        assert claimed.status == TranslationStatus.IN_PROGRESS
+        assert claimed.started_at is not None
+        assert (await store.claim(TranslationProvider.GOOGLE, lease_seconds=60)).id == second.id
+        assert await store.claim(TranslationProvider.GOOGLE, lease_seconds=60) is None
+        assert (await store.claim(TranslationProvider.OPENAI, lease_seconds=60)).id == other.id
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_reclaimed(self, store):
+        """worker崩溃（不再续约）后任务被重新领取"""
+        job = make_job()
+        await store.save(job)
+
+        claimed = await store.claim(TranslationProvider.GOOGLE, lease_seconds=0.05)
+        assert await store.claim(TranslationProvider.GOOGLE, lease_seconds=0.05) is None
+
+        await asyncio.sleep(0.1)
+        reclaimed = await store.claim(TranslationProvider.GOOGLE, lease_seconds=60)
+        assert reclaimed.id == job.id
+        assert reclaimed.started_at == claimed.started_at
+        assert (claimed.attempt, reclaimed.attempt) == (1, 2)
+        assert (await store.get_run(job.id)).attempt == 2
+
+    @pytest.mark.asyncio
+    async def test_renew_keeps_lease(self, store):
+        await store.save(make_job())
+        claimed = await store.claim(TranslationProvider.GOOGLE, lease_seconds=0.1)
+
+        await store.renew(claimed.id, lease_seconds=60)
+        await asyncio.sleep(0.15)
+        assert await store.claim(TranslationProvider.GOOGLE, lease_seconds=60) is None
+
+    @pytest.mark.asyncio
+    async def test_finished_jobs_expire(self, store):
+        job = make_job()
+        await store.save(job)
+        claimed = await store.claim(TranslationProvider.GOOGLE, lease_seconds=60)
+        claimed.status = TranslationStatus.COMPLETED
+        await store.save(claimed, expires_at=time.time() + 0.05)
+
+        assert (await store.get(job.id)).status == TranslationStatus.COMPLETED
+        assert await store.claim(TranslationProvider.GOOGLE, lease_seconds=60) is None
+
+        await asyncio.sleep(0.1)
+        assert await store.get(job.id) is None
+        assert await store.purge_expired() == 1
+        assert (await store.get_stats())["jobs"] == 0
+
+
+    @pytest.mark.asyncio
+    async def test_checkpoints_and_progress(self, store):
+        job = make_job()
+        job.total_segments = 4
+        await store.save(job)
+        await store.claim(TranslationProvider.GOOGLE, lease_seconds=60)
+
+        await store.save_checkpoint(job.id, 0, make_result(["a", "b"]), 2, 1.5)
+        await store.save_checkpoint(job.id, 2, make_result(["c"]), 3, 0.5)
+
+        saved = await store.get(job.id)
+        assert saved.status == TranslationStatus.IN_PROGRESS
+        assert saved.completed_segments == 3
+        assert saved.progress == 0.75
+        assert saved.eta_seconds == 0.5
+        assert await store.get_status(job.id) == TranslationStatus.IN_PROGRESS
+
+        checkpoints = await store.load_checkpoints(job.id)
+        assert sorted(checkpoints) == [0, 2]
+        assert [t.original_text for t in checkpoints[0].translations] == ["a", "b"]
+
+        # 失败的任务保留检查点，成功完成后删除
+        saved.status = TranslationStatus.FAILED
+        await store.save(saved, expires_at=time.time() + 60)
+        assert len(await store.load_checkpoints(job.id)) == 2
+        saved.status = TranslationStatus.COMPLETED
+        await store.save(saved, expires_at=time.time() + 60)
+        assert await store.load_checkpoints(job.id) == {}
+        assert (await store.get(job.id)).completed_segments == 3
+
+    @pytest.mark.asyncio
+    async def test_cancelled_job_is_not_claimed(self, store):
+        job = make_job()
+        await store.save(job)
+        job.status = TranslationStatus.CANCELLED
+        await store.save(job, expires_at=time.time() + 60)
+
+        assert await store.claim(TranslationProvider.GOOGLE, lease_seconds=60) is None
+        assert await store.get_status(job.id) == TranslationStatus.CANCELLED
+
+    @pytest.mark.asyncio
+    async def test_cancel_keeps_lease_until_worker_saves(self, store):
+        """执行中的任务取消后租约保留到worker写回结果"""
+        job = make_job()
+        await store.save(job)
+        claimed = await store.claim(TranslationProvider.GOOGLE, lease_seconds=60)
+        assert await store.get_run(job.id) == (TranslationStatus.IN_PROGRESS, 1, True)
+
+        cancelled = await store.get(job.id)
+        cancelled.status = TranslationStatus.CANCELLED
+        await store.save(cancelled, expires_at=time.time() + 60, keep_lease=True)
+        await store.renew(job.id, lease_seconds=60)
+        assert await store.get_run(job.id) == (TranslationStatus.CANCELLED, 1, True)
+        assert await store.claim(TranslationProvider.GOOGLE, lease_seconds=60) is None
+
+        claimed.status = TranslationStatus.CANCELLED
+        await store.save(claimed, expires_at=time.time() + 60)
+        assert await store.get_run(job.id) == (TranslationStatus.CANCELLED, 1, False)
+        assert await store.get_run("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_memory_stats_skip_expired_leases(self):
+        """worker崩溃后留下的过期租约不计入执行中"""
+        store = MemoryJobStore()
+        await store.save(make_job())
+        await store.claim(TranslationProvider.GOOGLE, lease_seconds=0.05)
+        assert (await store.get_stats())["in_progress"] == 1
+
+        await asyncio.sleep(0.1)
+        assert (await store.get_stats())["in_progress"] == 0
+
+
+class TestRedisJobStore:
+    """测试Redis任务存储的待执行队列"""
+
+    @pytest.mark.asyncio
+    async def test_resumed_job_is_claimed_once(self):
+        """排队中取消后恢复的任务只在队列中出现一次，不会被两个worker同时领取"""
+        fakeredis = pytest.importorskip("fakeredis")
+        store = RedisJobStore(client=fakeredis.FakeAsyncRedis())
+        job = make_job()
+        await store.save(job)
+
+        job.status = TranslationStatus.CANCELLED
+        await store.save(job, expires_at=time.time() + 60, keep_lease=True)
+        job.status = TranslationStatus.PENDING
+        await store.save(job)
+
+        claimed = await store.claim(TranslationProvider.GOOGLE, lease_seconds=60)
+        assert claimed.attempt == 1
+        assert await store.claim(TranslationProvider.GOOGLE, lease_seconds=60) is None
+        assert await store.get_run(job.id) == (TranslationStatus.IN_PROGRESS, 1, True)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_job_leaves_pending_queue(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        store = RedisJobStore(client=fakeredis.FakeAsyncRedis())
+        job = make_job()
+        await store.save(job)
+
+        job.status = TranslationStatus.CANCELLED
+        await store.save(job, expires_at=time.time() + 60, keep_lease=True)
+
+        assert (await store.get_stats())["pending"] == 0
+        assert await store.claim(TranslationProvider.GOOGLE, lease_seconds=60) is None
+
+
+class TestPersistentJobStore:
+    """测试SQLite任务存储的重启恢复"""
+
+    @pytest.mark.asyncio
+    async def test_jobs_survive_restart(self, tmp_path):
+        path = str(tmp_path / "jobs.db")
+        store = SQLiteJobStore(path=path)
+        running, pending = make_job(), make_job()
+        await store.save(running)
+        await store.save(pending)
+        await store.claim(TranslationProvider.GOOGLE, lease_seconds=0.05)
+        store.close()
+
+        await asyncio.sleep(0.1)
+        restarted = SQLiteJobStore(path=path)
+        try:
+            stats = await restarted.get_stats()
+            assert stats["pending"] == 1 and stats["in_progress"] == 1
+            # 崩溃前执行中的任务（租约已过期）与排队的任务一样按创建顺序被领取
+            assert (await restarted.claim(TranslationProvider.GOOGLE, 60)).id == running.id
+            assert (await restarted.claim(TranslationProvider.GOOGLE, 60)).id == pending.id
+        finally:
+            restarted.close()
+
+
+class TestJobWorkerPool:
+    """测试任务工作池"""
+
+    def test_parse_provider_concurrency(self):
+        concurrency = parse_provider_concurrency("openai=1, google=4", default=2)
+        assert concurrency[TranslationProvider.OPENAI] == 1
+        assert concurrency[TranslationProvider.GOOGLE] == 4
+        assert concurrency[TranslationProvider.AZURE] == 2
+
+        with pytest.raises(ValueError):
+            parse_provider_concurrency("unknown=1", default=2)
+
+    @pytest.mark.asyncio
+    async def test_concurrency_bounded_per_provider(self):
+        running = 0
+        peak = 0
+
+        async def handler(job):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            job.status = TranslationStatus.COMPLETED
+
+        store = MemoryJobStore()
+        pool = JobWorkerPool(
+            store, handler, concurrency={TranslationProvider.GOOGLE: 2},
+            lease_seconds=60, result_ttl=60, poll_interval=0.01
+        )
+        jobs = [make_job() for _ in range(6)]
+        try:
+            for job in jobs:
+                await pool.submit(job)
+            for _ in range(100):
+                if all([(await store.get(job.id)).status == TranslationStatus.COMPLETED for job in jobs]):
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await pool.stop()
+
+        assert peak == 2
+        assert all([(await store.get(job.id)).status == TranslationStatus.COMPLETED for job in jobs])
+
+    @pytest.mark.asyncio
+    async def test_handler_error_marks_job_failed(self):
+        async def handler(job):
+            raise RuntimeError("provider down")
+
+        store = MemoryJobStore()
+        pool = JobWorkerPool(
+            store, handler, concurrency={TranslationProvider.GOOGLE: 1},
+            lease_seconds=60, result_ttl=60, poll_interval=0.01
+        )
+        job = make_job()
+        try:
+            await pool.submit(job)
+            for _ in range(100):
+                if (await store.get(job.id)).status == TranslationStatus.FAILED:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await pool.stop()
+
+        failed = await store.get(job.id)
+        assert failed.status == TranslationStatus.FAILED
+        assert failed.error_message == "provider down"
+
+    @pytest.mark.asyncio
+    async def test_reclaimed_job_is_not_overwritten(self):
+        """任务已被其他worker重新领取时，原worker的结果不写回"""
+        store = MemoryJobStore()
+
+        async def handler(job):
+            # 模拟租约过期后其他worker重新领取
+            reclaimed = await store.get(job.id)
+            reclaimed.attempt += 1
+            await store.save(reclaimed)
+            job.status = TranslationStatus.COMPLETED
+
+        pool = JobWorkerPool(
+            store, handler, concurrency={TranslationProvider.GOOGLE: 1},
+            lease_seconds=60, result_ttl=60, poll_interval=0.01
+        )
+        job = make_job()
+        try:
+            await pool.submit(job)
+            for _ in range(100):
+                if (await store.get_run(job.id)).attempt == 2 and not pool._running:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await pool.stop()
+
+        assert await store.get_run(job.id) == (TranslationStatus.IN_PROGRESS, 2, True)
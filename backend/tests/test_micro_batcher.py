@@ -0,0 +1,136 @@
+"""
+跨请求微批处理单元测试
+"""
+import asyncio
+import pytest
+from app.services.micro_batcher import MicroBatcher
+from app.providers.request_scheduler import RequestPriority, current_priority, request_scope
+from app.schemas.translation import TranslationItem, TranslationProvider
+
+
+class RecordingProvider:
+    """记录每次调用的提供商"""
+
+    provider_name = TranslationProvider.MOCK
+
+    def __init__(self, max_batch_size: int = 8, error: Exception = None):
+        self.max_batch_size = max_batch_size
+        self.error = error
+        self.calls = []
+        self.priorities = []
+
+    async def translate_batch(self, texts, source_lang, target_lang, context=None):
+        self.calls.append(list(texts))
+        self.priorities.append(current_priority())
+        await asyncio.sleep(0)
+        if self.error:
+            raise self.error
+        return [
+            TranslationItem(
+                original_text=text, translated_text=f"{target_lang}:{text}",
+                confidence=0.9, provider=self.provider_name
+            )
+            for text in texts
+        ]
+
+
+class TestMicroBatcher:
+    """测试微批处理器"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_small_requests_share_one_call(self):
+        provider = RecordingProvider()
+        batcher = MicroBatcher(window_ms=20)
+
+        results = await asyncio.gather(
+            batcher.translate_batch(provider, ["a", "b"], "en", "zh"),
+            batcher.translate_batch(provider, ["c"], "en", "zh"),
+            batcher.translate_batch(provider, ["d", "e"], "en", "zh")
+        )
+
+        assert provider.calls == [["a", "b", "c", "d", "e"]]
+        assert [[t.translated_text for t in result] for result in results] == [
+            ["zh:a", "zh:b"], ["zh:c"], ["zh:d", "zh:e"]
+        ]
+        assert batcher.get_stats()["requests_per_call"] == 3
+
+    @pytest.mark.asyncio
+    async def test_language_pairs_are_batched_separately(self):
+        provider = RecordingProvider()
+        batcher = MicroBatcher(window_ms=20)
+
+        zh, ja = await asyncio.gather(
+            batcher.translate_batch(provider, ["a"], "en", "zh"),
+            batcher.translate_batch(provider, ["a"], "en", "ja")
+        )
+
+        assert len(provider.calls) == 2
+        assert zh[0].translated_text == "zh:a"
+        assert ja[0].translated_text == "ja:a"
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_sent_without_waiting(self):
+        provider = RecordingProvider(max_batch_size=4)
+        batcher = MicroBatcher(window_ms=10_000)
+
+        results = await asyncio.wait_for(asyncio.gather(
+            batcher.translate_batch(provider, ["a", "b", "c"], "en", "zh"),
+            batcher.translate_batch(provider, ["d"], "en", "zh"),
+            # 前两个请求凑满一批立即发出；达到上限的请求直接调用
+            batcher.translate_batch(provider, ["e", "f", "g", "h"], "en", "zh")
+        ), timeout=1)
+
+        assert sorted(provider.calls) == [["a", "b", "c", "d"], ["e", "f", "g", "h"]]
+        assert [t.original_text for t in results[1]] == ["d"]
+
+    @pytest.mark.asyncio
+    async def test_char_limit_splits_batches(self):
+        provider = RecordingProvider(max_batch_size=100)
+        batcher = MicroBatcher(window_ms=20, max_chars=10)
+
+        await asyncio.gather(
+            batcher.translate_batch(provider, ["aaaaaa"], "en", "zh"),
+            batcher.translate_batch(provider, ["bbbbbb"], "en", "zh")
+        )
+
+        assert provider.calls == [["aaaaaa"], ["bbbbbb"]]
+
+    @pytest.mark.asyncio
+    async def test_provider_error_reaches_every_caller(self):
+        provider = RecordingProvider(error=RuntimeError("quota exceeded"))
+        batcher = MicroBatcher(window_ms=20)
+
+        results = await asyncio.gather(
+            batcher.translate_batch(provider, ["a"], "en", "zh"),
+            batcher.translate_batch(provider, ["b"], "en", "zh"),
+            return_exceptions=True
+        )
+
+        assert len(provider.calls) == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_batch_with_interactive_request_is_interactive(self):
+        provider = RecordingProvider()
+        batcher = MicroBatcher(window_ms=20)
+
+        async def bulk():
+            with request_scope(RequestPriority.BULK):
+                return await batcher.translate_batch(provider, ["a"], "en", "zh")
+
+        await asyncio.gather(bulk(), batcher.translate_batch(provider, ["b"], "en", "zh"))
+        await bulk()
+
+        assert provider.priorities == [RequestPriority.INTERACTIVE, RequestPriority.BULK]
+
+    @pytest.mark.asyncio
+    async def test_disabled_window_calls_provider_directly(self):
+        provider = RecordingProvider()
+        batcher = MicroBatcher(window_ms=0)
+
+        await asyncio.gather(
+            batcher.translate_batch(provider, ["a"], "en", "zh"),
+            batcher.translate_batch(provider, ["b"], "en", "zh")
+        )
+
+        assert provider.calls == [["a"], ["b"]]
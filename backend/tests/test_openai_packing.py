@@ -0,0 +1,154 @@
+"""
+OpenAI打包翻译单元测试
+"""
+import json
+import pytest
+from types import SimpleNamespace
+from app.providers.openai_translator import OpenAITranslateProvider
+from app.services.cost_tracker import CostTracker
+from app.schemas.translation import TranslationProvider
+
+
+class FakeCompletions:
+    """按用户消息返回预设回复的chat.completions"""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.requests = []
+
+    async def create(self, model, messages, max_tokens, temperature):
+        self.requests.append(messages)
+        content = messages[-1]["content"]
+        try:
+            segments = json.loads(content)["segments"]
+        except (ValueError, KeyError, TypeError):
+            segments = None
+        if segments is None:
+            reply = f"single:{content}"
+        else:
+            reply = self.reply(segments)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=reply))],
+            usage=SimpleNamespace(total_tokens=10)
+        )
+
+
+def make_provider(monkeypatch, reply, budget=1500, max_segments=40):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    provider = OpenAITranslateProvider()
+    provider.packing_enabled = True
+    provider.packing_token_budget = budget
+    provider.packing_max_segments = max_segments
+    provider.rate_limiter.requests_per_second = 1000
+    completions = FakeCompletions(reply)
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return provider, completions
+
+
+def translate_all(segments):
+    return json.dumps({"translations": [{"id": s["id"], "text": f"译:{s['text']}"} for s in segments]})
+
+
+class TestOpenAIPacking:
+    """测试OpenAI打包翻译"""
+
+    @pytest.mark.asyncio
+    async def test_segments_share_one_request(self, monkeypatch):
+        provider, completions = make_provider(monkeypatch, translate_all)
+
+        items = await provider.translate_batch(["Hello", "", "World"], "en", "zh")
+
+        assert len(completions.requests) == 1
+        assert [item.translated_text for item in items] == ["译:Hello", "", "译:World"]
+        assert provider.packing_stats["packed_segments"] == 2
+        assert provider.tokens_saved_per_segment > 0
+
+    @pytest.mark.asyncio
+    async def test_token_budget_splits_requests(self, monkeypatch):
+        provider, completions = make_provider(monkeypatch, translate_all, budget=10, max_segments=3)
+
+        texts = ["one two three four five six", "short", "tiny", "a", "b"]
+        items = await provider.translate_batch(texts, "en", "zh")
+
+        # 第一句占满预算单独请求；之后按句段数上限3个一组，剩下的单句不打包
+        assert [item.translated_text for item in items] == [
+            "single:one two three four five six", "译:short", "译:tiny", "译:a", "single:b"
+        ]
+        assert len(completions.requests) == 3
+
+    @pytest.mark.asyncio
+    async def test_only_unparsed_segments_are_resplit(self, monkeypatch):
+        def drop_second(segments):
+            kept = [s for s in segments if s["id"] != 2]
+            return "```json\n" + translate_all(kept) + "\n```"
+
+        provider, completions = make_provider(monkeypatch, drop_second)
+
+        items = await provider.translate_batch(["a", "b", "c"], "en", "zh")
+
+        assert [item.translated_text for item in items] == ["译:a", "single:b", "译:c"]
+        assert len(completions.requests) == 2
+        assert provider.packing_stats["resplit_segments"] == 1
+
+    @pytest.mark.asyncio
+    async def test_items_carry_tokens_saved_by_this_call(self, monkeypatch):
+        provider, completions = make_provider(monkeypatch, translate_all)
+
+        first = await provider.translate_batch(["Hello there", "World"], "en", "zh")
+        saved_first = provider.packing_stats["tokens_saved"]
+        second = await provider.translate_batch(["Good morning", "everyone", "!"], "en", "zh")
+        saved_second = provider.packing_stats["tokens_saved"] - saved_first
+
+        assert saved_first > 0 and saved_second > 0
+        assert sum(item.tokens_saved for item in first) == saved_first
+        assert sum(item.tokens_saved for item in second) == saved_second
+        # 只用于成本记录，不进入缓存和接口输出
+        assert "tokens_saved" not in first[0].model_dump()
+
+    @pytest.mark.asyncio
+    async def test_unparseable_reply_falls_back_to_single_requests(self, monkeypatch):
+        provider, completions = make_provider(monkeypatch, lambda segments: "Sorry, I can't do that.")
+
+        items = await provider.translate_batch(["a", "b"], "en", "zh")
+
+        assert [item.translated_text for item in items] == ["single:a", "single:b"]
+        assert len(completions.requests) == 3
+
+    def test_estimate_cost_without_packing_is_unchanged(self, monkeypatch):
+        provider, _ = make_provider(monkeypatch, translate_all)
+        provider.packing_enabled = False
+        texts = ["Hello", "World!"]
+
+        input_tokens = 11 / provider.avg_chars_per_token
+        expected = (input_tokens * 2.2 + 200) * 2 / 1000 * provider.cost_per_1k_tokens
+        assert provider.estimate_cost(texts) == pytest.approx(expected)
+
+        provider.packing_enabled = True
+        assert provider.estimate_cost(texts) < expected
+
+    def test_parse_packed_response_variants(self):
+        parse = OpenAITranslateProvider._parse_packed_response
+
+        assert parse('{"1": "甲", "2": "乙"}', 2) == {0: "甲", 1: "乙"}
+        assert parse('Here you go: [{"id": 2, "text": "乙"}, {"id": 9, "text": "越界"}]', 2) == {1: "乙"}
+        # 重复编号和空译文视为解析失败
+        assert parse('{"translations": [{"id": 1, "text": "甲"}, {"id": 1, "text": "丙"}, {"id": 2, "text": " "}]}', 2) == {}
+        assert parse("not json", 2) == {}
+
+
+class TestPackingCostRecords:
+    """测试成本记录中的打包节省"""
+
+    @pytest.mark.asyncio
+    async def test_tokens_saved_recorded_per_segment(self):
+        tracker = CostTracker()
+
+        await tracker.track_translation_usage(
+            TranslationProvider.OPENAI, 10, 400, tokens_saved=755
+        )
+        stats = await tracker.get_usage_stats(days=1)
+
+        record = tracker.usage_records[-1]
+        assert record.tokens_saved_per_segment == 75.5
+        assert record.tokens_saved == 755
+        assert stats["provider_stats"]["openai"]["tokens_saved"] == 755
@@ -0,0 +1,260 @@
+"""
+提供商容错单元测试
+"""
+import asyncio
+import pytest
+from unittest.mock import patch
+from app.services.micro_batcher import MicroBatcher
+from app.services.provider_resilience import (
+    CircuitBreaker, CircuitState, ResilientTranslator, parse_provider_chain
+)
+from app.providers.base_provider import TranslationError
+from app.schemas.translation import TranslationItem, TranslationProvider
+
+
+class FaultyProvider:
+    """可注入故障的提供商：抛出异常、返回失败占位结果、只返回前 limit 条结果或延迟返回"""
+
+    def __init__(self, provider: TranslationProvider, error: Exception = None,
+                 failed_texts=(), delay: float = 0.0, limit: int = None):
+        self.provider_name = provider
+        self.error = error
+        self.failed_texts = set(failed_texts)
+        self.delay = delay
+        self.limit = limit
+        self.calls = []
+        self.cancelled = 0
+
+    async def translate_batch(self, texts, source_lang, target_lang, context=None):
+        self.calls.append(list(texts))
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error:
+            raise self.error
+        return [
+            TranslationItem(
+                original_text=text,
+                translated_text=f"[翻译失败: timeout]" if text in self.failed_texts else f"{self.provider_name.value}:{text}",
+                confidence=0.0 if text in self.failed_texts else 0.9,
+                provider=self.provider_name
+            )
+            for text in texts
+        ][:self.limit]
+
+
+def resilient(providers, **kwargs):
+    """使用给定提供商的容错调用（不合并请求）"""
+    translator = ResilientTranslator(
+        MicroBatcher(window_ms=0),
+        fallback_chain=kwargs.pop("fallback_chain", [TranslationProvider.GOOGLE, TranslationProvider.OPENAI]),
+        **kwargs
+    )
+
+    def get_provider(provider):
+        if provider not in providers:
+            raise ValueError(f"Unsupported provider: {provider}")
+        return providers[provider]
+
+    return translator, patch(
+        'app.providers.provider_factory.provider_factory.get_provider', side_effect=get_provider
+    )
+
+
+class TestCircuitBreaker:
+    """测试熔断器"""
+
+    def test_opens_on_failure_rate_and_recovers_after_trial(self):
+        breaker = CircuitBreaker(failure_rate=0.5, window_size=4, min_calls=4, open_seconds=0)
+        for success in (True, False, True, False):
+            assert breaker.allow_request()
+            breaker.record(success, 0.1)
+        assert breaker.state == CircuitState.OPEN
+
+        # 熔断到期后只放行一次试探调用
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+        breaker.record(True, 0.1)
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_opens_on_slow_calls(self):
+        breaker = CircuitBreaker(slow_call_seconds=1, slow_call_rate=0.5, window_size=4, min_calls=4,
+                                 open_seconds=60)
+        for duration in (2, 0.1, 2, 0.1):
+            breaker.record(True, duration)
+        assert breaker.state == CircuitState.OPEN
+        assert not breaker.allow_request()
+
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker(window_size=2, min_calls=2, open_seconds=0)
+        breaker.record(False, 0.1)
+        breaker.record(False, 0.1)
+        assert breaker.allow_request()
+        breaker.record(False, 0.1)
+        assert breaker.state == CircuitState.OPEN
+
+    def test_latency_p95_needs_enough_samples(self):
+        breaker = CircuitBreaker(window_size=20, min_calls=5)
+        for duration in (0.1, 0.2, 0.3, 0.4):
+            breaker.record(True, duration)
+        assert breaker.latency_p95() is None
+        breaker.record(True, 1.0)
+        assert breaker.latency_p95() == 1.0
+
+
+class TestResilientTranslator:
+    """测试备用提供商链和对冲请求"""
+
+    @pytest.mark.asyncio
+    async def test_falls_back_when_primary_raises(self):
+        google = FaultyProvider(TranslationProvider.GOOGLE, error=TranslationError("quota exceeded", "google"))
+        openai = FaultyProvider(TranslationProvider.OPENAI)
+        translator, patched = resilient({TranslationProvider.GOOGLE: google, TranslationProvider.OPENAI: openai})
+
+        with patched:
+            items, answered_by = await translator.translate_batch(TranslationProvider.GOOGLE, ["a", "b"], "en", "zh")
+
+        assert [item.translated_text for item in items] == ["openai:a", "openai:b"]
+        assert answered_by == [TranslationProvider.OPENAI, TranslationProvider.OPENAI]
+        assert translator.get_stats()["fallbacks"] == 1
+
+    @pytest.mark.asyncio
+    async def test_only_failed_items_are_retried(self):
+        google = FaultyProvider(TranslationProvider.GOOGLE, failed_texts={"b"})
+        openai = FaultyProvider(TranslationProvider.OPENAI)
+        translator, patched = resilient({TranslationProvider.GOOGLE: google, TranslationProvider.OPENAI: openai})
+
+        with patched:
+            items, answered_by = await translator.translate_batch(
+                TranslationProvider.GOOGLE, ["a", "b", "c"], "en", "zh"
+            )
+
+        assert openai.calls == [["b"]]
+        assert [item.translated_text for item in items] == ["google:a", "openai:b", "google:c"]
+        assert answered_by == [TranslationProvider.GOOGLE, TranslationProvider.OPENAI, TranslationProvider.GOOGLE]
+
+    @pytest.mark.asyncio
+    async def test_missing_items_are_retried_as_failed(self):
+        """提供商返回的结果少于句段数时，缺少的句段交给备用提供商，都没有结果时为失败结果"""
+        google = FaultyProvider(TranslationProvider.GOOGLE, limit=1)
+        openai = FaultyProvider(TranslationProvider.OPENAI, limit=1)
+        translator, patched = resilient({TranslationProvider.GOOGLE: google, TranslationProvider.OPENAI: openai})
+
+        with patched:
+            items, answered_by = await translator.translate_batch(
+                TranslationProvider.GOOGLE, ["a", "b", "c"], "en", "zh"
+            )
+
+        assert openai.calls == [["b", "c"]]
+        assert [item.translated_text for item in items][:2] == ["google:a", "openai:b"]
+        assert items[2].confidence == 0.0
+        assert answered_by == [TranslationProvider.GOOGLE, TranslationProvider.OPENAI, TranslationProvider.OPENAI]
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_skips_provider(self):
+        google = FaultyProvider(TranslationProvider.GOOGLE, error=RuntimeError("503"))
+        openai = FaultyProvider(TranslationProvider.OPENAI)
+        translator, patched = resilient({TranslationProvider.GOOGLE: google, TranslationProvider.OPENAI: openai})
+        translator.breakers[TranslationProvider.GOOGLE] = CircuitBreaker(
+            window_size=3, min_calls=3, open_seconds=60
+        )
+
+        with patched:
+            for _ in range(5):
+                await translator.translate_batch(TranslationProvider.GOOGLE, ["a"], "en", "zh")
+
+        # 连续3次失败后熔断，之后的请求直接使用备用提供商
+        assert len(google.calls) == 3
+        assert len(openai.calls) == 5
+        assert translator.get_stats()["breakers"]["google"]["state"] == "open"
+
+    @pytest.mark.asyncio
+    async def test_unconfigured_fallback_is_skipped(self):
+        google = FaultyProvider(TranslationProvider.GOOGLE, error=RuntimeError("503"))
+        translator, patched = resilient({TranslationProvider.GOOGLE: google})
+
+        with patched, pytest.raises(RuntimeError, match="503"):
+            await translator.translate_batch(TranslationProvider.GOOGLE, ["a"], "en", "zh")
+
+    @pytest.mark.asyncio
+    async def test_all_circuits_open_raises(self):
+        google = FaultyProvider(TranslationProvider.GOOGLE)
+        translator, patched = resilient({TranslationProvider.GOOGLE: google}, fallback_chain=[])
+        breaker = translator.breaker(TranslationProvider.GOOGLE)
+        breaker.open_seconds = 60
+        breaker._open()
+
+        with patched, pytest.raises(TranslationError):
+            await translator.translate_batch(TranslationProvider.GOOGLE, ["a"], "en", "zh")
+        assert google.calls == []
+
+    @pytest.mark.asyncio
+    async def test_hedged_request_wins_when_primary_is_slow(self):
+        google = FaultyProvider(TranslationProvider.GOOGLE)
+        openai = FaultyProvider(TranslationProvider.OPENAI)
+        translator, patched = resilient(
+            {TranslationProvider.GOOGLE: google, TranslationProvider.OPENAI: openai},
+            hedging=True, hedge_min_delay=0.01
+        )
+        breaker = translator.breaker(TranslationProvider.GOOGLE)
+        for _ in range(breaker.min_calls):
+            breaker.record(True, 0.01)
+
+        google.delay = 1.0
+        with patched:
+            items, answered_by = await asyncio.wait_for(
+                translator.translate_batch(TranslationProvider.GOOGLE, ["a"], "en", "zh"), timeout=0.5
+            )
+
+        assert items[0].translated_text == "openai:a"
+        assert answered_by == [TranslationProvider.OPENAI]
+        assert translator.get_stats()["hedge_wins"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_cancels_hedged_request(self):
+        """调用方在等待对冲时机时被取消，首选提供商的请求随之取消"""
+        google = FaultyProvider(TranslationProvider.GOOGLE, delay=1.0)
+        openai = FaultyProvider(TranslationProvider.OPENAI)
+        translator, patched = resilient(
+            {TranslationProvider.GOOGLE: google, TranslationProvider.OPENAI: openai},
+            hedging=True, hedge_min_delay=0.5
+        )
+        breaker = translator.breaker(TranslationProvider.GOOGLE)
+        for _ in range(breaker.min_calls):
+            breaker.record(True, 0.01)
+
+        with patched:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    translator.translate_batch(TranslationProvider.GOOGLE, ["a"], "en", "zh"),
+                    timeout=0.05
+                )
+            await asyncio.sleep(0)
+
+        assert google.cancelled == 1
+        assert openai.calls == []
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_without_latency_samples(self):
+        google = FaultyProvider(TranslationProvider.GOOGLE, delay=0.05)
+        openai = FaultyProvider(TranslationProvider.OPENAI)
+        translator, patched = resilient(
+            {TranslationProvider.GOOGLE: google, TranslationProvider.OPENAI: openai},
+            hedging=True, hedge_min_delay=0.01
+        )
+
+        with patched:
+            items, _ = await translator.translate_batch(TranslationProvider.GOOGLE, ["a"], "en", "zh")
+
+        assert items[0].translated_text == "google:a"
+        assert openai.calls == []
+
+    def test_parse_provider_chain(self):
+        assert parse_provider_chain("google, OpenAI,google") == [
+            TranslationProvider.GOOGLE, TranslationProvider.OPENAI
+        ]
+        assert parse_provider_chain("") == []
+        with pytest.raises(ValueError):
+            parse_provider_chain("deepl")
@@ -0,0 +1,110 @@
+"""
+提供商请求调度单元测试
+"""
+import asyncio
+import time
+import pytest
+from app.providers.request_scheduler import (
+    RateLimiter, RequestPriority, current_priority, parse_tenant_weights, request_scope
+)
+
+
+async def acquire_all(limiter, requests, order):
+    """依次提交 (名称, 优先级, 租户) 请求，记录获得许可的顺序"""
+    async def acquire(name, priority, tenant):
+        await limiter.acquire(priority, tenant)
+        order.append(name)
+
+    tasks = []
+    for name, priority, tenant in requests:
+        tasks.append(asyncio.create_task(acquire(name, priority, tenant)))
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+
+
+class TestRateLimiter:
+    """测试按优先级调度的速率限制器"""
+
+    @pytest.mark.asyncio
+    async def test_interactive_served_before_waiting_bulk(self):
+        limiter = RateLimiter(requests_per_second=100, interactive_reserve=0, tenant_weights={})
+        order = []
+        requests = [("bulk-0", RequestPriority.BULK, "a")]
+        requests += [(f"bulk-{i}", RequestPriority.BULK, "a") for i in range(1, 5)]
+        requests += [("interactive", RequestPriority.INTERACTIVE, "b")]
+
+        await acquire_all(limiter, requests, order)
+
+        # 第一个批量请求直接放行，之后到达的交互式请求排在等待中的批量请求之前
+        assert order[:2] == ["bulk-0", "interactive"]
+        assert limiter.get_stats()["granted"] == {"interactive": 1, "bulk": 5}
+
+    @pytest.mark.asyncio
+    async def test_weighted_fair_queuing_between_tenants(self):
+        limiter = RateLimiter(requests_per_second=200, interactive_reserve=0, tenant_weights={"b": 2})
+        order = []
+        requests = [(f"a-{i}", RequestPriority.BULK, "a") for i in range(6)]
+        requests += [(f"b-{i}", RequestPriority.BULK, "b") for i in range(6)]
+
+        await acquire_all(limiter, requests, order)
+
+        # a 先提交了全部请求，b 后到但权重为2，两者交替获得许可而不是等 a 全部完成
+        first_six = order[:6]
+        assert sum(name.startswith("b") for name in first_six) >= 3
+        assert order.index("b-0") < order.index("a-3")
+
+    @pytest.mark.asyncio
+    async def test_bulk_rate_leaves_reserve_for_interactive(self):
+        limiter = RateLimiter(requests_per_second=100, interactive_reserve=0.5, tenant_weights={})
+        start = time.monotonic()
+        for _ in range(5):
+            await limiter.acquire(RequestPriority.BULK)
+        bulk_elapsed = time.monotonic() - start
+
+        limiter = RateLimiter(requests_per_second=100, interactive_reserve=0.5, tenant_weights={})
+        start = time.monotonic()
+        for _ in range(5):
+            await limiter.acquire(RequestPriority.INTERACTIVE)
+        interactive_elapsed = time.monotonic() - start
+
+        # 批量请求只能使用一半速率（间隔20ms），交互式请求使用全部速率（间隔10ms）
+        assert bulk_elapsed >= 0.075
+        assert interactive_elapsed < bulk_elapsed
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_is_skipped(self):
+        limiter = RateLimiter(requests_per_second=50, interactive_reserve=0, tenant_weights={})
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+
+        await asyncio.wait_for(limiter.acquire(), timeout=1)
+        assert limiter.get_stats()["granted"]["interactive"] == 2
+
+
+class TestRequestScope:
+    """测试请求上下文"""
+
+    def test_scope_sets_and_restores_priority(self):
+        assert current_priority() is None
+        with request_scope(RequestPriority.BULK, tenant="project-1"):
+            assert current_priority() == RequestPriority.BULK
+            with request_scope(tenant="project-2"):
+                assert current_priority() == RequestPriority.BULK
+            with request_scope(RequestPriority.INTERACTIVE):
+                assert current_priority() == RequestPriority.INTERACTIVE
+        assert current_priority() is None
+
+    @pytest.mark.asyncio
+    async def test_acquire_uses_scope(self):
+        limiter = RateLimiter(requests_per_second=1000, interactive_reserve=0, tenant_weights={})
+        with request_scope(RequestPriority.BULK):
+            await limiter.acquire()
+        assert limiter.get_stats()["granted"]["bulk"] == 1
+
+    def test_parse_tenant_weights(self):
+        assert parse_tenant_weights("a=3, b=0.5") == {"a": 3.0, "b": 0.5}
+        assert parse_tenant_weights("") == {}
+        with pytest.raises(ValueError):
+            parse_tenant_weights("a=0")
@@ -0,0 +1,60 @@
+"""
+服务容器单元测试
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api import document
+from app.services.cache_backends import SQLiteCacheBackend
+from app.services.container import ServiceContainer, get_document_processor
+
+
+class TestServiceContainer:
+    """测试进程内共享的服务容器"""
+
+    def test_services_are_shared(self):
+        container = ServiceContainer()
+
+        engine = container.translation_engine
+
+        assert container.translation_engine is engine
+        assert container.document_processor.translation_engine is engine
+        assert container.document_processor.executor is container.executor
+
+    @pytest.mark.asyncio
+    async def test_startup_and_shutdown(self):
+        container = ServiceContainer()
+
+        await container.startup()
+        engine = container.translation_engine
+        assert engine.job_workers.started
+        assert container._document_processor is not None
+        with patch.object(engine.cache, "aclose", AsyncMock()) as close_cache:
+            await container.shutdown()
+
+        close_cache.assert_awaited_once()
+        assert container.translation_engine is not engine
+        await container.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_shutdown_closes_l2_cache(self, tmp_path):
+        container = ServiceContainer()
+        backend = SQLiteCacheBackend(path=str(tmp_path / "cache.db"))
+        container.translation_engine.cache._shared = backend
+
+        await container.shutdown()
+
+        assert backend._executor._shutdown
+
+    def test_document_router_uses_injected_processor(self):
+        processor = MagicMock()
+        processor.get_supported_formats.return_value = {".txt": "纯文本"}
+        app = FastAPI()
+        app.include_router(document.router)
+        app.dependency_overrides[get_document_processor] = lambda: processor
+
+        response = TestClient(app).get("/document/formats/supported")
+
+        assert response.status_code == 200
+        assert response.json()["formats"] == {".txt": "纯文本"}
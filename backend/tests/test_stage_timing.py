@@ -0,0 +1,55 @@
+"""
+分阶段计时单元测试
+"""
+import time
+from app.services.stage_timing import StageLatencyHistograms, StageTimer, stage_timing, timed_stage
+
+
+class TestStageTimer:
+    """测试分阶段计时器"""
+
+    def test_stages_accumulate_and_total(self):
+        timer = StageTimer()
+        with stage_timing(timer):
+            with timed_stage("provider"):
+                time.sleep(0.01)
+            with timed_stage("provider"):
+                time.sleep(0.01)
+            with timed_stage("quality"):
+                pass
+
+        timings = timer.as_milliseconds()
+        assert timings["provider"] >= 20
+        assert set(timings) == {"provider", "quality", "total"}
+        assert timings["total"] >= timings["provider"] + timings["quality"]
+
+    def test_timed_stage_without_timer_is_noop(self):
+        with timed_stage("provider"):
+            pass
+
+    def test_server_timing_header(self):
+        timer = StageTimer()
+        timer.durations = {"preprocess": 0.0012, "provider": 0.5}
+
+        header = timer.server_timing_header()
+
+        assert header.startswith("preprocess;dur=1.2, provider;dur=500.0, total;dur=")
+
+
+class TestStageLatencyHistograms:
+    """测试按阶段的延迟直方图"""
+
+    def test_percentiles_use_bucket_bounds(self):
+        histograms = StageLatencyHistograms()
+        for milliseconds in [3] * 90 + [40] * 9 + [20000]:
+            timer = StageTimer()
+            timer.durations = {"provider": milliseconds / 1000}
+            histograms.record(timer)
+
+        stats = histograms.get_stats()["provider"]
+        assert stats["count"] == 100
+        assert stats["p50_ms"] == 5
+        assert stats["p95_ms"] == 50
+        assert stats["p99_ms"] == 50
+        assert stats["buckets"]["le_30000"] == 1
+        assert "total" in histograms.get_stats()
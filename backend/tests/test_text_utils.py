@@ -7,7 +7,11 @@ from app.utils.text_utils import (
     detect_text_issues,
     detect_chapters,
     standardize_format,
-    should_merge_with_next
+    should_merge_with_next,
+    split_sentences,
+    join_sentences,
+    normalize_text,
+    NormalizedText
 )
 
 
@@ -158,3 +162,67 @@ class TestStandardizeFormat:
         # 短行应该被合并
         assert len(result) == 1
         assert "短 这是一个较长的行内容" in result[0]
+
+
+
+class TestSplitSentences:
+    """测试句子切分"""
+    
+    def test_split_english(self):
+        """测试英文句子切分，缩写处不断句"""
+        text = "Hello world. This is Mr. Smith! Is it e.g. fine? Yes."
+        
+        segments = split_sentences(text)
+        
+        assert [sentence for sentence, _ in segments] == [
+            "Hello world.", "This is Mr. Smith!", "Is it e.g. fine?", "Yes."
+        ]
+    
+    def test_split_chinese(self):
+        """测试中文句子切分"""
+        segments = split_sentences("你好。今天天气很好！我们去公园吧？好的")
+        
+        assert [sentence for sentence, _ in segments] == ["你好。", "今天天气很好！", "我们去公园吧？", "好的"]
+    
+    def test_split_keeps_decimals_and_newlines(self):
+        """测试小数点不断句，换行总是断句"""
+        segments = split_sentences("Version 1.5 is out\n\nLine two. Next")
+        
+        assert segments == [("Version 1.5 is out", "\n\n"), ("Line two.", " "), ("Next", "")]
+    
+    def test_join_restores_text(self):
+        """测试切分后按分隔符拼接可还原原文"""
+        text = 'He said "Stop." Then left.\n第二段。结束！'
+        segments = split_sentences(text)
+        
+        result = join_sentences([s for s, _ in segments], [sep for _, sep in segments])
+        
+        assert result == text
+    
+    def test_join_chinese_target_drops_spaces(self):
+        """测试目标语言为中文时去掉句间空格，保留换行"""
+        result = join_sentences(["你好。", "再见。", "第二段。"], [" ", "\n", ""], "zh")
+        
+        assert result == "你好。再见。\n第二段。"
+
+
+class TestNormalizeText:
+    """测试待翻译文本规范化"""
+    
+    def test_collapses_whitespace_and_strips(self):
+        """测试连续空白和换行折叠为一个空格"""
+        assert normalize_text("  Hello \t\n  world  ") == "Hello world"
+        assert normalize_text("   ") == ""
+        assert normalize_text("") == ""
+    
+    def test_removes_control_characters(self):
+        """测试去除控制字符，控制字符两侧的空白只保留一个"""
+        assert normalize_text("a \x00 b\x1b[0m") == "a b[0m"
+        assert normalize_text("\x07你好\x08") == "你好"
+    
+    def test_normalized_text_is_returned_as_is(self):
+        """测试已规范化的文本不再重复处理"""
+        text = normalize_text(" Hello  world ")
+        
+        assert isinstance(text, NormalizedText)
+        assert normalize_text(text) is text
@@ -0,0 +1,806 @@
+"""
+翻译缓存单元测试
+"""
+import io
+import json
+import threading
+import time
+import pytest
+from datetime import datetime, timedelta
+from app.services.cache_admission import CountMinSketch, TinyLFUAdmission
+from app.services.cache_backends import MemoryCacheBackend, SQLiteCacheBackend
+from app.services.cache_import import CacheImporter, ImportRecord, iter_json_export
+from app.services.translation_cache import TranslationCache, CACHE_KEY_PREFIX
+from app.services.translation_memory import FuzzyTranslationMemory, patch_translation
+from app.schemas.translation import TranslationCache as CacheModel, TranslationItem, TranslationProvider
+from app.utils.text_utils import normalize_text
+
+
+def make_item(text: str, translated: str = "译文") -> TranslationItem:
+    return TranslationItem(
+        original_text=text,
+        translated_text=translated,
+        confidence=0.9,
+        provider=TranslationProvider.GOOGLE,
+        quality_score=0.8
+    )
+
+
+class TestMemoryCacheBackend:
+    """测试内存缓存后端"""
+
+    def test_lru_eviction_order(self):
+        """测试超出容量时淘汰最久未使用的项"""
+        backend = MemoryCacheBackend(max_size=3)
+        backend.set("a", 1)
+        backend.set("b", 2)
+        backend.set("c", 3)
+
+        # 访问a使其成为最近使用
+        assert backend.get("a") == 1
+        backend.set("d", 4)
+
+        assert "b" not in backend
+        assert backend.keys() == ["c", "a", "d"]
+        assert backend.evictions == 1
+
+    def test_overwrite_keeps_single_entry(self):
+        """测试覆盖写入不会产生重复项"""
+        backend = MemoryCacheBackend(max_size=2)
+        backend.set("a", 1)
+        backend.set("a", 2)
+        backend.set("b", 3)
+
+        assert len(backend) == 2
+        assert backend.get("a") == 2
+
+    def test_lazy_expiry_on_get(self):
+        """测试读取时惰性删除过期项"""
+        backend = MemoryCacheBackend(ttl_seconds=10)
+        backend.set("a", 1, now=100.0)
+
+        assert backend.get("a", now=105.0) == 1
+        assert backend.get("a", now=111.0) is None
+        assert "a" not in backend
+
+    def test_purge_expired_ignores_overwritten_records(self):
+        """测试覆盖写入后旧的过期记录不会误删新值"""
+        backend = MemoryCacheBackend(ttl_seconds=10)
+        backend.set("a", 1, now=100.0)
+        backend.set("a", 2, now=108.0)
+
+        assert backend.purge_expired(now=112.0) == 0
+        assert backend.get("a", now=112.0) == 2
+        assert backend.purge_expired(now=120.0) == 1
+        assert len(backend) == 0
+
+    def test_on_remove_callback(self):
+        """测试淘汰、过期和删除时回调on_remove"""
+        removed = []
+        backend = MemoryCacheBackend(
+            max_size=2, ttl_seconds=10, on_remove=lambda key, value: removed.append(key)
+        )
+        backend.set("a", 1, now=100.0)
+        backend.set("b", 2, now=100.0)
+        backend.set("c", 3, now=100.0)
+        backend.delete("b")
+        backend.get("c", now=200.0)
+
+        assert removed == ["a", "b", "c"]
+
+    def test_on_add_and_overwrite_callbacks(self):
+        """测试写入回调on_add，覆盖写入时先对旧值回调on_remove"""
+        events = []
+        backend = MemoryCacheBackend(
+            on_add=lambda key, value: events.append(("add", value)),
+            on_remove=lambda key, value: events.append(("remove", value))
+        )
+        backend.set("a", 1)
+        backend.set("a", 2)
+
+        assert events == [("add", 1), ("remove", 1), ("add", 2)]
+
+    def test_writes_purge_expired_in_batches(self):
+        """测试写入时分批清理过期项"""
+        backend = MemoryCacheBackend(ttl_seconds=10, expire_batch_size=2)
+        for i in range(5):
+            backend.set(f"k{i}", i, now=100.0)
+
+        backend.set("new", 0, now=200.0)
+        # 单次写入最多清理2个过期项
+        assert len(backend) == 4
+
+        backend.set("new2", 0, now=200.0)
+        backend.set("new3", 0, now=200.0)
+        assert sorted(backend.keys()) == ["new", "new2", "new3"]
+
+
+class TestTinyLFUAdmission:
+    """测试W-TinyLFU准入策略"""
+
+    def test_count_min_sketch_estimates_and_ages(self):
+        """测试频率估计，以及达到采样数后计数减半"""
+        sketch = CountMinSketch(width=64, sample_size=100)
+        for _ in range(6):
+            sketch.increment("hot")
+        sketch.increment("cold")
+
+        assert sketch.estimate("hot") >= 6
+        assert sketch.estimate("cold") >= 1
+        assert sketch.estimate("hot") > sketch.estimate("cold")
+
+        for i in range(100):
+            sketch.increment(f"noise-{i}")
+        assert sketch.estimate("hot") <= 4
+
+    def test_one_off_keys_do_not_evict_hot_keys(self):
+        """测试只出现一次的键无法挤掉频繁访问的键"""
+        # sketch取较大宽度，避免哈希冲突让测试结果依赖哈希种子
+        admission = TinyLFUAdmission(capacity=4096, window_ratio=0.1)
+        backend = MemoryCacheBackend(max_size=10, admission=admission)
+        # 8个热点键都能进入容量为9的主缓存
+        hot_keys = [f"hot-{i}" for i in range(8)]
+        for key in hot_keys:
+            backend.set(key, key)
+        for _ in range(3):
+            for key in hot_keys:
+                backend.get(key)
+
+        for i in range(50):
+            if backend.get(f"scan-{i}") is None:
+                backend.set(f"scan-{i}", i)
+
+        assert all(key in backend for key in hot_keys)
+        assert len(backend) == 10
+        assert backend.admission.rejected > 0
+
+    def test_frequent_new_key_is_admitted(self):
+        """测试新键访问频率超过淘汰候选时进入主缓存"""
+        backend = MemoryCacheBackend(max_size=3, admission=TinyLFUAdmission(capacity=3, window_ratio=0.34))
+        for key in ("a", "b", "c"):
+            backend.set(key, key)
+        for _ in range(3):
+            backend.get("d")
+        backend.set("d", "d")
+        backend.set("e", "e")
+
+        assert "d" in backend
+        assert len(backend) == 3
+
+
+class TestTranslationCache:
+    """测试翻译缓存"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.cache = TranslationCache()
+
+    @pytest.mark.asyncio
+    async def test_cache_and_get(self):
+        """测试缓存写入和读取"""
+        await self.cache.cache_translations([make_item("Hello", "你好")], "en", "zh")
+
+        cached = await self.cache.get_cached_translation(
+            "Hello", "en", "zh", TranslationProvider.GOOGLE
+        )
+
+        assert cached is not None
+        assert cached.translated_text == "你好"
+
+    @pytest.mark.asyncio
+    async def test_max_cache_size_evicts_lru(self):
+        """测试缓存容量限制"""
+        self.cache.max_cache_size = 2
+        await self.cache.cache_translations([make_item("one"), make_item("two")], "en", "zh")
+
+        # 访问one，使two成为最久未使用
+        await self.cache.get_cached_translation("one", "en", "zh", TranslationProvider.GOOGLE)
+        await self.cache.cache_translations([make_item("three")], "en", "zh")
+
+        assert len(self.cache._cache) == 2
+        assert await self.cache.get_cached_translation(
+            "two", "en", "zh", TranslationProvider.GOOGLE
+        ) is None
+
+    @pytest.mark.asyncio
+    async def test_language_pair_is_part_of_key(self):
+        """测试缓存按真实语言对存储，非en->zh的语言对也能命中"""
+        await self.cache.cache_translations([make_item("Hello", "こんにちは")], "en", "ja")
+
+        hit = await self.cache.get_cached_translation("Hello", "en", "ja", TranslationProvider.GOOGLE)
+        miss = await self.cache.get_cached_translation("Hello", "en", "zh", TranslationProvider.GOOGLE)
+
+        assert hit.translated_text == "こんにちは"
+        assert miss is None
+
+    @pytest.mark.asyncio
+    async def test_model_is_part_of_key(self):
+        """测试模型不同的翻译互不命中"""
+        await self.cache.cache_translations([make_item("Hello", "你好")], "en", "zh", model="gpt-4")
+
+        assert await self.cache.get_cached_translation(
+            "Hello", "en", "zh", TranslationProvider.GOOGLE, model="gpt-4"
+        ) is not None
+        assert await self.cache.get_cached_translation(
+            "Hello", "en", "zh", TranslationProvider.GOOGLE, model="gpt-3.5-turbo"
+        ) is None
+
+    def test_cache_key_is_versioned(self):
+        """测试缓存键带版本前缀且对空白规范化"""
+        key = self.cache._generate_cache_key("Hello   world", "en", "zh", TranslationProvider.GOOGLE)
+
+        assert key.startswith(CACHE_KEY_PREFIX)
+        assert len(key) == len(CACHE_KEY_PREFIX) + 32
+        assert key == self.cache._generate_cache_key("Hello world", "en", "zh", TranslationProvider.GOOGLE)
+
+    def test_cache_key_reused_for_normalized_text(self):
+        """测试已规范化的文本复用记在实例上的缓存键，且与原始文本的键一致"""
+        text = normalize_text(" Hello \x00 world ")
+        key = self.cache._generate_cache_key(text, "en", "zh", TranslationProvider.GOOGLE)
+
+        assert text.cache_keys == {("en", "zh", TranslationProvider.GOOGLE, None): key}
+        assert self.cache.cache_key(text, "en", "zh", TranslationProvider.GOOGLE) == key
+        assert key == self.cache._generate_cache_key("Hello world", "en", "zh", TranslationProvider.GOOGLE)
+        assert key != self.cache._generate_cache_key(text, "en", "ja", TranslationProvider.GOOGLE)
+
+    @pytest.mark.asyncio
+    async def test_migrate_cache_keys(self):
+        """测试旧版本缓存键迁移：带版本的重算键，无版本的v1数据丢弃"""
+        await self.cache.cache_translations([make_item("Hello", "你好")], "en", "fr")
+        key = self.cache._generate_cache_key("Hello", "en", "fr", TranslationProvider.GOOGLE)
+        entry = self.cache._cache.peek(key)
+        self.cache._cache.delete(key)
+        self.cache._cache.set("v1:oldformat", entry)
+        self.cache._cache.set("0" * 64, entry.copy())
+
+        result = await self.cache.migrate_cache_keys()
+
+        assert result == {"migrated": 1, "dropped": 1}
+        assert self.cache._cache.keys() == [key]
+
+    @pytest.mark.asyncio
+    async def test_get_cached_translations_many(self):
+        """测试批量查询返回命中项和未命中下标"""
+        await self.cache.cache_translations(
+            [make_item("Hello", "你好"), make_item("World", "世界")], "en", "zh"
+        )
+
+        hits, miss_indices = await self.cache.get_cached_translations_many(
+            ["World", "Missing", "Hello"], "en", "zh", TranslationProvider.GOOGLE
+        )
+
+        assert set(hits) == {0, 2}
+        assert hits[0].translated_text == "世界"
+        assert hits[2].translated_text == "你好"
+        assert miss_indices == [1]
+        assert self.cache.l1_hits == 2
+        assert self.cache.misses == 1
+
+    @pytest.mark.asyncio
+    async def test_search_cache_ranks_before_limit(self):
+        """测试搜索结果先按质量排序再截断"""
+        items = []
+        for i, quality in enumerate([0.65, 0.7, 0.95, 0.9]):
+            item = make_item(f"server error {i}", f"服务器错误{i}")
+            item.quality_score = quality
+            items.append(item)
+        await self.cache.cache_translations(items, "en", "zh")
+        await self.cache.cache_translations([make_item("unrelated text")], "en", "zh")
+
+        results = await self.cache.search_cache("Server ERROR", limit=2)
+
+        assert [r.quality_score for r in results] == [0.95, 0.9]
+
+    @pytest.mark.asyncio
+    async def test_search_cache_cjk_and_filters(self):
+        """测试中文按二元组检索，并按语言对和提供商过滤"""
+        await self.cache.cache_translations([make_item("Hello world", "你好世界")], "en", "zh")
+        await self.cache.cache_translations([make_item("Hello world", "こんにちは世界")], "en", "ja")
+
+        assert len(await self.cache.search_cache("世界")) == 2
+        assert len(await self.cache.search_cache("好世")) == 1
+        assert len(await self.cache.search_cache("hello", target_lang="ja")) == 1
+        assert await self.cache.search_cache("hello", provider=TranslationProvider.OPENAI) == []
+
+    @pytest.mark.asyncio
+    async def test_search_index_follows_eviction(self):
+        """测试LRU淘汰的缓存项从索引中移除"""
+        self.cache.max_cache_size = 1
+        await self.cache.cache_translations([make_item("first entry")], "en", "zh")
+        await self.cache.cache_translations([make_item("second entry")], "en", "zh")
+
+        assert await self.cache.search_cache("first") == []
+        assert len(await self.cache.search_cache("entry")) == 1
+        assert len(self.cache._search_index) == 1
+
+    @pytest.mark.asyncio
+    async def test_get_fuzzy_translation_patches_numbers(self):
+        """测试缓存未命中时从模糊翻译记忆复用并修补译文"""
+        await self.cache.cache_translations(
+            [make_item("Chapter 3 has 12 pages in total.", "第3章共有12页。")], "en", "zh"
+        )
+
+        item = self.cache.get_fuzzy_translation(
+            "Chapter 4 has 15 pages in total.", "en", "zh", TranslationProvider.GOOGLE
+        )
+
+        assert item.translated_text == "第4章共有15页。"
+        assert item.original_text == "Chapter 4 has 15 pages in total."
+        assert self.cache.get_fuzzy_translation(
+            "Chapter 4 has 15 pages in total.", "en", "zh", TranslationProvider.OPENAI
+        ) is None
+
+    @pytest.mark.asyncio
+    async def test_fuzzy_translation_is_partitioned_by_model(self):
+        """测试模糊翻译记忆只复用同一模型的译文"""
+        await self.cache.cache_translations(
+            [make_item("Chapter 3 has 12 pages in total.", "第3章共有12页。")], "en", "zh", "model-a"
+        )
+
+        item = self.cache.get_fuzzy_translation(
+            "Chapter 4 has 15 pages in total.", "en", "zh", TranslationProvider.GOOGLE, model="model-a"
+        )
+        assert item.translated_text == "第4章共有15页。"
+        assert item.model_used == "model-a"
+        for model in ("model-b", None):
+            assert self.cache.get_fuzzy_translation(
+                "Chapter 4 has 15 pages in total.", "en", "zh", TranslationProvider.GOOGLE, model=model
+            ) is None
+
+    @pytest.mark.asyncio
+    async def test_fuzzy_translation_expires_with_ttl(self, monkeypatch):
+        """测试超过缓存TTL的句段不再被模糊复用"""
+        await self.cache.cache_translations(
+            [make_item("Chapter 3 has 12 pages in total.", "第3章共有12页。")], "en", "zh"
+        )
+        expired = time.time() + self.cache.cache_ttl_days * 24 * 3600 + 1
+        monkeypatch.setattr("app.services.translation_memory.time.time", lambda: expired)
+
+        assert self.cache.get_fuzzy_translation(
+            "Chapter 4 has 15 pages in total.", "en", "zh", TranslationProvider.GOOGLE
+        ) is None
+        assert len(self.cache.fuzzy_memory) == 0
+
+    @pytest.mark.asyncio
+    async def test_fuzzy_memory_follows_l1_eviction(self):
+        """测试模糊翻译记忆只保留仍在L1中的句段"""
+        self.cache.max_cache_size = 2
+        names = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot"]
+        texts = [f"The {name} invoice was paid on time." for name in names]
+        await self.cache.cache_translations([make_item(text) for text in texts], "en", "zh")
+
+        assert len(self.cache.fuzzy_memory) == len(self.cache._cache) <= 2
+        for text in texts:
+            key = self.cache.cache_key(text, "en", "zh", TranslationProvider.GOOGLE)
+            matches = self.cache.fuzzy_memory.lookup(text, "en", "zh", threshold=1.0)
+            assert any(m.source_text == text for m in matches) == (key in self.cache._cache)
+
+    @pytest.mark.asyncio
+    async def test_filtered_clear_removes_fuzzy_segments(self):
+        """测试按提供商清理缓存时同步删除对应的模糊翻译记忆"""
+        openai_item = make_item("Chapter 3 has 12 pages in total.", "第3章共有12页。")
+        openai_item.provider = TranslationProvider.OPENAI
+        await self.cache.cache_translations(
+            [make_item("Order 42 contains 3 items.", "订单42包含3件商品。"), openai_item], "en", "zh"
+        )
+
+        await self.cache.clear_cache(provider=TranslationProvider.GOOGLE)
+
+        assert self.cache.get_fuzzy_translation(
+            "Order 57 contains 3 items.", "en", "zh", TranslationProvider.GOOGLE
+        ) is None
+        assert self.cache.get_fuzzy_translation(
+            "Chapter 4 has 15 pages in total.", "en", "zh", TranslationProvider.OPENAI
+        ) is not None
+
+    @pytest.mark.asyncio
+    async def test_stats_follow_store_hit_and_eviction(self):
+        """测试统计随写入、命中、覆盖和淘汰增量更新"""
+        self.cache.max_cache_size = 2
+        await self.cache.cache_translations([make_item("one", "一"), make_item("two", "二")], "en", "zh")
+        await self.cache.cache_translations([make_item("one", "一")], "en", "zh")
+        await self.cache.get_cached_translation("one", "en", "zh", TranslationProvider.GOOGLE)
+        await self.cache.get_cached_translation("missing", "en", "zh", TranslationProvider.GOOGLE)
+        await self.cache.cache_translations([make_item("three", "三")], "en", "zh")
+
+        stats = await self.cache.get_cache_stats()
+        report = await self.cache.get_cache_efficiency_report()
+
+        assert stats["total_items"] == 2
+        assert stats["total_hits"] == 3
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert sum(stats["language_pairs"].values()) == 2
+        assert stats["provider_distribution"] == {"google": 2}
+        assert self.cache._stats.total_bytes == len("one一three三".encode("utf-8"))
+        assert report["efficiency_metrics"]["low_hit_items"] == 1
+        assert report["efficiency_metrics"]["recent_usage_items"] == 2
+
+    @pytest.mark.asyncio
+    async def test_stats_empty_after_clear(self):
+        """测试清空缓存后统计归零"""
+        await self.cache.cache_translations([make_item("Hello")], "en", "zh")
+        await self.cache.clear_cache()
+
+        stats = await self.cache.get_cache_stats()
+
+        assert stats["total_items"] == 0
+        assert stats["cache_size_mb"] == 0
+        assert stats["oldest_item"] is None
+        assert await self.cache.get_cache_efficiency_report() == {"message": "缓存为空"}
+
+    @pytest.mark.asyncio
+    async def test_long_texts_are_compressed_in_l1(self):
+        """测试长文本在L1中压缩保存，命中时解压"""
+        self.cache.compress_min_bytes = 64
+        long_text = "The quick brown fox jumps over the lazy dog. " * 20
+        await self.cache.cache_translations([make_item(long_text, "译文" * 100)], "en", "zh")
+        key = self.cache._generate_cache_key(long_text, "en", "zh", TranslationProvider.GOOGLE)
+
+        entry = self.cache._cache.peek(key)
+        cached = await self.cache.get_cached_translation(long_text, "en", "zh", TranslationProvider.GOOGLE)
+
+        assert entry.is_compressed
+        assert cached.original_text == long_text
+        assert cached.translated_text == "译文" * 100
+        assert self.cache._stats.total_bytes == len(long_text) + len(("译文" * 100).encode("utf-8"))
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_not_returned(self):
+        """测试过期缓存不会被返回"""
+        await self.cache.cache_translations([make_item("Hello")], "en", "zh")
+        key = self.cache._generate_cache_key("Hello", "en", "zh", TranslationProvider.GOOGLE)
+        entry = self.cache._cache.peek(key)
+        entry.created_at = (datetime.now() - timedelta(days=self.cache.cache_ttl_days + 1)).timestamp()
+        self.cache._cache.set(key, entry, expires_at=self.cache._expires_at(entry.created_at))
+
+        assert await self.cache.get_cached_translation(
+            "Hello", "en", "zh", TranslationProvider.GOOGLE
+        ) is None
+
+
+class TestFuzzyTranslationMemory:
+    """测试模糊翻译记忆"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.memory = FuzzyTranslationMemory(similarity_threshold=0.7)
+        self.memory.add("The warehouse shipped 120 boxes on Monday.", "仓库周一发出了120箱。", "en", "zh", "google")
+        self.memory.add("Please restart the server before the upgrade.", "升级前请重启服务器。", "en", "zh", "google")
+
+    def test_lookup_near_duplicate(self):
+        """测试只有数字和标点不同的句段能被找到"""
+        matches = self.memory.lookup("The warehouse shipped 125 boxes on Monday!", "en", "zh")
+
+        assert len(matches) == 1
+        assert matches[0].translated_text == "仓库周一发出了120箱。"
+        assert 0.7 <= matches[0].similarity < 1.0
+
+    def test_lookup_respects_threshold_and_language_pair(self):
+        """测试不相似的文本和其他语言对不会命中"""
+        assert self.memory.lookup("Completely unrelated sentence here.", "en", "zh") == []
+        assert self.memory.lookup("The warehouse shipped 120 boxes on Monday.", "en", "ja") == []
+
+    def test_discard_by_cache_key(self):
+        """测试按缓存键删除句段，重复添加同一键时只保留最新一条"""
+        memory = FuzzyTranslationMemory()
+        memory.add("first sentence", "第一句", "en", "zh", "google", key="k1")
+        memory.add("first sentence again", "第一句", "en", "zh", "google", key="k1")
+
+        assert len(memory) == 1
+        assert memory.discard("k1")
+        assert not memory.discard("k1")
+        assert len(memory) == 0
+
+    def test_capacity_evicts_oldest(self):
+        """测试超出容量时淘汰最早的句段"""
+        memory = FuzzyTranslationMemory(max_segments=1)
+        memory.add("first sentence", "第一句", "en", "zh", "google")
+        memory.add("second sentence", "第二句", "en", "zh", "google")
+
+        assert len(memory) == 1
+        assert memory.lookup("first sentence", "en", "zh") == []
+        assert memory.lookup("second sentence", "en", "zh")[0].similarity == 1.0
+
+    def test_patch_translation(self):
+        """测试只有数字不同时修补译文，其他差异不修补"""
+        source = "Order 42 contains 3 items."
+
+        assert patch_translation(source, "订单42包含3件商品。", "Order 57 contains 3 items.") == "订单57包含3件商品。"
+        assert patch_translation(source, "订单42包含3件商品。", "Order 42 contains many items.") is None
+        assert patch_translation(source, "该订单包含3件商品。", "Order 57 contains 3 items.") is None
+
+
+class TestTieredTranslationCache:
+    """测试L1 + Redis L2 两级缓存"""
+
+    def setup_method(self):
+        """测试前准备：两个worker共用同一个Redis"""
+        fakeredis = pytest.importorskip("fakeredis")
+        from app.services.cache_backends import RedisCacheBackend
+
+        server = fakeredis.FakeServer()
+        self.worker_a = TranslationCache(
+            shared_backend=RedisCacheBackend(client=fakeredis.FakeAsyncRedis(server=server))
+        )
+        self.worker_b = TranslationCache(
+            shared_backend=RedisCacheBackend(client=fakeredis.FakeAsyncRedis(server=server))
+        )
+
+    @pytest.mark.asyncio
+    async def test_write_through_and_promotion(self):
+        """测试写穿到L2，其他worker在L2命中后提升到L1"""
+        await self.worker_a.cache_translations([make_item("Hello", "你好")], "en", "zh")
+
+        first = await self.worker_b.get_cached_translation(
+            "Hello", "en", "zh", TranslationProvider.GOOGLE
+        )
+        second = await self.worker_b.get_cached_translation(
+            "Hello", "en", "zh", TranslationProvider.GOOGLE
+        )
+
+        assert first.translated_text == "你好"
+        assert second.translated_text == "你好"
+        assert self.worker_b.l2_hits == 1
+        assert self.worker_b.l1_hits == 1
+        assert len(self.worker_b._cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_tier_hit_rates(self):
+        """测试分别统计各级缓存命中率"""
+        await self.worker_a.cache_translations([make_item("Hello"), make_item("World")], "en", "zh")
+
+        for text in ["Hello", "World", "Hello", "Missing"]:
+            await self.worker_b.get_cached_translation(
+                text, "en", "zh", TranslationProvider.GOOGLE
+            )
+
+        stats = self.worker_b.get_tier_stats()
+        print(f"tier stats: {stats}")
+
+        assert stats["backend"] == "redis"
+        assert stats["lookups"] == 4
+        assert stats["l1_hits"] == 1
+        assert stats["l2_hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["l1_hit_rate"] == 0.25
+        assert stats["l2_hit_rate"] == round(2 / 3, 4)
+        assert stats["overall_hit_rate"] == 0.75
+
+    @pytest.mark.asyncio
+    async def test_get_many_reads_l1_misses_from_l2(self):
+        """测试批量查询中L1未命中的键从L2批量读取"""
+        await self.worker_a.cache_translations([make_item("Hello"), make_item("World")], "en", "zh")
+        await self.worker_b.get_cached_translation("Hello", "en", "zh", TranslationProvider.GOOGLE)
+
+        hits, miss_indices = await self.worker_b.get_cached_translations_many(
+            ["Hello", "World", "Missing"], "en", "zh", TranslationProvider.GOOGLE
+        )
+
+        assert set(hits) == {0, 1}
+        assert miss_indices == [2]
+        assert self.worker_b.l1_hits == 1
+        assert self.worker_b.l2_hits == 2
+
+    @pytest.mark.asyncio
+    async def test_migrate_drops_legacy_shared_keys(self):
+        """测试迁移时丢弃共享缓存中的v1缓存键"""
+        await self.worker_a.cache_translations([make_item("Hello")], "en", "zh")
+        await self.worker_a._shared.client.set("translation_cache:" + "0" * 64, "{}")
+
+        result = await self.worker_a.migrate_cache_keys()
+        remaining = [key async for key in self.worker_a._shared.scan_keys()]
+
+        assert result == {"migrated": 0, "dropped": 1}
+        assert len(remaining) == 1
+        assert remaining[0].startswith(CACHE_KEY_PREFIX)
+
+    @pytest.mark.asyncio
+    async def test_clear_cache_clears_shared_tier(self):
+        """测试清理缓存时同时清理共享缓存"""
+        await self.worker_a.cache_translations([make_item("Hello")], "en", "zh")
+        await self.worker_a.clear_cache()
+
+        assert await self.worker_b.get_cached_translation(
+            "Hello", "en", "zh", TranslationProvider.GOOGLE
+        ) is None
+
+
+class TestPersistentTranslationCache:
+    """测试SQLite持久化缓存"""
+
+    @pytest.mark.asyncio
+    async def test_cache_survives_restart(self, tmp_path):
+        """测试重启后缓存仍可命中，且启动时不预加载到L1"""
+        path = str(tmp_path / "cache.db")
+        backend = SQLiteCacheBackend(path=path)
+        cache = TranslationCache(shared_backend=backend)
+        await cache.cache_translations([make_item("Hello", "你好")], "en", "zh")
+        backend.close()
+
+        restarted = TranslationCache(shared_backend=SQLiteCacheBackend(path=path))
+        assert len(restarted._cache) == 0
+
+        cached = await restarted.get_cached_translation("Hello", "en", "zh", TranslationProvider.GOOGLE)
+
+        assert cached.translated_text == "你好"
+        assert restarted.l2_hits == 1
+        assert len(restarted._cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_compact_removes_expired_entries(self, tmp_path):
+        """测试压缩时删除过期项，过期项也不会被读到"""
+        backend = SQLiteCacheBackend(path=str(tmp_path / "cache.db"))
+        cache = TranslationCache(shared_backend=backend)
+        await cache.cache_translations([make_item("Hello")], "en", "zh")
+        key = cache._generate_cache_key("Hello", "en", "zh", TranslationProvider.GOOGLE)
+        await backend.set_many([("expired", cache._cache.peek(key).to_model("expired"), time.time() - 1)])
+
+        assert await backend.get("expired") is None
+        assert await cache.compact_cache() == {"l1_removed": 0, "l2_removed": 1}
+        assert [key async for key in backend.scan_keys()] == [key]
+
+    @pytest.mark.asyncio
+    async def test_compact_reclaims_pages_incrementally(self, tmp_path):
+        """测试压缩在独立连接中分批删除过期项并分步归还空闲页，之后缓存照常读写"""
+        backend = SQLiteCacheBackend(path=str(tmp_path / "cache.db"))
+        backend._COMPACT_DELETE_ROWS = 100
+        value = CacheModel(
+            id="k", source_text="x" * 500, translated_text="y", source_language="en",
+            target_language="zh", provider=TranslationProvider.GOOGLE, quality_score=0.8
+        )
+        await backend.set_many([(f"expired-{i}", value, time.time() - 1) for i in range(1000)])
+
+        assert await backend.compact() == 1000
+        assert backend._maintenance_conn is not None
+        assert backend._conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+
+        await backend.set_many([("live", value, time.time() + 60)])
+        assert (await backend.get("live")).source_text == "x" * 500
+        backend.close()
+
+    @pytest.mark.asyncio
+    async def test_regular_write_during_bulk_load_resets_uncommitted_rows(self, tmp_path):
+        """测试批量导入期间的普通写入提交了累积的行，之后重新计数"""
+        backend = SQLiteCacheBackend(path=str(tmp_path / "cache.db"))
+        backend._BULK_COMMIT_ROWS = 3
+        value = CacheModel(
+            id="k", source_text="x", translated_text="y", source_language="en",
+            target_language="zh", provider=TranslationProvider.GOOGLE, quality_score=0.8
+        )
+        expires_at = time.time() + 60
+
+        async with backend.bulk_load():
+            await backend.set_many_raw([("bulk-1", value.model_dump_json(), expires_at)] * 2)
+            await backend.set_many([("regular", value, expires_at)])
+            assert backend._bulk_uncommitted == 0
+            await backend.set_many_raw([("bulk-2", value.model_dump_json(), expires_at)])
+            assert backend._bulk_uncommitted == 1
+            assert backend._conn.in_transaction
+        backend.close()
+
+
+class TestCacheImport:
+    """测试翻译缓存批量导入"""
+
+    def test_iter_json_export_streams_records(self, monkeypatch):
+        """测试跨读缓冲区边界解析backup_restore导出格式"""
+        monkeypatch.setattr("app.services.cache_import._READ_SIZE", 16)
+        records = [{"original_text": f"Sentence {i}", "translated_text": f"句子 {i}"} for i in range(50)]
+        export = {"export_time": "2024-01-01", "version": "1.0",
+                  "data": {"translation_cache": records, "translation_jobs": [{"id": 1}]}}
+
+        parsed = list(iter_json_export(io.StringIO(json.dumps(export, ensure_ascii=False))))
+
+        assert parsed == records
+        assert list(iter_json_export(io.StringIO(json.dumps(records[:2])))) == records[:2]
+
+    @pytest.mark.asyncio
+    async def test_import_ndjson_export(self):
+        """测试导入NDJSON，无效记录计入跳过"""
+        cache = TranslationCache()
+        lines = [
+            {"source_text": "Hello", "translated_text": "你好", "source_language": "en",
+             "target_language": "zh", "provider": "google", "quality_score": 0.9},
+            {"source_text": "Bonjour", "translated_text": "你好", "source_language": "fr"},
+            {"source_text": "Broken"},
+            {"source_text": "Bad", "translated_text": "坏", "source_language": "xx"},
+            {"source_text": "Model", "translated_text": "模型", "model_used": {"name": "gpt"}},
+        ]
+        stream = io.StringIO("\n".join(json.dumps(line, ensure_ascii=False) for line in lines))
+
+        stats = await CacheImporter(cache, batch_size=1).import_export(stream, ndjson=True)
+
+        assert stats == {"imported": 2, "skipped": 3, "l1_loaded": 2, "l2_loaded": 0}
+        hello = await cache.get_cached_translation("Hello", "en", "zh", TranslationProvider.GOOGLE)
+        bonjour = await cache.get_cached_translation("Bonjour", "fr", "zh", TranslationProvider.GOOGLE)
+        assert hello.translated_text == "你好"
+        assert hello.quality_score == 0.9
+        assert bonjour is not None
+
+    @pytest.mark.asyncio
+    async def test_import_aligned_fills_free_l1_and_writes_l2(self, tmp_path):
+        """测试对齐语料导入：L1只填充空闲容量，其余只写入L2"""
+        cache = TranslationCache(shared_backend=SQLiteCacheBackend(path=str(tmp_path / "cache.db")))
+        cache.max_cache_size = 3
+        await cache.cache_translations([TranslationItem(
+            original_text="Hot", translated_text="热", confidence=0.9,
+            provider=TranslationProvider.GOOGLE, quality_score=0.8
+        )], "en", "zh")
+        source = io.StringIO("One\nTwo\n\nThree\nFour\n")
+        target = io.StringIO("一\n二\n多余\n三\n四\n")
+
+        stats = await CacheImporter(cache, batch_size=2).import_aligned(source, target)
+
+        assert stats == {"imported": 4, "skipped": 1, "l1_loaded": 2, "l2_loaded": 4}
+        assert len(cache._cache) == 3
+        assert cache._cache.peek(cache.cache_key("Hot", "en", "zh", TranslationProvider.GOOGLE))
+        four = await cache.get_cached_translation("Four", "en", "zh", TranslationProvider.GOOGLE)
+        assert four.translated_text == "四"
+        assert cache.l2_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_import_parses_off_the_event_loop(self):
+        """测试读文件和解析在线程中进行，不阻塞事件循环"""
+        loop_thread = threading.get_ident()
+        parse_threads = set()
+
+        class RecordingStream(io.StringIO):
+            def readline(self, *args):
+                parse_threads.add(threading.get_ident())
+                return super().readline(*args)
+
+            def __iter__(self):
+                return iter(self.readline, "")
+
+        stream = RecordingStream('{"source_text": "Hello", "translated_text": "你好"}\n' * 5)
+        stats = await CacheImporter(TranslationCache(), batch_size=2).import_export(stream, ndjson=True)
+
+        assert stats["imported"] == 5
+        assert parse_threads and loop_thread not in parse_threads
+
+    @pytest.mark.asyncio
+    async def test_bulk_import_to_sqlite_commits_and_round_trips(self, tmp_path):
+        """测试批量写入模式下导入的记录在退出后已提交，L2中的JSON可还原为缓存模型"""
+        path = str(tmp_path / "cache.db")
+        cache = TranslationCache(shared_backend=SQLiteCacheBackend(path=path))
+        cache.max_cache_size = 1
+        records = [
+            ImportRecord(f'Say "hi" {i}\n', "说“你好”\t\\", "en", "zh", TranslationProvider.OPENAI, 'gpt-"4"', 0.75)
+            for i in range(3)
+        ]
+
+        async with cache.bulk_import():
+            await cache.import_translations(records)
+        cache._shared.close()
+
+        reopened = SQLiteCacheBackend(path=path)
+        key = cache.cache_key(records[2].source_text, "en", "zh", TranslationProvider.OPENAI, 'gpt-"4"')
+        item = await reopened.get(key)
+        reopened.close()
+        assert item.id == key
+        assert item.source_text == records[2].source_text
+        assert item.translated_text == "说“你好”\t\\"
+        assert item.model_used == 'gpt-"4"'
+        assert item.quality_score == 0.75
+        assert item.hit_count == 0
+
+    @pytest.mark.asyncio
+    async def test_imported_items_stats_after_hits(self):
+        """测试导入的缓存项（命中次数从0开始）被命中后统计不出现负数"""
+        cache = TranslationCache()
+        await cache.import_translations([
+            ImportRecord("One", "一", "en", "zh", TranslationProvider.GOOGLE, None, 0.9),
+            ImportRecord("Two", "二", "en", "zh", TranslationProvider.GOOGLE, None, 0.9)
+        ])
+
+        for _ in range(3):
+            await cache.get_cached_translation("One", "en", "zh", TranslationProvider.GOOGLE)
+        await cache.get_cached_translation("Two", "en", "zh", TranslationProvider.GOOGLE)
+
+        stats = await cache.get_cache_stats()
+        report = await cache.get_cache_efficiency_report()
+        assert stats["total_hits"] == 4
+        assert report["efficiency_metrics"]["low_hit_items"] == 1
+        assert report["efficiency_metrics"]["high_hit_items"] == 0
@@ -1,12 +1,13 @@
 """
 翻译引擎单元测试
 """
+import asyncio
 import pytest
 from unittest.mock import Mock, AsyncMock, patch
 from app.services.translation_engine import TranslationEngine
 from app.schemas.translation import (
     TranslationRequest, TranslationProvider, LanguageCode,
-    TranslationItem, QualityLevel
+    TranslationItem, TranslationResult, TranslationStatus, QualityLevel
 )
 
 
@@ -74,6 +75,369 @@ class TestTranslationEngine:
                     assert result.translations[0].translated_text == "你好"
                     assert result.translations[1].translated_text == "世界"
     
+    @pytest.mark.asyncio
+    async def test_translate_batch_merges_cache_hits(self):
+        """测试缓存命中与新翻译按原顺序合并"""
+        await self.engine.cache.cache_translations([
+            TranslationItem(
+                original_text="World",
+                translated_text="世界",
+                confidence=0.9,
+                provider=TranslationProvider.GOOGLE,
+                quality_score=0.8
+            )
+        ], "en", "zh")
+        
+        request = TranslationRequest(
+            texts=["Hello", "World", "", "Bye"],
+            source_language=LanguageCode.ENGLISH,
+            target_language=LanguageCode.CHINESE,
+            provider=TranslationProvider.GOOGLE,
+            quality_threshold=0.5
+        )
+        
+        with patch('app.providers.provider_factory.provider_factory.get_provider') as mock_get_provider:
+            mock_provider = AsyncMock()
+            mock_provider.translate_batch.return_value = [
+                TranslationItem(
+                    original_text=text,
+                    translated_text=f"译:{text}",
+                    confidence=0.9,
+                    provider=TranslationProvider.GOOGLE
+                )
+                for text in ["Hello", "Bye"]
+            ]
+            mock_get_provider.return_value = mock_provider
+            
+            result = await self.engine.translate_batch(request)
+            
+            # 只有未命中的文本发送给提供商
+            assert mock_provider.translate_batch.call_args[0][0] == ["Hello", "Bye"]
+            assert [t.translated_text for t in result.translations] == ["译:Hello", "世界", "", "译:Bye"]
+            assert result.cache_hit_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_translate_batch_stage_timings(self):
+        """测试请求 include_timings 时返回各阶段耗时，并计入按阶段的延迟直方图"""
+        request = TranslationRequest(
+            texts=["Hello"],
+            source_language=LanguageCode.ENGLISH,
+            target_language=LanguageCode.CHINESE,
+            provider=TranslationProvider.GOOGLE,
+            include_timings=True
+        )
+        
+        with patch('app.providers.provider_factory.provider_factory.get_provider') as mock_get_provider:
+            mock_provider = AsyncMock()
+            mock_provider.translate_batch.return_value = [
+                TranslationItem(
+                    original_text="Hello",
+                    translated_text="你好",
+                    confidence=0.9,
+                    provider=TranslationProvider.GOOGLE
+                )
+            ]
+            mock_get_provider.return_value = mock_provider
+            
+            result = await self.engine.translate_batch(request)
+            untimed = await self.engine.translate_batch(request.model_copy(update={"include_timings": False}))
+        
+        assert set(result.stage_timings) == {
+            "preprocess", "cache_lookup", "provider", "quality", "cache_write", "cost_tracking", "total"
+        }
+        assert untimed.stage_timings is None
+        stats = self.engine.stage_latency.get_stats()
+        assert stats["total"]["count"] == 2
+        assert stats["provider"]["count"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_translate_batch_dedupes_repeated_texts(self):
+        """测试批内重复文本只翻译一次，结果展开到原始位置"""
+        request = TranslationRequest(
+            texts=["Name", "Age", "Name ", "Name", "Age"],
+            source_language=LanguageCode.ENGLISH,
+            target_language=LanguageCode.CHINESE,
+            provider=TranslationProvider.GOOGLE
+        )
+        
+        with patch('app.providers.provider_factory.provider_factory.get_provider') as mock_get_provider:
+            mock_provider = AsyncMock()
+            mock_provider.translate_batch.return_value = [
+                TranslationItem(
+                    original_text=text,
+                    translated_text=f"译:{text}",
+                    confidence=0.9,
+                    provider=TranslationProvider.GOOGLE
+                )
+                for text in ["Name", "Age"]
+            ]
+            mock_get_provider.return_value = mock_provider
+            
+            with patch.object(self.engine.quality_assessor, 'assess_batch', wraps=self.engine.quality_assessor.assess_batch) as mock_assess:
+                result = await self.engine.translate_batch(request)
+            
+            assert mock_provider.translate_batch.call_args[0][0] == ["Name", "Age"]
+            assert mock_assess.call_args[0][0] == ["Name", "Age"]
+            assert [t.translated_text for t in result.translations] == [
+                "译:Name", "译:Age", "译:Name", "译:Name", "译:Age"
+            ]
+            assert result.total_count == 5
+            assert result.dedup_ratio == pytest.approx(0.6)
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_texts_share_one_provider_call(self):
+        """测试并发请求中相同的未缓存句段只调用一次提供商"""
+        request = TranslationRequest(
+            texts=["Hello"],
+            source_language=LanguageCode.ENGLISH,
+            target_language=LanguageCode.CHINESE,
+            provider=TranslationProvider.GOOGLE,
+            use_cache=False
+        )
+        
+        async def slow_translate(texts, *args):
+            await asyncio.sleep(0.01)
+            return [
+                TranslationItem(
+                    original_text=text,
+                    translated_text="你好",
+                    confidence=0.9,
+                    provider=TranslationProvider.GOOGLE
+                )
+                for text in texts
+            ]
+        
+        with patch('app.providers.provider_factory.provider_factory.get_provider') as mock_get_provider:
+            mock_provider = AsyncMock()
+            mock_provider.translate_batch.side_effect = slow_translate
+            mock_get_provider.return_value = mock_provider
+            
+            results = await asyncio.gather(*[self.engine.translate_batch(request) for _ in range(3)])
+            
+            assert mock_provider.translate_batch.call_count == 1
+            assert all(r.translations[0].translated_text == "你好" for r in results)
+            assert self.engine.single_flight.coalesced == 2
+    
+    @pytest.mark.asyncio
+    async def test_short_provider_result_fails_missing_texts(self):
+        """测试提供商返回的结果少于句段数时，缺少的句段按失败处理，等待它们的请求不会挂起"""
+        started = asyncio.Event()
+        
+        async def short_translate(provider, texts, *args):
+            started.set()
+            await asyncio.sleep(0.01)
+            item = TranslationItem(
+                original_text=texts[0], translated_text="你好", confidence=0.9, provider=provider
+            )
+            return [item], [provider]
+        
+        def request(texts):
+            return TranslationRequest(texts=texts, provider=TranslationProvider.GOOGLE, use_cache=False)
+        
+        with patch.object(self.engine.resilience, 'translate_batch', side_effect=short_translate):
+            leader = asyncio.ensure_future(self.engine.translate_batch(request(["Hello", "World"])))
+            await started.wait()
+            follower = asyncio.ensure_future(self.engine.translate_batch(request(["World"])))
+            results = await asyncio.wait_for(asyncio.gather(leader, follower, return_exceptions=True), 30)
+        
+        assert [t.translated_text for t in results[0].translations] == ["你好", "[翻译失败]"]
+        assert results[0].success_count == 1
+        assert [t.translated_text for t in results[1].translations] == ["[翻译失败]"]
+        assert self.engine.single_flight.get_stats()["in_flight"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_hands_texts_to_waiting_request(self):
+        """测试认领句段的请求被取消（如客户端断开）时，等待同一句段的请求接手翻译"""
+        calls = []
+        
+        async def translate(provider, texts, *args):
+            calls.append(list(texts))
+            if len(calls) == 1:
+                await asyncio.sleep(10)
+            items = [
+                TranslationItem(original_text=text, translated_text="你好", confidence=0.9, provider=provider)
+                for text in texts
+            ]
+            return items, [provider] * len(items)
+        
+        request = TranslationRequest(texts=["Hello"], provider=TranslationProvider.GOOGLE, use_cache=False)
+        with patch.object(self.engine.resilience, 'translate_batch', side_effect=translate):
+            leader = asyncio.ensure_future(self.engine.translate_batch(request))
+            while not calls:
+                await asyncio.sleep(0)
+            follower = asyncio.ensure_future(self.engine.translate_batch(request))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            result = await asyncio.wait_for(follower, 30)
+        
+        assert leader.cancelled()
+        assert len(calls) == 2
+        assert result.translations[0].translated_text == "你好"
+        assert self.engine.single_flight.get_stats()["in_flight"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_leader_error_is_a_failed_text_for_waiting_request(self):
+        """测试认领句段的请求出错时，异常只返回给它自己，等待的请求得到失败结果"""
+        started = asyncio.Event()
+        
+        async def translate(provider, texts, *args):
+            started.set()
+            await asyncio.sleep(0.01)
+            raise RuntimeError("provider down")
+        
+        request = TranslationRequest(texts=["Hello"], provider=TranslationProvider.GOOGLE, use_cache=False)
+        with patch.object(self.engine.resilience, 'translate_batch', side_effect=translate):
+            leader = asyncio.ensure_future(self.engine.translate_batch(request))
+            await started.wait()
+            follower = asyncio.ensure_future(self.engine.translate_batch(request))
+            results = await asyncio.wait_for(asyncio.gather(leader, follower, return_exceptions=True), 30)
+        
+        assert isinstance(results[0], RuntimeError)
+        assert results[1].translations[0].translated_text == "[翻译失败]"
+        assert results[1].success_count == 0
+    
+    @pytest.mark.asyncio
+    async def test_recently_failed_texts_skip_provider(self):
+        """测试近期翻译失败的句段不会再次发给提供商"""
+        request = TranslationRequest(
+            texts=["Hello"],
+            source_language=LanguageCode.ENGLISH,
+            target_language=LanguageCode.CHINESE,
+            provider=TranslationProvider.GOOGLE
+        )
+        
+        # 不使用备用提供商
+        self.engine.resilience.fallback_chain = []
+        
+        with patch('app.providers.provider_factory.provider_factory.get_provider') as mock_get_provider:
+            mock_provider = AsyncMock()
+            mock_provider.translate_batch.return_value = [
+                TranslationItem(
+                    original_text="Hello",
+                    translated_text="[翻译失败: timeout]",
+                    confidence=0.0,
+                    provider=TranslationProvider.GOOGLE,
+                    quality_score=0.0
+                )
+            ]
+            mock_get_provider.return_value = mock_provider
+            
+            await self.engine.translate_batch(request)
+            result = await self.engine.translate_batch(request)
+            
+            assert mock_provider.translate_batch.call_count == 1
+            assert result.success_count == 0
+            assert result.translations[0].translated_text == "[翻译失败]"
+
+    @pytest.mark.asyncio
+    async def test_fallback_results_are_not_cached_and_billed_to_fallback(self):
+        """测试备用提供商的译文不写入首选提供商的缓存，使用量记到备用提供商"""
+        request = TranslationRequest(
+            texts=["Hello"],
+            source_language=LanguageCode.ENGLISH,
+            target_language=LanguageCode.CHINESE,
+            provider=TranslationProvider.GOOGLE
+        )
+        self.engine.resilience.fallback_chain = [TranslationProvider.MOCK]
+
+        google = AsyncMock()
+        google.translate_batch.side_effect = RuntimeError("503")
+        mock = AsyncMock()
+        mock.translate_batch.return_value = [
+            TranslationItem(
+                original_text="Hello",
+                translated_text="你好",
+                confidence=0.9,
+                provider=TranslationProvider.MOCK
+            )
+        ]
+        providers = {TranslationProvider.GOOGLE: google, TranslationProvider.MOCK: mock}
+
+        with patch('app.providers.provider_factory.provider_factory.get_provider', side_effect=providers.get):
+            await self.engine.translate_batch(request)
+            result = await self.engine.translate_batch(request)
+
+        assert result.cache_hit_count == 0
+        assert result.translations[0].provider == TranslationProvider.MOCK
+        assert mock.translate_batch.call_count == 2
+        records = [(r.provider, r.request_count) for r in self.engine.cost_tracker.usage_records]
+        assert records == [(TranslationProvider.MOCK, 1), (TranslationProvider.MOCK, 1)]
+
+    @pytest.mark.asyncio
+    async def test_usage_records_tokens_saved_by_each_call(self):
+        """测试使用记录中的打包节省是本次请求实际节省的token，而不是历史平均值"""
+        async def translate_batch(texts, *args, **kwargs):
+            return [
+                TranslationItem(
+                    original_text=text, translated_text=f"译{text}", confidence=0.9,
+                    provider=TranslationProvider.OPENAI, tokens_saved=len(text)
+                )
+                for text in texts
+            ]
+
+        openai = AsyncMock()
+        openai.translate_batch.side_effect = translate_batch
+        with patch('app.providers.provider_factory.provider_factory.get_provider', return_value=openai):
+            for texts in (["aaaa", "bb"], ["c"]):
+                await self.engine.translate_batch(TranslationRequest(
+                    texts=texts, provider=TranslationProvider.OPENAI, use_cache=False
+                ))
+
+        records = [(r.request_count, r.tokens_saved) for r in self.engine.cost_tracker.usage_records]
+        assert records == [(2, 6), (1, 1)]
+        assert self.engine.cost_tracker.usage_records[0].tokens_saved_per_segment == 3.0
+
+    @pytest.mark.asyncio
+    async def test_translate_batch_stream(self):
+        """测试流式翻译先返回缓存命中，再按子批次返回翻译结果，最后返回汇总"""
+        await self.engine.cache.cache_translations([
+            TranslationItem(
+                original_text="World",
+                translated_text="世界",
+                confidence=0.9,
+                provider=TranslationProvider.GOOGLE,
+                quality_score=0.8
+            )
+        ], "en", "zh")
+        
+        request = TranslationRequest(
+            texts=["Hello", "World", "", "Bye", "Again"],
+            source_language=LanguageCode.ENGLISH,
+            target_language=LanguageCode.CHINESE,
+            provider=TranslationProvider.GOOGLE,
+            quality_threshold=0.5
+        )
+        
+        async def translate(texts, *args):
+            return [
+                TranslationItem(
+                    original_text=text,
+                    translated_text=f"译:{text}",
+                    confidence=0.9,
+                    provider=TranslationProvider.GOOGLE
+                )
+                for text in texts
+            ]
+        
+        with patch('app.providers.provider_factory.provider_factory.get_provider') as mock_get_provider, \
+                patch('app.services.translation_engine.settings.TRANSLATION_STREAM_BATCH_SIZE', 2):
+            mock_provider = AsyncMock()
+            mock_provider.translate_batch.side_effect = translate
+            mock_get_provider.return_value = mock_provider
+            
+            records = [record async for record in self.engine.translate_batch_stream(request)]
+            
+            items, summary = records[:-1], records[-1]
+            assert [(r.index, r.cached) for r in items[:2]] == [(1, True), (2, True)]
+            assert {r.index: r.translation.translated_text for r in items} == {
+                0: "译:Hello", 1: "世界", 2: "", 3: "译:Bye", 4: "译:Again"
+            }
+            assert [c[0][0] for c in mock_provider.translate_batch.call_args_list] == [["Hello", "Bye"], ["Again"]]
+            assert summary.type == "summary"
+            assert summary.total_count == 5
+            assert summary.cache_hit_count == 2
+            assert summary.success_count == 5
+    
     @pytest.mark.asyncio
     async def test_get_translation_suggestions(self):
         """测试获取翻译建议"""
@@ -120,6 +484,63 @@ class TestTranslationEngine:
                         assert suggestions[0].provider == TranslationProvider.GOOGLE
                         assert suggestions[0].is_cached == False
     
+    def _suggestion_providers(self, delays):
+        """按提供商模拟不同延迟的 translate_single"""
+        providers = {}
+        for provider, delay in delays.items():
+            async def translate_single(text, *args, provider=provider, delay=delay):
+                await asyncio.sleep(delay)
+                return TranslationItem(
+                    original_text=text,
+                    translated_text=f"{provider.value}:你好",
+                    confidence=0.9,
+                    provider=provider
+                )
+            mock_provider = AsyncMock()
+            mock_provider.translate_single.side_effect = translate_single
+            mock_provider.estimate_cost = Mock(return_value=0.001)
+            providers[provider] = mock_provider
+        return providers
+    
+    @pytest.mark.asyncio
+    async def test_get_translation_suggestions_deadline(self):
+        """测试并发请求提供商，截止时间到达后只返回已得到的建议"""
+        providers = self._suggestion_providers({
+            TranslationProvider.GOOGLE: 0.01,
+            TranslationProvider.OPENAI: 0.05,
+            TranslationProvider.AZURE: 5
+        })
+        
+        with patch('app.providers.provider_factory.provider_factory.get_provider', side_effect=providers.get):
+            start = asyncio.get_running_loop().time()
+            suggestions = await self.engine.get_translation_suggestions(
+                text="Hello",
+                providers=list(providers),
+                timeout=0.5
+            )
+            elapsed = asyncio.get_running_loop().time() - start
+        
+        assert {s.provider for s in suggestions} == {TranslationProvider.GOOGLE, TranslationProvider.OPENAI}
+        # 并发执行：总耗时不是各提供商延迟之和，也不等最慢的提供商
+        assert elapsed < 1
+    
+    @pytest.mark.asyncio
+    async def test_iter_translation_suggestions_first_good_enough(self):
+        """测试第一个达到质量要求的建议返回后取消其余提供商"""
+        providers = self._suggestion_providers({
+            TranslationProvider.GOOGLE: 0.01,
+            TranslationProvider.OPENAI: 5
+        })
+        
+        with patch('app.providers.provider_factory.provider_factory.get_provider', side_effect=providers.get):
+            suggestions = [
+                s async for s in self.engine.iter_translation_suggestions(
+                    "Hello", list(providers), min_quality_score=0.0
+                )
+            ]
+        
+        assert [s.provider for s in suggestions] == [TranslationProvider.GOOGLE]
+    
     @pytest.mark.asyncio
     async def test_create_translation_job(self):
         """测试创建翻译任务"""
@@ -138,9 +559,9 @@ class TestTranslationEngine:
         
         # 验证任务创建
         assert job_id is not None
-        assert job_id in self.engine.active_jobs
         
-        job = self.engine.active_jobs[job_id]
+        job = await self.engine.get_translation_job_status(job_id)
+        assert job is not None
         assert job.project_id == "test-project"
         assert job.user_id == "test-user"
         assert job.request == request
@@ -169,6 +590,128 @@ class TestTranslationEngine:
         assert job.id == job_id
         assert job.project_id == "test-project"
     
+    @pytest.mark.asyncio
+    async def test_translation_job_resumes_from_checkpoint(self):
+        """测试任务失败后从检查点恢复，已完成的子批次不再翻译"""
+        texts = ["a", "b", "c", "d", "e"]
+        request = TranslationRequest(texts=texts, provider=TranslationProvider.GOOGLE)
+        translated = []
+        fail_on = {"c"}
+        
+        async def translate_batch(chunk_request):
+            if fail_on & set(chunk_request.texts):
+                raise RuntimeError("provider down")
+            translated.extend(chunk_request.texts)
+            items = [
+                TranslationItem(
+                    original_text=text, translated_text=f"译{text}", confidence=0.9,
+                    provider=TranslationProvider.GOOGLE, quality_score=0.9
+                )
+                for text in chunk_request.texts
+            ]
+            return TranslationResult(
+                translations=items, total_count=len(items), success_count=len(items),
+                cache_hit_count=0, cache_hit_rate=0, provider_used=TranslationProvider.GOOGLE,
+                total_cost=0.01, processing_time=0.1, quality_summary={}
+            )
+        
+        with patch.object(self.engine, 'translate_batch', side_effect=translate_batch), \
+                patch('app.services.translation_engine.settings.JOB_CHECKPOINT_SEGMENTS', 2):
+            job_id = await self.engine.create_translation_job(request, "test-project", "test-user")
+            await self.engine.job_workers.stop()
+            
+            job = await self.engine.job_store.claim(TranslationProvider.GOOGLE, lease_seconds=60)
+            await self.engine._execute_translation_job(job)
+            await self.engine.job_store.save(job)
+            
+            failed = await self.engine.get_translation_job_status(job_id)
+            assert failed.status == TranslationStatus.FAILED
+            assert failed.completed_segments == 2
+            assert failed.progress == 0.4
+            
+            fail_on.clear()
+            await self.engine.resume_translation_job(job_id)
+            await self.engine.job_workers.stop()
+            job = await self.engine.job_store.claim(TranslationProvider.GOOGLE, lease_seconds=60)
+            await self.engine._execute_translation_job(job)
+        
+        assert translated == texts
+        assert job.status == TranslationStatus.COMPLETED
+        assert job.progress == 1.0
+        assert [t.translated_text for t in job.result.translations] == [f"译{t}" for t in texts]
+        assert job.result.total_cost == pytest.approx(0.03)
+        
+        
+        # 已完成的任务不能恢复
+        await self.engine.job_store.save(job)
+        with pytest.raises(ValueError):
+            await self.engine.resume_translation_job(job_id)
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_job_resumes_only_after_worker_stops(self):
+        """测试执行中的任务取消后，worker停完当前子批次之前不能恢复；原worker失去任务后不再继续"""
+        texts = ["a", "b", "c", "d"]
+        request = TranslationRequest(texts=texts, provider=TranslationProvider.GOOGLE)
+        translated = []
+        in_batch = asyncio.Event()
+        release = asyncio.Event()
+        
+        async def translate_batch(chunk_request):
+            translated.extend(chunk_request.texts)
+            if chunk_request.texts[0] == "a":
+                in_batch.set()
+                await release.wait()
+            items = [
+                TranslationItem(
+                    original_text=text, translated_text=f"译{text}", confidence=0.9,
+                    provider=TranslationProvider.GOOGLE, quality_score=0.9
+                )
+                for text in chunk_request.texts
+            ]
+            return TranslationResult(
+                translations=items, total_count=len(items), success_count=len(items),
+                cache_hit_count=0, cache_hit_rate=0, provider_used=TranslationProvider.GOOGLE,
+                total_cost=0.01, processing_time=0.1, quality_summary={}
+            )
+        
+        store = self.engine.job_store
+        with patch.object(self.engine, 'translate_batch', side_effect=translate_batch), \
+                patch('app.services.translation_engine.settings.JOB_CHECKPOINT_SEGMENTS', 2):
+            job_id = await self.engine.create_translation_job(request, "test-project", "test-user")
+            await self.engine.job_workers.stop()
+            
+            # 第一个子批次执行中取消：租约保留，恢复被拒绝
+            job = await store.claim(TranslationProvider.GOOGLE, lease_seconds=60)
+            running = asyncio.create_task(self.engine._execute_translation_job(job))
+            await in_batch.wait()
+            await self.engine.cancel_translation_job(job_id)
+            with pytest.raises(ValueError):
+                await self.engine.resume_translation_job(job_id)
+            
+            release.set()
+            await running
+            assert job.status == TranslationStatus.CANCELLED
+            await store.save(job)
+            assert translated == ["a", "b"]
+            
+            # worker写回后可以恢复；租约过期后任务被重新领取，原worker停止且不写回
+            in_batch.clear()
+            release.clear()
+            await self.engine.resume_translation_job(job_id)
+            await self.engine.job_workers.stop()
+            stale = await store.claim(TranslationProvider.GOOGLE, lease_seconds=0.01)
+            await asyncio.sleep(0.02)
+            job = await store.claim(TranslationProvider.GOOGLE, lease_seconds=60)
+            assert job.attempt == stale.attempt + 1
+            await self.engine._execute_translation_job(stale)
+            assert stale.status == TranslationStatus.IN_PROGRESS
+            assert translated == ["a", "b"]
+            
+            await self.engine._execute_translation_job(job)
+        
+        assert translated == texts
+        assert job.status == TranslationStatus.COMPLETED
+    
     def test_preprocess_texts(self):
         """测试文本预处理"""
         texts = [
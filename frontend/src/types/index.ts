@@ -5,6 +5,7 @@ export interface TranslationRequest {
   source_language: string;
   target_language: string;
   provider: TranslationProvider;
+  include_timings?: boolean;
 }
 
 export interface TranslationItem {
@@ -26,7 +27,9 @@ export interface TranslationResult {
   quality_summary: QualitySummary;
   total_cost: number;
   cache_hit_rate: number;
+  dedup_ratio?: number;
   processing_time: number;
+  stage_timings?: Record<string, number>;
 }
 
 export interface TranslationJob {
@@ -35,6 +38,9 @@ export interface TranslationJob {
   user_id: string;
   status: JobStatus;
   progress: number;
+  total_segments?: number;
+  completed_segments?: number;
+  eta_seconds?: number;
   request_data: TranslationRequest;
   result_data?: TranslationResult;
   created_at: string;